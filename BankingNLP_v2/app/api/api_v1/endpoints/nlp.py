@@ -13,8 +13,11 @@ from app.schemas.nlp import (
     ConversationAnalysisResponse,
     BatchConversationRequest,
 )
+from app.core.admission import admission_controller
 from app.core.security import JWTBearer
+from app.services.micro_batcher import micro_batcher
 from app.services.nlp_service import nlp_service
+from app.services.training import TrainingInProgress, training_runner
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -34,24 +37,28 @@ async def analyze_conversation(
     """
     Анализирует текст разговора с клиентом.
     """
-    try:
-        result = await nlp_service.analyze_conversation(request.text)
-
-        # Логирование для аудита в фоне
-        background_tasks.add_task(
-            log_analysis_request,
-            user_token=token,
-            text_length=len(request.text),
-            result=result,
-        )
-
-        return ConversationAnalysisResponse(**result)
-    except Exception as e:
-        logger.error(f"Ошибка при анализе разговора: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Ошибка при обработке запроса",
-        )
+    # До загрузки модели — сразу 503, без ожидания в очереди
+    nlp_service.ensure_ready()
+    async with admission_controller.admit("analyze"):
+        try:
+            # Одновременные запросы анализируются одним пакетом
+            result = await micro_batcher.submit(request.text)
+
+            # Логирование для аудита в фоне
+            background_tasks.add_task(
+                log_analysis_request,
+                user_token=token,
+                text_length=len(request.text),
+                result=result,
+            )
+
+            return ConversationAnalysisResponse(**result)
+        except Exception as e:
+            logger.error(f"Ошибка при анализе разговора: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Ошибка при обработке запроса",
+            )
 
 
 @router.post(
@@ -64,7 +71,7 @@ async def batch_analyze_conversations(
     token: str = Depends(JWTBearer()),
 ):
     """
-    Пакетный анализ нескольких разговоров.
+    Пакетный анализ нескольких разговоров одним вызовом модели.
     """
     if len(requests.conversations) > 100:
         raise HTTPException(
@@ -72,14 +79,21 @@ async def batch_analyze_conversations(
             detail="Максимум 100 разговоров за раз",
         )
 
-    results = []
-    for conv in requests.conversations:
+    texts = [conv.text for conv in requests.conversations]
+    nlp_service.ensure_ready()
+    async with admission_controller.admit("batch-analyze"):
         try:
-            result = await nlp_service.analyze_conversation(conv.text)
-            results.append(result)
+            # Один transform и один predict_proba на весь пакет
+            results = await nlp_service.analyze_batch(texts)
         except Exception as e:
-            logger.error(f"Ошибка при анализе разговора: {e}")
-            results.append({"error": str(e)})
+            # Ошибка пакета: поштучный анализ, чтобы ошибка попала только в свои элементы
+            logger.error(f"Ошибка пакетного анализа, переход к поштучному: {e}")
+            results = []
+            for text in texts:
+                try:
+                    results.append(await nlp_service.analyze_conversation(text))
+                except Exception as item_error:
+                    results.append({"error": str(item_error)})
 
     return {"results": results, "processed_count": len(results)}
 
@@ -98,18 +112,41 @@ async def get_available_themes(token: str = Depends(JWTBearer())):
 
 @router.post(
     "/retrain",
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Переобучение модели",
-    description="Запускает переобучение модели NLP в фоновом режиме.",
+    description="Запускает переобучение модели NLP в отдельном процессе. "
+                "Новая версия подхватывается всеми воркерами без перезапуска.",
 )
-async def retrain_model(
-    background_tasks: BackgroundTasks,
-    token: str = Depends(JWTBearer()),
-):
+async def retrain_model(token: str = Depends(JWTBearer())):
     """
-    Запуск переобучения модели.
+    Запуск переобучения модели; одновременно выполняется одна задача.
     """
-    background_tasks.add_task(nlp_service.train_new_model)
-    return {"message": "Переобучение модели запущено в фоновом режиме"}
+    try:
+        job = nlp_service.train_new_model()
+    except TrainingInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "job_id": e.job_id},
+        )
+    return {"message": "Переобучение модели запущено в фоновом режиме", "job": job}
+
+
+@router.get(
+    "/retrain/{job_id}",
+    summary="Статус переобучения",
+    description="Возвращает состояние задачи переобучения и версию модели после ее завершения.",
+)
+async def retrain_status(job_id: str, token: str = Depends(JWTBearer())):
+    """
+    Статус задачи переобучения и текущая версия модели воркера.
+    """
+    job = training_runner.status(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Задача переобучения не найдена",
+        )
+    return {"job": job, "model_version": nlp_service.model_version}
 
 
 async def log_analysis_request(user_token: str, text_length: int, result: Dict[str, Any]):
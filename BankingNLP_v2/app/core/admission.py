@@ -0,0 +1,173 @@
+"""
+app/core/admission.py
+Контроль допуска запросов к NLP-эндпоинтам.
+
+Ограничивает количество одновременно выполняющихся запросов анализа в
+воркере. Сверх лимита запросы ждут в ограниченной очереди своего
+маршрута; если очередь заполнена или ожидание затянулось, клиент сразу
+получает 503 с заголовком Retry-After вместо общего замедления.
+
+Использование:
+    from app.core.admission import admission_controller
+
+    async with admission_controller.admit("analyze"):
+        ...
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонен из-за перегрузки."""
+
+    def __init__(self, route: str, reason: str, retry_after: int):
+        super().__init__(f"Сервис перегружен ({route}: {reason})")
+        self.route = route
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Ограничение одновременных запросов с очередями по маршрутам.
+
+    Слот завершившегося запроса передается первому ожидающему (FIFO по
+    всем маршрутам). Рассчитан на использование из одного event loop.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        queue_size: int,
+        route_queue_sizes: Optional[Dict[str, int]] = None,
+        queue_timeout_seconds: float = 0.5,
+        retry_after_seconds: int = 1,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.route_queue_sizes = route_queue_sizes or {}
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+        self.in_flight = 0
+        self._waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._queued: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+        self._wait_seconds: Dict[str, float] = {}
+        self._admitted: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def admit(self, route: str) -> AsyncIterator[None]:
+        """Выполнение блока с занятым слотом; при перегрузке — AdmissionRejected."""
+        await self.acquire(route)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, route: str) -> None:
+        """Занятие слота; парный вызов release() обязателен."""
+        if not self.enabled:
+            return
+
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._record_admitted(route, 0.0)
+            return
+
+        if self._queued.get(route, 0) >= self.route_queue_sizes.get(route, self.queue_size):
+            self._reject(route, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (route, future)
+        self._waiters.append(entry)
+        self._queued[route] = self._queued.get(route, 0) + 1
+        started = time.perf_counter()
+
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.queue_timeout_seconds)
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if not done:
+            self._abandon(entry)
+            self._reject(route, "timeout")
+
+        # Слот уже передан этому запросу в release()
+        self._record_admitted(route, time.perf_counter() - started)
+
+    def release(self) -> None:
+        """Освобождение слота с передачей первому ожидающему."""
+        if not self.enabled:
+            return
+
+        while self._waiters:
+            route, future = self._waiters.popleft()
+            self._queued[route] -= 1
+            if not future.done():
+                future.set_result(None)
+                return  # слот переходит ожидающему, in_flight не меняется
+
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущее состояние: занятые слоты, глубина очередей, отказы, среднее ожидание."""
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": dict(self._queued),
+            "rejected": dict(self._rejected),
+            "admitted": dict(self._admitted),
+            "avg_wait_seconds": {
+                route: round(total / self._admitted[route], 6)
+                for route, total in self._wait_seconds.items()
+                if self._admitted.get(route)
+            },
+        }
+
+    def _abandon(self, entry: Tuple[str, asyncio.Future]) -> None:
+        """Выход из очереди при отмене или таймауте."""
+        route, future = entry
+        if future.done() and not future.cancelled():
+            # Слот был передан в момент отмены — возвращаем его
+            self.release()
+            return
+
+        future.cancel()
+        try:
+            self._waiters.remove(entry)
+            self._queued[route] -= 1
+        except ValueError:
+            pass
+
+    def _record_admitted(self, route: str, waited: float) -> None:
+        self._admitted[route] = self._admitted.get(route, 0) + 1
+        self._wait_seconds[route] = self._wait_seconds.get(route, 0.0) + waited
+
+    def _reject(self, route: str, reason: str) -> None:
+        self._rejected[route] = self._rejected.get(route, 0) + 1
+        logger.warning(f"Запрос к {route} отклонен: {reason}, выполняется {self.in_flight}")
+        raise AdmissionRejected(route, reason, self.retry_after_seconds)
+
+
+# Экземпляр на процесс воркера
+admission_controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    queue_size=settings.ADMISSION_QUEUE_SIZE,
+    route_queue_sizes=settings.ADMISSION_ROUTE_QUEUE_SIZES,
+    queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    enabled=settings.ADMISSION_ENABLED,
+)
@@ -0,0 +1,199 @@
+"""
+app/core/capture.py
+Выборочная запись трафика NLP-эндпоинтов для воспроизведения.
+
+Включается CAPTURE_ENABLED=true. Доля CAPTURE_SAMPLE_RATE запросов к
+/nlp/analyze и /nlp/batch-analyze пишется в gzip NDJSON файл: время
+поступления, путь, статус, длительность и тело, все строки которого
+прошли через anonymize_text (паттерны anonymization_patterns). Записи
+дописываются фоновым потоком gzip-фрагментами через O_APPEND, поэтому
+несколько воркеров пишут в один файл. Разбор JSON и анонимизация тела
+выполняются в потоке записи, а не в event loop. Воспроизведение —
+BankingNLPv1/benchmarks/replay_capture.py --target v2.
+
+Использование (app/main.py):
+    app.add_middleware(TrafficCaptureMiddleware, writer=capture_writer)
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from src.data.load_data import anonymize_text
+
+logger = logging.getLogger(__name__)
+
+
+def anonymize_payload(value: Any) -> Any:
+    """Тело запроса, в котором все строки прошли через anonymize_text."""
+    if isinstance(value, str):
+        return anonymize_text(value)
+    if isinstance(value, list):
+        return [anonymize_payload(item) for item in value]
+    if isinstance(value, dict):
+        return {key: anonymize_payload(item) for key, item in value.items()}
+    return value
+
+
+class CaptureWriter:
+    """Фоновая дозапись записей трафика в gzip NDJSON файл."""
+
+    def __init__(self, path: str, queue_size: int = 10_000, flush_interval_seconds: float = 1.0):
+        self.path = Path(path)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.written = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запуск потока записи."""
+        if self._thread is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Запись трафика в {self.path}")
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Постановка записи с телом в байтах (поле body); при переполнении запись отбрасывается."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Запись оставшихся записей и остановка потока."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики записанных и отброшенных записей."""
+        return {"path": str(self.path), "written": self.written, "dropped": self.dropped}
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval_seconds
+            while not stopping:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                else:
+                    batch.append(record)
+            if batch:
+                self._append(batch)
+
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        lines = ""
+        written = 0
+        for record in batch:
+            try:
+                payload = json.loads(record["body"])
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            record["body"] = anonymize_payload(payload)
+            lines += json.dumps(record, ensure_ascii=False) + "\n"
+            written += 1
+        if not written:
+            return
+        member = gzip.compress(lines.encode("utf-8"), mtime=0)
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, member)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"Не удалось дописать запись трафика: {e}")
+            self.dropped += written
+            return
+        self.written += written
+
+
+class TrafficCaptureMiddleware:
+    """
+    ASGI middleware выборочной записи запросов анализа.
+
+    Тело копируется по мере чтения приложением; запись ставится в очередь
+    после отправки ответа.
+    """
+
+    def __init__(self, app: ASGIApp, writer: CaptureWriter):
+        self.app = app
+        self.writer = writer
+        self.sample_rate = settings.CAPTURE_SAMPLE_RATE
+        self.paths = frozenset(f"{settings.API_V1_STR}{path}" for path in settings.CAPTURE_PATHS)
+        self.max_body_bytes = settings.CAPTURE_MAX_BODY_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths
+                or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.time()
+        start = time.perf_counter()
+        chunks: List[bytes] = []
+        size = 0
+        status_code = 500
+
+        async def receive_wrapper() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request" and size <= self.max_body_bytes:
+                body = message.get("body", b"")
+                size += len(body)
+                chunks.append(body)
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if 0 < size <= self.max_body_bytes:
+                self._record(scope, b"".join(chunks), arrived, status_code, time.perf_counter() - start)
+
+    def _record(self, scope: Scope, body: bytes, arrived: float, status_code: int, elapsed: float) -> None:
+        self.writer.submit({
+            "ts": round(arrived, 6),
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "body": body,
+        })
+
+
+# Экземпляр на процесс воркера (None, если запись выключена)
+capture_writer: Optional[CaptureWriter] = (
+    CaptureWriter(
+        settings.CAPTURE_PATH,
+        queue_size=settings.CAPTURE_QUEUE_SIZE,
+        flush_interval_seconds=settings.CAPTURE_FLUSH_INTERVAL_SECONDS,
+    )
+    if settings.CAPTURE_ENABLED
+    else None
+)
@@ -7,6 +7,8 @@ config.py
     print(settings.PROJECT_NAME)
 """
 
+from typing import Dict, List
+
 from pydantic import BaseSettings, Field
 
 
@@ -36,6 +38,55 @@ class Settings(BaseSettings):
         description="Строка подключения SQLAlchemy"
     )
 
+    # ────────────────────────────
+    # ЗАГРУЗКА И ОБНОВЛЕНИЕ МОДЕЛИ
+    # ────────────────────────────
+    MODEL_PRELOAD: bool = Field(
+        True,
+        env="MODEL_PRELOAD",
+        description="Загружать модель в фоне сразу после старта воркера; иначе при первом запросе"
+    )
+    MODEL_NOT_READY_RETRY_AFTER_SECONDS: int = Field(5, env="MODEL_NOT_READY_RETRY_AFTER_SECONDS")
+    MODEL_DIR: str = Field("models", env="MODEL_DIR", description="Каталог версий модели и указателя CURRENT")
+    MODEL_POLL_INTERVAL_SECONDS: float = Field(5.0, gt=0, env="MODEL_POLL_INTERVAL_SECONDS")
+    MODEL_KEEP_VERSIONS: int = Field(5, ge=1, env="MODEL_KEEP_VERSIONS")
+
+    # ────────────────────────────
+    # КОНТРОЛЬ ДОПУСКА (на воркер)
+    # ────────────────────────────
+    ADMISSION_ENABLED: bool = Field(True, env="ADMISSION_ENABLED")
+    ADMISSION_MAX_IN_FLIGHT: int = Field(16, env="ADMISSION_MAX_IN_FLIGHT")
+    ADMISSION_QUEUE_SIZE: int = Field(32, env="ADMISSION_QUEUE_SIZE")
+    ADMISSION_ROUTE_QUEUE_SIZES: Dict[str, int] = Field(
+        {"batch-analyze": 4},
+        env="ADMISSION_ROUTE_QUEUE_SIZES",
+        description="Длина очереди для отдельных маршрутов, JSON"
+    )
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(0.5, env="ADMISSION_QUEUE_TIMEOUT_SECONDS")
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(1, env="ADMISSION_RETRY_AFTER_SECONDS")
+
+    # ────────────────────────────
+    # МИКРОПАКЕТЫ /analyze (на воркер)
+    # ────────────────────────────
+    MICRO_BATCH_ENABLED: bool = Field(True, env="MICRO_BATCH_ENABLED")
+    MICRO_BATCH_WINDOW_MS: float = Field(2.0, gt=0, env="MICRO_BATCH_WINDOW_MS")
+    MICRO_BATCH_MAX_SIZE: int = Field(32, ge=1, env="MICRO_BATCH_MAX_SIZE")
+
+    # ────────────────────────────
+    # ЗАПИСЬ ТРАФИКА (анонимизированная выборка для воспроизведения)
+    # ────────────────────────────
+    CAPTURE_ENABLED: bool = Field(False, env="CAPTURE_ENABLED")
+    CAPTURE_PATH: str = Field("logs/traffic_capture.ndjson.gz", env="CAPTURE_PATH")
+    CAPTURE_SAMPLE_RATE: float = Field(0.1, ge=0, le=1, env="CAPTURE_SAMPLE_RATE")
+    CAPTURE_PATHS: List[str] = Field(
+        ["/nlp/analyze", "/nlp/batch-analyze"],
+        env="CAPTURE_PATHS",
+        description="Записываемые маршруты относительно API_V1_STR, JSON"
+    )
+    CAPTURE_MAX_BODY_BYTES: int = Field(1_048_576, env="CAPTURE_MAX_BODY_BYTES")
+    CAPTURE_QUEUE_SIZE: int = Field(10_000, env="CAPTURE_QUEUE_SIZE")
+    CAPTURE_FLUSH_INTERVAL_SECONDS: float = Field(1.0, env="CAPTURE_FLUSH_INTERVAL_SECONDS")
+
     # ────────────────────────────
     # СИСТЕМНЫЕ ПАРАМЕТРЫ
     # ────────────────────────────
@@ -3,17 +3,22 @@ app/main.py
 Главная точка входа FastAPI-приложения Banking NLP v2.0.
 """
 
+import asyncio
 import logging
 import logging.config
 import yaml
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
+from app.core.admission import AdmissionRejected, admission_controller
+from app.core.capture import TrafficCaptureMiddleware, capture_writer
 from app.core.config import settings
+from app.services.micro_batcher import micro_batcher
+from app.services.nlp_service import ModelNotReady, nlp_service
 
 
 # ────────────────────────────
@@ -58,6 +63,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ────────────────────────────
+#  Загрузка модели в фоне (MODEL_PRELOAD) и обновление версии
+# ────────────────────────────
+@app.on_event("startup")
+async def start_model_loading():
+    if settings.MODEL_PRELOAD:
+        nlp_service.start_loading()
+    # Новые версии от процесса переобучения (указатель MODEL_DIR/CURRENT)
+    app.state.model_watcher = asyncio.create_task(
+        nlp_service.watch_model_version(settings.MODEL_POLL_INTERVAL_SECONDS)
+    )
+
+
+@app.on_event("shutdown")
+async def stop_model_watcher():
+    app.state.model_watcher.cancel()
+
+# ────────────────────────────
+#  Запись трафика (CAPTURE_ENABLED)
+# ────────────────────────────
+if capture_writer is not None:
+    app.add_middleware(TrafficCaptureMiddleware, writer=capture_writer)
+
+
+@app.on_event("startup")
+async def start_capture():
+    if capture_writer is not None:
+        capture_writer.start()
+
+
+@app.on_event("shutdown")
+async def stop_capture():
+    if capture_writer is not None:
+        capture_writer.close()
+
+# ────────────────────────────
+#  Перегрузка: быстрый 503 с Retry-After
+# ────────────────────────────
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(ModelNotReady)
+async def model_not_ready_handler(request: Request, exc: ModelNotReady):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # ────────────────────────────
 #  Шаблоны и статика
 # ────────────────────────────
@@ -88,11 +147,32 @@ async def analytics(request: Request):
 
 
 # ────────────────────────────
-#  Health-check
+#  Health-check: /health — живость процесса (200 и во время загрузки
+#  модели), /health/ready — готовность принимать запросы анализа
 # ────────────────────────────
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "version": app.version}
+    return {
+        "status": "healthy",
+        "version": app.version,
+        "ready": nlp_service.is_ready,
+        "model": nlp_service.status(),
+        "admission": admission_controller.stats(),
+        "micro_batcher": micro_batcher.stats(),
+        "capture": capture_writer.stats() if capture_writer is not None else None,
+    }
+
+
+@app.get("/health/ready")
+async def readiness():
+    status = nlp_service.status()
+    if not status["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content=status,
+            headers={"Retry-After": str(nlp_service.retry_after_seconds)},
+        )
+    return status
 
 
 # ────────────────────────────
@@ -0,0 +1,48 @@
+"""
+app/services/inference.py
+Инференс классификатора тем без перевода признаков в плотный вид.
+
+TF-IDF вектор одного текста остается разреженной матрицей 1×V (в ней
+столько ненулевых элементов, сколько различных слов в тексте), и модель
+вызывается один раз: метка и уверенность берутся из одной строки
+predict_proba. Для LogisticRegression argmax вероятностей совпадает с
+predict, поэтому результат тот же, что при отдельных вызовах predict и
+predict_proba на плотном векторе.
+
+Использование:
+    features = vectorize(vectorizer, texts)
+    labels, confidences = predict_labels(model, features)
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def vectorize(vectorizer: Optional[Any], texts: Sequence[str]) -> Any:
+    """
+    Признаки текстов.
+
+    С векторизатором — разреженная матрица len(texts)×V; без него —
+    базовые признаки (длина и количество слов).
+    """
+    if vectorizer is not None:
+        return vectorizer.transform(texts)
+    return np.array([[len(text), len(text.split())] for text in texts], dtype=np.float64)
+
+
+def predict_labels(model: Any, features: Any) -> Tuple[List[str], List[float]]:
+    """
+    Метки и уверенность за один проход predict_proba.
+
+    Args:
+        model: Классификатор с predict_proba и classes_
+        features: Матрица признаков (разреженная или плотная), строка на текст
+
+    Returns:
+        Tuple: Метки и вероятности выбранных меток
+    """
+    probabilities = model.predict_proba(features)
+    best = probabilities.argmax(axis=1)
+    confidences = probabilities[np.arange(len(best)), best]
+    return model.classes_[best].tolist(), confidences.tolist()
@@ -0,0 +1,176 @@
+"""
+app/services/micro_batcher.py
+Объединение одновременных запросов /analyze в пакеты.
+
+Каждый вызов submit() ставит текст в общую очередь. Пакет отправляется в
+NLPService.analyze_batch (один transform и один predict_proba), как только
+в нем набралось MICRO_BATCH_MAX_SIZE текстов или прошло
+MICRO_BATCH_WINDOW_MS с момента поступления первого; результаты
+возвращаются ожидающим обработчикам в порядке очереди. Одиночный запрос
+без конкурентов ждет не дольше окна.
+
+Статистика (размеры пакетов, причина отправки, задержка в очереди)
+выводится в /health.
+
+Использование:
+    from app.services.micro_batcher import micro_batcher
+
+    result = await micro_batcher.submit(text)
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.nlp_service import nlp_service
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограммы размеров пакетов
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class MicroBatcher:
+    """
+    Накопление запросов на окно и пакетная обработка.
+
+    Рассчитан на использование из одного event loop.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+        window_seconds: float = 0.002,
+        max_batch_size: int = 32,
+        enabled: bool = True,
+        delay_samples: int = 1000,
+    ):
+        self.handler = handler
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.enabled = enabled
+
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches = 0
+        self._items = 0
+        self._size_buckets: Counter = Counter()
+        self._flush_reasons: Counter = Counter()
+        self._delay_total = 0.0
+        self._delay_max = 0.0
+        self._recent_delays: Deque[float] = deque(maxlen=delay_samples)
+
+    async def submit(self, text: str) -> Dict[str, Any]:
+        """Результат анализа текста из ближайшего пакета."""
+        if not self.enabled:
+            return (await self.handler([text]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch("size")
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._dispatch, "window")
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Пакеты, распределение размеров, причины отправки и задержка в очереди."""
+        delays = sorted(self._recent_delays)
+
+        def pick(q: float) -> Optional[float]:
+            if not delays:
+                return None
+            return round(delays[min(len(delays) - 1, int(q * len(delays)))] * 1000, 3)
+
+        return {
+            "enabled": self.enabled,
+            "window_ms": round(self.window_seconds * 1000, 3),
+            "max_batch_size": self.max_batch_size,
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else None,
+            "batch_sizes": {
+                f"le_{bucket}": self._size_buckets[bucket] for bucket in BATCH_SIZE_BUCKETS
+            },
+            "flush_reasons": dict(self._flush_reasons),
+            "queue_delay_ms": {
+                "avg": round(self._delay_total / self._items * 1000, 3) if self._items else None,
+                "p50": pick(0.50),
+                "p95": pick(0.95),
+                "p99": pick(0.99),
+                "max": round(self._delay_max * 1000, 3),
+            },
+        }
+
+    def _dispatch(self, reason: str) -> None:
+        """Отправка накопленных запросов одним пакетом."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        for _, _, queued_at in batch:
+            delay = now - queued_at
+            self._delay_total += delay
+            self._delay_max = max(self._delay_max, delay)
+            self._recent_delays.append(delay)
+        self._batches += 1
+        self._items += len(batch)
+        self._size_buckets[self._bucket(len(batch))] += 1
+        self._flush_reasons[reason] += 1
+
+        asyncio.ensure_future(self._run(batch))
+
+    @staticmethod
+    def _bucket(size: int) -> int:
+        """Корзина гистограммы для размера пакета."""
+        return next((bucket for bucket in BATCH_SIZE_BUCKETS if size <= bucket), BATCH_SIZE_BUCKETS[-1])
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        """Пакетная обработка и передача результатов ожидающим."""
+        try:
+            results = await self.handler([text for text, _, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exception=e)
+                return
+            # Ошибка одного текста не должна ронять соседей по пакету
+            logger.warning(f"Ошибка пакета из {len(batch)} запросов, анализ по одному: {e}")
+            for text, future, _ in batch:
+                try:
+                    self._resolve(future, result=(await self.handler([text]))[0])
+                except Exception as item_error:
+                    self._resolve(future, exception=item_error)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, exception: Optional[Exception] = None) -> None:
+        """Передача результата ожидающему обработчику."""
+        # Обработчик, клиент которого отключился, уже отменен
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+# Экземпляр на процесс воркера
+micro_batcher = MicroBatcher(
+    nlp_service.analyze_batch,
+    window_seconds=settings.MICRO_BATCH_WINDOW_MS / 1000,
+    max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+    enabled=settings.MICRO_BATCH_ENABLED,
+)
@@ -0,0 +1,121 @@
+"""
+app/services/model_registry.py
+Версионированные артефакты модели и атомарный указатель на текущую версию.
+
+Структура каталога MODEL_DIR:
+    versions/<версия>/model.joblib       — классификатор тем
+    versions/<версия>/vectorizer.joblib  — TF-IDF векторизатор
+    versions/<версия>/meta.json          — метрики и время обучения
+    CURRENT                              — имя текущей версии
+
+Версия сначала целиком записывается во временный каталог и
+переименовывается, затем файл CURRENT заменяется через os.replace.
+Воркеры читают CURRENT и видят либо старую, либо новую версию, но
+никогда — недописанную. Без CURRENT используются файлы прежнего формата
+(latest_model.joblib и vectorizer.joblib).
+
+Использование:
+    registry = ModelRegistry("models")
+    version, model, vectorizer = registry.load()
+"""
+
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+LEGACY_VERSION = "legacy"
+LEGACY_MODEL_FILE = "latest_model.joblib"
+LEGACY_VECTORIZER_FILE = "vectorizer.joblib"
+
+
+class ModelRegistry:
+    """Каталог версий модели с указателем на текущую."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @property
+    def pointer_path(self) -> str:
+        return os.path.join(self.root, POINTER_FILE)
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.root, VERSIONS_DIR, version)
+
+    def new_version(self) -> str:
+        """Имя новой версии: время обучения и случайный суффикс."""
+        return f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+    def current_version(self) -> Optional[str]:
+        """Текущая версия по указателю или None."""
+        try:
+            with open(self.pointer_path, encoding="utf-8") as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self) -> List[str]:
+        """Сохраненные версии от старых к новым."""
+        try:
+            names = os.listdir(os.path.join(self.root, VERSIONS_DIR))
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if not name.startswith("."))
+
+    def save(self, version: str, model: Any, vectorizer: Any, meta: Dict[str, Any]) -> str:
+        """Записывает артефакты версии; каталог версии появляется только целиком."""
+        target = self.version_dir(version)
+        staging = os.path.join(self.root, VERSIONS_DIR, f".{version}.tmp")
+        os.makedirs(staging, exist_ok=True)
+        joblib.dump(model, os.path.join(staging, "model.joblib"))
+        joblib.dump(vectorizer, os.path.join(staging, "vectorizer.joblib"))
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump({"version": version, **meta}, fh, ensure_ascii=False, indent=2)
+        os.replace(staging, target)
+        return target
+
+    def publish(self, version: str) -> None:
+        """Атомарно переключает указатель CURRENT на версию."""
+        if not os.path.isdir(self.version_dir(version)):
+            raise FileNotFoundError(f"Версия модели не найдена: {version}")
+        tmp_path = f"{self.pointer_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(version)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.pointer_path)
+
+    def load(self, version: Optional[str] = None) -> Tuple[str, Any, Any]:
+        """
+        Загружает версию (по умолчанию текущую).
+
+        Returns:
+            Tuple: Версия, модель и векторизатор
+
+        Raises:
+            FileNotFoundError: Нет ни указателя, ни файлов прежнего формата
+        """
+        version = version or self.current_version()
+        if version is None:
+            model = joblib.load(os.path.join(self.root, LEGACY_MODEL_FILE))
+            vectorizer = joblib.load(os.path.join(self.root, LEGACY_VECTORIZER_FILE))
+            return LEGACY_VERSION, model, vectorizer
+
+        directory = self.version_dir(version)
+        model = joblib.load(os.path.join(directory, "model.joblib"))
+        vectorizer = joblib.load(os.path.join(directory, "vectorizer.joblib"))
+        return version, model, vectorizer
+
+    def prune(self, keep: int) -> List[str]:
+        """Удаляет старые версии, кроме keep последних и текущей."""
+        current = self.current_version()
+        stale = [version for version in self.versions()[:-keep] if version != current] if keep > 0 else []
+        for version in stale:
+            shutil.rmtree(self.version_dir(version), ignore_errors=True)
+        return stale
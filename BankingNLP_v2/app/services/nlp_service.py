@@ -1,111 +1,235 @@
 import asyncio
 import logging
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-import joblib
 import numpy as np
 
-from src.data.load_data import load_transcripts, clean_and_normalize
-from src.features.build_features import build_features
-from src.models.train_model import train_model
-from src.evaluation.evaluate import evaluate
+from app.core.config import settings
+from app.services.inference import predict_labels, vectorize
+from app.services.model_registry import ModelRegistry
+from app.services.training import TrainingInProgress, TrainingJobRunner, training_runner
 
 logger = logging.getLogger(__name__)
 
+
+class ModelNotReady(Exception):
+    """Модель еще не загружена: запрос отклоняется сразу."""
+
+    def __init__(self, state: str, retry_after: int):
+        super().__init__(f"Модель не готова ({state})")
+        self.state = state
+        self.retry_after = retry_after
+
+
 class NLPService:
-    def __init__(self):
-        self.model = None
-        self.vectorizer = None
+    POSITIVE_WORDS = ['хорошо', 'отлично', 'спасибо', 'доволен', 'рад']
+    NEGATIVE_WORDS = ['плохо', 'ужасно', 'жалоба', 'недоволен', 'проблема']
+    PRODUCT_KEYWORDS = {
+        'кредит': ['кредит', 'займ', 'ссуда'],
+        'ипотека': ['ипотека', 'жилищный кредит'],
+        'карта': ['карта', 'дебетовая', 'кредитная'],
+        'вклад': ['вклад', 'депозит', 'накопления'],
+        'страхование': ['страховка', 'страхование', 'полис']
+    }
+
+    def __init__(self, registry: ModelRegistry, runner: TrainingJobRunner, retry_after_seconds: int = 5):
+        self.registry = registry
+        self.runner = runner
+        # Версия, модель и векторизатор подменяются одним присваиванием
+        self._artifact: Tuple[Optional[str], Any, Any] = (None, None, None)
         self.themes = [
             'информация', 'ипотека', 'жалоба', 'конкурент', 
             'жизненное событие', 'страхование', 'вклад', 'кредит'
         ]
-        self.load_model()
+        # Модель загружается не при импорте, а в фоне после старта воркера
+        # (start_loading) или при первом запросе (ensure_ready)
+        self.state = "not_loaded"
+        self.load_error: Optional[str] = None
+        self.loaded_at: Optional[str] = None
+        self.retry_after_seconds = retry_after_seconds
+        self._load_lock = threading.Lock()
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._artifact[0]
+
+    @property
+    def model(self) -> Any:
+        return self._artifact[1]
+
+    @property
+    def vectorizer(self) -> Any:
+        return self._artifact[2]
+
+    @property
+    def is_ready(self) -> bool:
+        """Модель загружена и принимает запросы"""
+        return self.state == "ready"
+
+    def status(self) -> Dict[str, Any]:
+        """Состояние загрузки модели для /health"""
+        return {
+            "state": self.state,
+            "ready": self.is_ready,
+            "version": self.model_version,
+            "loaded_at": self.loaded_at,
+            "error": self.load_error,
+        }
+
+    def start_loading(self) -> None:
+        """Запускает загрузку (или обучение) модели в фоновом потоке"""
+        with self._load_lock:
+            if self.state in ("loading", "ready"):
+                return
+            self.state = "loading"
+            self.load_error = None
+        threading.Thread(target=self._load_in_background, name="nlp-model-loader", daemon=True).start()
+
+    def ensure_ready(self) -> None:
+        """
+        Быстрый отказ, пока модель не готова.
+
+        Первый вызов без предварительной загрузки запускает ее в фоне.
+        """
+        if self.state == "ready":
+            return
+        if self.state == "not_loaded":
+            self.start_loading()
+        raise ModelNotReady(self.state, self.retry_after_seconds)
+
+    def _load_in_background(self) -> None:
+        """Загрузка модели с фиксацией ошибки в состоянии сервиса"""
+        started = time.perf_counter()
+        try:
+            self.load_model()
+        except Exception as e:
+            self.state = "failed"
+            self.load_error = str(e)
+            logger.error(f"Не удалось загрузить модель: {e}")
+            return
+        if self.is_ready:
+            logger.info(f"Модель готова к работе за {time.perf_counter() - started:.1f} с")
 
     def load_model(self):
-        """Загружает обученную модель или обучает новую"""
+        """Загружает текущую версию модели или запускает обучение новой"""
         try:
-            self.model = joblib.load('models/latest_model.joblib')
-            self.vectorizer = joblib.load('models/vectorizer.joblib')
-            logger.info("Модель успешно загружена")
+            version, model, vectorizer = self.registry.load()
         except FileNotFoundError:
+            # Модель подхватит watch_model_version, когда обучение завершится
             logger.warning("Модель не найдена, обучение новой модели")
-            self.train_new_model()
+            try:
+                self.train_new_model()
+            except TrainingInProgress:
+                pass
+            return
+        self._swap_model(version, model, vectorizer)
+        logger.info(f"Модель успешно загружена (версия {version})")
+
+    def train_new_model(self) -> Dict[str, Any]:
+        """Запускает обучение новой модели в отдельном процессе"""
+        return self.runner.start()
+
+    def refresh_model(self) -> bool:
+        """Подхватывает версию, на которую переключен указатель CURRENT"""
+        version = self.registry.current_version()
+        if version is None or version == self.model_version:
+            if not self.is_ready and self.state == "loading" and not self.runner.is_running():
+                # Первое обучение завершилось без новой версии
+                self.state = "failed"
+                self.load_error = "Обучение модели завершилось без результата"
+            return False
+
+        version, model, vectorizer = self.registry.load(version)
+        self._swap_model(version, model, vectorizer)
+        logger.info(f"Модель обновлена до версии {version}")
+        return True
+
+    async def watch_model_version(self, interval_seconds: float) -> None:
+        """Периодическая проверка указателя; загрузка идет вне event loop"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.refresh_model)
+            except Exception as e:
+                logger.error(f"Ошибка при обновлении модели: {e}")
+
+    def _swap_model(self, version: str, model: Any, vectorizer: Any) -> None:
+        """Атомарная подмена модели; запросы в работе дочитывают прежнюю"""
+        self._artifact = (version, model, vectorizer)
+        self.loaded_at = datetime.utcnow().isoformat()
+        self.load_error = None
+        self.state = "ready"
 
-    def train_new_model(self):
-        """Обучает новую модель NLP"""
+    async def analyze_conversation(self, text: str) -> Dict[str, Any]:
+        """Анализирует текст разговора и возвращает результаты"""
         try:
-            # Загрузка и подготовка данных
-            df = load_transcripts()
-            df = clean_and_normalize(df)
-            df = build_features(df)
-            
-            # Обучение модели
-            train_model()
-            self.load_model()
-            logger.info("Новая модель обучена и загружена")
+            return self._analyze_texts([text])[0]
         except Exception as e:
-            logger.error(f"Ошибка при обучении модели: {e}")
+            logger.error(f"Ошибка при анализе разговора: {e}")
             raise
 
-    async def analyze_conversation(self, text: str) -> Dict[str, Any]:
-        """Анализирует текст разговора и возвращает результаты"""
+    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Пакетный анализ разговоров
+
+        Все тексты векторизуются одним transform и классифицируются одним
+        predict_proba; результаты в порядке texts, как у analyze_conversation.
+        """
         try:
-            # Предобработка текста
-            processed_text = self._preprocess_text(text)
-            
-            # Извлечение признаков
-            features = self._extract_features(processed_text)
-            
-            # Предсказание темы
-            theme_prediction = self.model.predict([features])[0]
-            theme_probability = max(self.model.predict_proba([features])[0])
-            
-            # Анализ эмоций
-            emotion = self._analyze_emotion(text)
-            
-            # Извлечение продуктов
-            products = self._extract_products(text)
-            
-            # Оценка удовлетворенности
-            satisfaction = self._estimate_satisfaction(text, emotion)
-            
-            return {
-                "theme": theme_prediction,
-                "confidence": float(theme_probability),
+            return self._analyze_texts(texts)
+        except Exception as e:
+            logger.error(f"Ошибка при пакетном анализе {len(texts)} разговоров: {e}")
+            raise
+
+    def _analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Анализ списка текстов одной матричной операцией модели"""
+        self.ensure_ready()
+        _, model, vectorizer = self._artifact
+
+        # Предобработка текста
+        processed_texts = [self._preprocess_text(text) for text in texts]
+
+        # Извлечение признаков (разреженная матрица TF-IDF, строка на текст)
+        features = self._extract_features(processed_texts, vectorizer)
+
+        # Предсказание темы: метки и уверенность из одного predict_proba
+        themes, confidences = predict_labels(model, features)
+
+        processed_at = datetime.utcnow().isoformat()
+        results = []
+        for text, text_lower, theme, confidence in zip(texts, processed_texts, themes, confidences):
+            # Эмоции, продукты и удовлетворенность по одной строке в нижнем регистре
+            emotion = self._analyze_emotion(text_lower)
+            results.append({
+                "theme": theme,
+                "confidence": float(confidence),
                 "emotion": emotion,
-                "products": products,
-                "satisfaction_score": satisfaction,
-                "processed_at": datetime.utcnow().isoformat(),
+                "products": self._extract_products(text_lower),
+                "satisfaction_score": self._estimate_satisfaction(text_lower, emotion),
+                "processed_at": processed_at,
                 "text_length": len(text),
                 "word_count": len(text.split())
-            }
-        except Exception as e:
-            logger.error(f"Ошибка при анализе разговора: {e}")
-            raise
+            })
+        return results
 
     def _preprocess_text(self, text: str) -> str:
         """Предобработка текста"""
         # Здесь используется логика из clean_and_normalize
         return text.lower().strip()
 
-    def _extract_features(self, text: str) -> List[float]:
-        """Извлечение признаков из текста"""
-        if self.vectorizer:
-            return self.vectorizer.transform([text]).toarray()[0]
-        return [len(text), len(text.split())]  # Базовые признаки
+    def _extract_features(self, texts: List[str], vectorizer: Any):
+        """Извлечение признаков из текстов: матрица len(texts)×V без перевода в плотный вид"""
+        return vectorize(vectorizer, texts)
 
-    def _analyze_emotion(self, text: str) -> str:
-        """Анализ эмоциональной окраски"""
-        positive_words = ['хорошо', 'отлично', 'спасибо', 'доволен', 'рад']
-        negative_words = ['плохо', 'ужасно', 'жалоба', 'недоволен', 'проблема']
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+    def _analyze_emotion(self, text_lower: str) -> str:
+        """Анализ эмоциональной окраски текста в нижнем регистре"""
+        positive_count = sum(1 for word in self.POSITIVE_WORDS if word in text_lower)
+        negative_count = sum(1 for word in self.NEGATIVE_WORDS if word in text_lower)
         
         if positive_count > negative_count:
             return "позитивная"
@@ -114,26 +238,14 @@ class NLPService:
         else:
             return "нейтральная"
 
-    def _extract_products(self, text: str) -> List[str]:
-        """Извлечение упоминаний банковских продуктов"""
-        products = {
-            'кредит': ['кредит', 'займ', 'ссуда'],
-            'ипотека': ['ипотека', 'жилищный кредит'],
-            'карта': ['карта', 'дебетовая', 'кредитная'],
-            'вклад': ['вклад', 'депозит', 'накопления'],
-            'страхование': ['страховка', 'страхование', 'полис']
-        }
-        
-        found_products = []
-        text_lower = text.lower()
-        
-        for product, keywords in products.items():
-            if any(keyword in text_lower for keyword in keywords):
-                found_products.append(product)
-        
-        return found_products
+    def _extract_products(self, text_lower: str) -> List[str]:
+        """Извлечение упоминаний банковских продуктов из текста в нижнем регистре"""
+        return [
+            product for product, keywords in self.PRODUCT_KEYWORDS.items()
+            if any(keyword in text_lower for keyword in keywords)
+        ]
 
-    def _estimate_satisfaction(self, text: str, emotion: str) -> int:
+    def _estimate_satisfaction(self, text_lower: str, emotion: str) -> int:
         """Оценка удовлетворенности клиента от 1 до 5"""
         base_score = 3
         
@@ -143,11 +255,15 @@ class NLPService:
             base_score -= 1
         
         # Дополнительные факторы
-        if 'спасибо' in text.lower():
+        if 'спасибо' in text_lower:
             base_score += 1
-        if any(word in text.lower() for word in ['жалоба', 'недоволен', 'ужасно']):
+        if any(word in text_lower for word in ['жалоба', 'недоволен', 'ужасно']):
             base_score -= 1
         
         return max(1, min(5, base_score))
 
-nlp_service = NLPService()
+nlp_service = NLPService(
+    training_runner.registry,
+    training_runner,
+    retry_after_seconds=settings.MODEL_NOT_READY_RETRY_AFTER_SECONDS,
+)
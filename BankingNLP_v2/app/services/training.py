@@ -0,0 +1,271 @@
+"""
+app/services/training.py
+Переобучение модели в отдельном процессе.
+
+TrainingJobRunner.start() запускает `python -m app.services.training
+--job-id ...` и сразу возвращает статус задачи. Процесс обучения строит
+новую версию в ModelRegistry и переключает указатель CURRENT; воркеры
+подхватывают ее сами (NLPService.watch_model_version), обслуживание
+запросов не прерывается.
+
+Одновременно выполняется не больше одной задачи на каталог моделей:
+воркер берет flock на MODEL_DIR/.training.lock и передает дескриптор
+дочернему процессу, так что блокировка держится, пока жив процесс
+обучения, и снимается ядром при любом его завершении. В файл блокировки
+записываются задача и pid процесса обучения; проверка «идет ли обучение»
+читает их и блокировку не трогает. Статус задачи хранится в
+MODEL_DIR/jobs/<job_id>.json и виден из любого воркера.
+
+Использование:
+    from app.services.training import training_runner
+
+    job = training_runner.start()          # TrainingInProgress, если уже идет
+    training_runner.status(job["job_id"])
+"""
+
+import argparse
+import fcntl
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = ".training.lock"
+JOBS_DIR = "jobs"
+DEFAULT_TRAINER = "app.services.training:train_theme_model"
+
+
+class TrainingInProgress(Exception):
+    """Переобучение уже выполняется."""
+
+    def __init__(self, job_id: Optional[str]):
+        super().__init__(f"Переобучение уже выполняется ({job_id})")
+        self.job_id = job_id
+
+
+class TrainingJobRunner:
+    """Запуск задач обучения и их статус."""
+
+    def __init__(self, registry: ModelRegistry, keep_versions: int = 5, trainer: str = DEFAULT_TRAINER):
+        """
+        Args:
+            registry: Каталог версий модели
+            keep_versions: Сколько последних версий хранить
+            trainer: Функция обучения "модуль:имя", возвращающая модель,
+                векторизатор и метрики; импортируется в процессе задачи
+        """
+        self.registry = registry
+        self.keep_versions = keep_versions
+        self.trainer = trainer
+
+    @property
+    def lock_path(self) -> str:
+        return os.path.join(self.registry.root, LOCK_FILE)
+
+    def job_path(self, job_id: str) -> str:
+        return os.path.join(self.registry.root, JOBS_DIR, f"{job_id}.json")
+
+    def start(self) -> Dict[str, Any]:
+        """Запускает процесс обучения; TrainingInProgress, если он уже идет."""
+        os.makedirs(os.path.join(self.registry.root, JOBS_DIR), exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise TrainingInProgress(self._read_owner()[0])
+
+            job_id = uuid.uuid4().hex[:12]
+            # До запуска процесса владельцем числится текущий воркер
+            self._write_owner(fd, job_id, os.getpid())
+            job = {"job_id": job_id, "state": "queued", "created_at": datetime.utcnow().isoformat()}
+            self._write_status(job)
+
+            try:
+                # Дочерний процесс наследует дескриптор вместе с блокировкой
+                # и тот же путь импорта, что и воркер
+                process = subprocess.Popen(
+                    [
+                        sys.executable, "-m", "app.services.training",
+                        "--job-id", job_id,
+                        "--model-dir", self.registry.root,
+                        "--keep-versions", str(self.keep_versions),
+                        "--trainer", self.trainer,
+                    ],
+                    pass_fds=(fd,),
+                    env={**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)},
+                )
+            except Exception as e:
+                job.update(state="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+                self._write_status(job)
+                raise
+            # Статус дальше пишет только процесс задачи
+            self._write_owner(fd, job_id, process.pid)
+            job["pid"] = process.pid
+        finally:
+            os.close(fd)
+
+        # Завершившийся процесс не должен оставаться зомби
+        threading.Thread(target=process.wait, name=f"training-{job_id}", daemon=True).start()
+        logger.info(f"Запущено переобучение модели: задача {job_id}, pid {process.pid}")
+        return job
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Статус задачи или None, если задача неизвестна."""
+        try:
+            with open(self.job_path(job_id), encoding="utf-8") as fh:
+                job = json.load(fh)
+        except FileNotFoundError:
+            return None
+
+        pid = job.get("pid")
+        if pid is None:
+            # Процесс еще не записал статус: pid из файла блокировки
+            owner_job_id, owner_pid = self._read_owner()
+            pid = owner_pid if owner_job_id == job_id else None
+        if job["state"] in ("queued", "running") and pid is not None and not _process_alive(pid):
+            # Процесс завершился, не записав итог (например, убит по OOM)
+            job.update(state="failed", error="Процесс обучения завершился без результата")
+        return job
+
+    def is_running(self) -> bool:
+        """Жив ли процесс последней запущенной задачи (блокировка не берется)."""
+        _, pid = self._read_owner()
+        return pid is not None and _process_alive(pid)
+
+    def run(self, job_id: str) -> Dict[str, Any]:
+        """Обучение новой версии и переключение указателя (в процессе задачи)."""
+        job = self.status(job_id) or {"job_id": job_id}
+        job.update(state="running", started_at=datetime.utcnow().isoformat(), pid=os.getpid())
+        self._write_status(job)
+
+        started = time.perf_counter()
+        try:
+            module_name, _, function_name = self.trainer.partition(":")
+            trainer: Callable[[], Tuple[Any, Any, Dict[str, Any]]] = getattr(
+                importlib.import_module(module_name), function_name
+            )
+            model, vectorizer, metrics = trainer()
+            version = self.registry.new_version()
+            self.registry.save(version, model, vectorizer, {
+                "trained_at": datetime.utcnow().isoformat(),
+                "job_id": job_id,
+                "metrics": metrics,
+            })
+            self.registry.publish(version)
+            self.registry.prune(self.keep_versions)
+        except Exception as e:
+            logger.error(f"Ошибка задачи обучения {job_id}: {e}")
+            job.update(state="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+            self._write_status(job)
+            raise
+
+        job.update(
+            state="succeeded",
+            version=version,
+            metrics=metrics,
+            duration_seconds=round(time.perf_counter() - started, 1),
+            finished_at=datetime.utcnow().isoformat(),
+        )
+        self._write_status(job)
+        logger.info(f"Задача обучения {job_id} завершена: версия {version}")
+        return job
+
+    def _read_owner(self) -> Tuple[Optional[str], Optional[int]]:
+        """Задача и pid процесса из файла блокировки."""
+        try:
+            with open(self.lock_path, encoding="utf-8") as fh:
+                job_id, pid = fh.read().split()
+            return job_id, int(pid)
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+    @staticmethod
+    def _write_owner(fd: int, job_id: str, pid: int) -> None:
+        """Запись владельца в файл блокировки (дескриптор с flock)."""
+        payload = f"{job_id} {pid}\n".encode()
+        os.pwrite(fd, payload, 0)
+        os.ftruncate(fd, len(payload))
+
+    def _write_status(self, job: Dict[str, Any]) -> None:
+        """Атомарная запись статуса задачи."""
+        path = self.job_path(job["job_id"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(job, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _process_alive(pid: int) -> bool:
+    """Существует ли процесс с указанным pid."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def train_theme_model():
+    """
+    Обучает классификатор тем на транскриптах.
+
+    Returns:
+        Tuple: Модель, TF-IDF векторизатор и метрики обучения
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    from src.data.load_data import load_transcripts
+
+    df = load_transcripts()
+    texts = df["conversation_text"].astype(str).tolist()
+    labels = df["theme"].astype(str).tolist()
+    if len(set(labels)) < 2:
+        raise ValueError("Для обучения нужно хотя бы две темы")
+
+    vectorizer = TfidfVectorizer()
+    features = vectorizer.fit_transform(texts)
+    model = LogisticRegression(max_iter=500)
+    model.fit(features, labels)
+
+    metrics = {
+        "rows": len(texts),
+        "classes": len(model.classes_),
+        "features": len(vectorizer.vocabulary_),
+        "train_accuracy": round(float(model.score(features, labels)), 4),
+    }
+    return model, vectorizer, metrics
+
+
+# Экземпляр на процесс
+training_runner = TrainingJobRunner(ModelRegistry(settings.MODEL_DIR), keep_versions=settings.MODEL_KEEP_VERSIONS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Задача переобучения модели")
+    parser.add_argument("--job-id", required=True, help="Идентификатор задачи")
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR, help="Каталог версий модели")
+    parser.add_argument("--keep-versions", type=int, default=settings.MODEL_KEEP_VERSIONS)
+    parser.add_argument("--trainer", default=DEFAULT_TRAINER, help="Функция обучения модуль:имя")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    runner = TrainingJobRunner(ModelRegistry(args.model_dir), args.keep_versions, args.trainer)
+    try:
+        runner.run(args.job_id)
+    except Exception:
+        sys.exit(1)
@@ -0,0 +1,178 @@
+"""
+benchmarks/inference.py
+Бенчмарк инференса темы одного разговора.
+
+Сравнивает прежний путь NLPService (TF-IDF вектор переводится в плотный
+массив на весь словарь, predict и predict_proba вызываются отдельно) и
+текущий (разреженная строка и один predict_proba из
+app.services.inference) на одних и тех же текстах: задержку на запрос
+(перцентили) и пиковый объем памяти, выделяемой за запрос (tracemalloc).
+Метки обоих путей сверяются. Для пакетов --batch-size текстов
+сравнивается поштучный анализ и один transform + predict_proba на пакет
+(NLPService.analyze_batch).
+
+Модель и векторизатор берутся из --model/--vectorizer; если файлов нет,
+обучается синтетическая модель со словарем --vocab слов, чтобы размер
+плотного вектора соответствовал реальному словарю.
+
+Запуск из корня проекта:
+    python -m benchmarks.inference --requests 2000 --vocab 50000
+    python -m benchmarks.inference --model models/latest_model.joblib --vectorizer models/vectorizer.joblib
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from app.services.inference import predict_labels, vectorize
+
+THEMES = ['информация', 'ипотека', 'жалоба', 'конкурент', 'жизненное событие', 'страхование', 'вклад', 'кредит']
+
+
+def synthetic_texts(count: int, vocab: int, words: int, rng: random.Random) -> Tuple[List[str], List[str]]:
+    """Тексты из слова темы и случайных слов словаря размера vocab"""
+    texts, labels = [], []
+    for _ in range(count):
+        theme = rng.choice(THEMES)
+        body = [f"w{rng.randrange(vocab)}" for _ in range(words)]
+        body[rng.randrange(words)] = theme.replace(' ', '_')
+        texts.append(' '.join(body))
+        labels.append(theme)
+    return texts, labels
+
+
+def load_or_train(args: argparse.Namespace, rng: random.Random) -> Tuple[Any, Any]:
+    """Модель и векторизатор из файлов или синтетические"""
+    if os.path.exists(args.model) and os.path.exists(args.vectorizer):
+        return joblib.load(args.model), joblib.load(args.vectorizer)
+
+    texts, labels = synthetic_texts(args.train_texts, args.vocab, args.words, rng)
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression(max_iter=200)
+    model.fit(vectorizer.fit_transform(texts), labels)
+    return model, vectorizer
+
+
+def dense_two_pass(model: Any, vectorizer: Any, text: str) -> Tuple[str, float]:
+    """Прежний путь: плотный вектор, отдельные predict и predict_proba"""
+    features = vectorizer.transform([text]).toarray()[0]
+    theme = model.predict([features])[0]
+    confidence = max(model.predict_proba([features])[0])
+    return theme, float(confidence)
+
+
+def sparse_single_pass(model: Any, vectorizer: Any, text: str) -> Tuple[str, float]:
+    """Текущий путь NLPService"""
+    themes, confidences = predict_labels(model, vectorize(vectorizer, [text]))
+    return themes[0], confidences[0]
+
+
+def measure(path: Callable, model: Any, vectorizer: Any, texts: List[str], alloc_samples: int) -> Dict[str, Any]:
+    """Задержка на запрос и память, выделяемая за запрос"""
+    for text in texts[:20]:
+        path(model, vectorizer, text)
+
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        path(model, vectorizer, text)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    peaks = []
+    tracemalloc.start()
+    for text in texts[:alloc_samples]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        path(model, vectorizer, text)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    def pick(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e6, 1)
+
+    return {
+        "p50_us": pick(0.50),
+        "p95_us": pick(0.95),
+        "p99_us": pick(0.99),
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+        "alloc_peak_kb_mean": round(sum(peaks) / len(peaks) / 1024, 1),
+        "alloc_peak_kb_max": round(max(peaks) / 1024, 1),
+    }
+
+
+def measure_batches(model: Any, vectorizer: Any, texts: List[str], batch_size: int) -> Dict[str, Any]:
+    """Время пакета: поштучно и одной матричной операцией"""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts) - batch_size + 1, batch_size)]
+    one_by_one, vectorized = [], []
+    for batch in batches:
+        started = time.perf_counter()
+        for text in batch:
+            sparse_single_pass(model, vectorizer, text)
+        one_by_one.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        predict_labels(model, vectorize(vectorizer, batch))
+        vectorized.append(time.perf_counter() - started)
+
+    def median_ms(values: List[float]) -> float:
+        return round(sorted(values)[len(values) // 2] * 1000, 3)
+
+    return {
+        "batch_size": batch_size,
+        "batches": len(batches),
+        "per_item_p50_ms": median_ms(one_by_one),
+        "vectorized_p50_ms": median_ms(vectorized),
+        "speedup": round(median_ms(one_by_one) / median_ms(vectorized), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк инференса темы")
+    parser.add_argument("--requests", type=int, default=2000, help="Количество запросов")
+    parser.add_argument("--model", default="models/latest_model.joblib", help="Файл модели")
+    parser.add_argument("--vectorizer", default="models/vectorizer.joblib", help="Файл векторизатора")
+    parser.add_argument("--vocab", type=int, default=50_000, help="Размер словаря синтетической модели")
+    parser.add_argument("--words", type=int, default=60, help="Слов в синтетическом тексте")
+    parser.add_argument("--train-texts", type=int, default=20_000, help="Текстов для обучения синтетической модели")
+    parser.add_argument("--batch-size", type=int, default=100, help="Размер пакета для сравнения пакетного пути")
+    parser.add_argument("--alloc-samples", type=int, default=200, help="Запросов для замера памяти")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Сохранить отчет в JSON-файл")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    model, vectorizer = load_or_train(args, rng)
+    texts, _ = synthetic_texts(args.requests, args.vocab, args.words, rng)
+
+    dense = [dense_two_pass(model, vectorizer, text) for text in texts[:200]]
+    sparse = [sparse_single_pass(model, vectorizer, text) for text in texts[:200]]
+    assert [theme for theme, _ in dense] == [theme for theme, _ in sparse], "Метки путей различаются"
+    assert all(abs(a - b) < 1e-9 for (_, a), (_, b) in zip(dense, sparse)), "Уверенность путей различается"
+
+    report = {
+        "features": len(vectorizer.vocabulary_),
+        "classes": len(model.classes_),
+        "requests": args.requests,
+        "dense_two_pass": measure(dense_two_pass, model, vectorizer, texts, args.alloc_samples),
+        "sparse_single_pass": measure(sparse_single_pass, model, vectorizer, texts, args.alloc_samples),
+    }
+    report["speedup_p50"] = round(report["dense_two_pass"]["p50_us"] / report["sparse_single_pass"]["p50_us"], 2)
+    report["batch"] = measure_batches(model, vectorizer, texts, args.batch_size)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+tests/conftest.py
+Общие настройки тестов сервиса.
+
+Корень проекта добавляется в путь импорта, чтобы пакет app был доступен
+при запуске `pytest tests/` без установки.
+"""
+
+import os
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 30.0) -> None:
+    """Ожидание условия с опросом; AssertionError по истечении timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"Условие не выполнено за {timeout} с")
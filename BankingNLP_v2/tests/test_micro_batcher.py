@@ -0,0 +1,85 @@
+"""
+tests/test_micro_batcher.py
+Тесты объединения одновременных запросов /analyze в пакеты.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services.micro_batcher import MicroBatcher
+
+
+class RecordingHandler:
+    """Пакетный обработчик, запоминающий состав пакетов."""
+
+    def __init__(self, failing: Optional[str] = None):
+        self.batches: List[List[str]] = []
+        self.failing = failing
+
+    async def __call__(self, texts: List[str]) -> List[Dict[str, Any]]:
+        self.batches.append(list(texts))
+        if self.failing in texts:
+            raise ValueError(f"Ошибка анализа: {self.failing}")
+        return [{"theme": text} for text in texts]
+
+
+def test_results_in_order_across_size_and_window_flush():
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler, window_seconds=0.01, max_batch_size=4)
+    texts = [f"текст {i}" for i in range(6)]
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(text) for text in texts))
+
+    results = asyncio.run(scenario())
+
+    assert [result["theme"] for result in results] == texts
+    assert handler.batches == [texts[:4], texts[4:]]
+    stats = batcher.stats()
+    assert stats["flush_reasons"] == {"size": 1, "window": 1}
+    assert stats["items"] == 6
+    assert stats["batch_sizes"]["le_2"] == 1 and stats["batch_sizes"]["le_4"] == 1
+
+
+def test_failing_item_does_not_fail_neighbours():
+    handler = RecordingHandler(failing="плохой")
+    batcher = MicroBatcher(handler, window_seconds=0.01, max_batch_size=8)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit("первый"),
+            batcher.submit("плохой"),
+            batcher.submit("третий"),
+            return_exceptions=True,
+        )
+
+    first, bad, third = asyncio.run(scenario())
+
+    assert first == {"theme": "первый"}
+    assert third == {"theme": "третий"}
+    assert isinstance(bad, ValueError)
+    # Пакет целиком, затем поштучно
+    assert handler.batches == [["первый", "плохой", "третий"], ["первый"], ["плохой"], ["третий"]]
+
+
+def test_disabled_batcher_calls_handler_per_request():
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler, window_seconds=0.01, max_batch_size=8, enabled=False)
+
+    async def scenario():
+        return await asyncio.gather(batcher.submit("а"), batcher.submit("б"))
+
+    results = asyncio.run(scenario())
+
+    assert results == [{"theme": "а"}, {"theme": "б"}]
+    assert handler.batches == [["а"], ["б"]]
+    assert batcher.stats()["batches"] == 0
+
+
+def test_single_item_error_propagates():
+    batcher = MicroBatcher(RecordingHandler(failing="плохой"), window_seconds=0.001)
+
+    with pytest.raises(ValueError):
+        asyncio.run(batcher.submit("плохой"))
@@ -0,0 +1,150 @@
+"""
+tests/test_nlp_service.py
+Тесты фоновой загрузки модели, готовности воркера и быстрого 503.
+"""
+
+import threading
+from typing import Optional
+
+import pytest
+
+from app.services.nlp_service import ModelNotReady, NLPService
+from conftest import wait_for
+
+
+class StubRegistry:
+    """Заглушка ModelRegistry: загрузка ждет gate или завершается ошибкой."""
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.gate = threading.Event()
+        self.error = error
+
+    def load(self, version: Optional[str] = None):
+        if self.error is not None:
+            raise self.error
+        self.gate.wait(timeout=30)
+        return "v1", "model", "vectorizer"
+
+    def current_version(self) -> Optional[str]:
+        return None
+
+
+class StubRunner:
+    """Заглушка TrainingJobRunner, запоминающая запуски обучения."""
+
+    def __init__(self, running: bool = True):
+        self.started = 0
+        self.running = running
+
+    def start(self):
+        self.started += 1
+        return {"job_id": "job", "state": "queued"}
+
+    def is_running(self) -> bool:
+        return self.running
+
+
+class TestModelReadiness:
+
+    def test_not_ready_rejected_until_loaded(self):
+        registry = StubRegistry()
+        service = NLPService(registry, StubRunner(), retry_after_seconds=7)
+        assert service.status()["state"] == "not_loaded"
+
+        # Первый запрос запускает загрузку и сразу получает отказ
+        with pytest.raises(ModelNotReady) as rejected:
+            service.ensure_ready()
+        assert rejected.value.retry_after == 7
+        assert rejected.value.state == "loading"
+        assert service.state == "loading"
+        with pytest.raises(ModelNotReady):
+            service.ensure_ready()
+
+        registry.gate.set()
+        wait_for(lambda: service.is_ready)
+
+        service.ensure_ready()
+        status = service.status()
+        assert status["state"] == "ready"
+        assert status["version"] == "v1"
+        assert status["error"] is None
+
+    def test_failed_load_reported_in_status(self):
+        service = NLPService(StubRegistry(error=RuntimeError("Поврежден файл модели")), StubRunner())
+
+        service.start_loading()
+        wait_for(lambda: service.state == "failed")
+
+        status = service.status()
+        assert status["ready"] is False
+        assert "Поврежден файл модели" in status["error"]
+        with pytest.raises(ModelNotReady) as rejected:
+            service.ensure_ready()
+        assert rejected.value.state == "failed"
+
+    def test_missing_model_starts_training(self):
+        runner = StubRunner()
+        service = NLPService(StubRegistry(error=FileNotFoundError("models/CURRENT")), runner)
+
+        service.start_loading()
+        wait_for(lambda: runner.started == 1)
+        assert service.state == "loading"
+
+        # Обучение завершилось, а версия так и не появилась
+        runner.running = False
+        assert not service.refresh_model()
+        assert service.state == "failed"
+        assert service.status()["error"]
+
+
+class TestHealthEndpoints:
+
+    @pytest.fixture
+    def client(self):
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        # Без контекстного менеджера: startup не запускает загрузку модели
+        return TestClient(app)
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        from app.services.nlp_service import nlp_service
+
+        monkeypatch.setattr(nlp_service, "state", "loading")
+        monkeypatch.setattr(nlp_service, "_artifact", (None, None, None))
+        return nlp_service
+
+    def test_not_ready_returns_503(self, client, service):
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(service.retry_after_seconds)
+        assert response.json()["state"] == "loading"
+
+        # Живость процесса не зависит от загрузки модели
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["ready"] is False
+
+    def test_ready_returns_200(self, client, service, monkeypatch):
+        monkeypatch.setattr(service, "state", "ready")
+        monkeypatch.setattr(service, "_artifact", ("v1", "model", "vectorizer"))
+
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["version"] == "v1"
+        assert client.get("/health").json()["ready"] is True
+
+    def test_analyze_rejected_before_model_loaded(self, client, service):
+        from app.core.config import settings
+        from app.core.security import create_access_token
+
+        response = client.post(
+            f"{settings.API_V1_STR}/nlp/analyze",
+            json={"text": "Хочу оформить кредит"},
+            headers={"Authorization": f"Bearer {create_access_token({'sub': 'tester'})}"},
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(service.retry_after_seconds)
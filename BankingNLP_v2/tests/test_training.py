@@ -0,0 +1,158 @@
+"""
+tests/test_training.py
+Тесты версий модели, задач переобучения и подмены модели в воркере.
+"""
+
+import os
+import signal
+import threading
+import time
+
+import joblib
+import pytest
+
+from app.services.model_registry import ModelRegistry
+from app.services.nlp_service import NLPService
+from app.services.training import TrainingInProgress, TrainingJobRunner
+from conftest import wait_for
+
+
+# Функции обучения для процесса задачи (импортируются по имени "test_training:...")
+def stub_trainer():
+    return {"kind": "model"}, {"kind": "vectorizer"}, {"rows": 1}
+
+
+def slow_trainer():
+    time.sleep(2)
+    return stub_trainer()
+
+
+def crashing_trainer():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+class IdleRunner:
+    """Заглушка TrainingJobRunner без запуска процессов."""
+
+    def is_running(self) -> bool:
+        return False
+
+    def start(self):
+        raise AssertionError("Обучение не должно запускаться")
+
+
+def finished(runner: TrainingJobRunner, job_id: str) -> bool:
+    return runner.status(job_id)["state"] in ("succeeded", "failed")
+
+
+class TestModelRegistry:
+
+    def test_save_publish_load(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        with pytest.raises(FileNotFoundError):
+            registry.load()
+
+        registry.save("v1", {"kind": "model"}, {"kind": "vectorizer"}, {"rows": 1})
+        assert registry.current_version() is None
+        registry.publish("v1")
+
+        assert registry.current_version() == "v1"
+        assert registry.load() == ("v1", {"kind": "model"}, {"kind": "vectorizer"})
+        assert registry.versions() == ["v1"]
+        with pytest.raises(FileNotFoundError):
+            registry.publish("v2")
+
+    def test_legacy_files_without_pointer(self, tmp_path):
+        joblib.dump("model", tmp_path / "latest_model.joblib")
+        joblib.dump("vectorizer", tmp_path / "vectorizer.joblib")
+
+        assert ModelRegistry(str(tmp_path)).load() == ("legacy", "model", "vectorizer")
+
+    def test_prune_keeps_latest_and_current(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        for version in ("v1", "v2", "v3", "v4"):
+            registry.save(version, "model", "vectorizer", {})
+        registry.publish("v1")
+
+        assert registry.prune(2) == ["v2"]
+        assert registry.versions() == ["v1", "v3", "v4"]
+
+
+class TestTrainingJobRunner:
+
+    def test_job_publishes_new_version(self, tmp_path):
+        runner = TrainingJobRunner(ModelRegistry(str(tmp_path)), trainer="test_training:stub_trainer")
+
+        job = runner.start()
+        wait_for(lambda: finished(runner, job["job_id"]))
+
+        status = runner.status(job["job_id"])
+        assert status["state"] == "succeeded"
+        assert runner.registry.current_version() == status["version"]
+        assert runner.registry.load()[1] == {"kind": "model"}
+        # Итог записывается перед выходом процесса
+        wait_for(lambda: not runner.is_running())
+
+    def test_concurrent_start_rejected(self, tmp_path):
+        runner = TrainingJobRunner(ModelRegistry(str(tmp_path)), trainer="test_training:slow_trainer")
+
+        job = runner.start()
+        with pytest.raises(TrainingInProgress) as rejected:
+            runner.start()
+        assert rejected.value.job_id == job["job_id"]
+        assert runner.is_running()
+
+        wait_for(lambda: finished(runner, job["job_id"]))
+        wait_for(lambda: not runner.is_running())
+        assert runner.status(job["job_id"])["state"] == "succeeded"
+
+    def test_status_probe_does_not_block_start(self, tmp_path):
+        runner = TrainingJobRunner(ModelRegistry(str(tmp_path)), trainer="test_training:stub_trainer")
+        stop = threading.Event()
+
+        def probe():
+            # Так опрашивают состояние другие воркеры (refresh_model, статус задачи)
+            while not stop.is_set():
+                runner.is_running()
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        try:
+            for _ in range(3):
+                job = runner.start()
+                wait_for(lambda: finished(runner, job["job_id"]))
+                wait_for(lambda: not runner.is_running())
+        finally:
+            stop.set()
+            prober.join()
+
+    def test_dead_child_reported_failed(self, tmp_path):
+        runner = TrainingJobRunner(ModelRegistry(str(tmp_path)), trainer="test_training:crashing_trainer")
+
+        job = runner.start()
+        wait_for(lambda: finished(runner, job["job_id"]))
+
+        status = runner.status(job["job_id"])
+        assert status["state"] == "failed"
+        assert "без результата" in status["error"]
+        assert runner.registry.current_version() is None
+
+
+class TestModelHotSwap:
+
+    def test_refresh_model_swaps_published_version(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        service = NLPService(registry, IdleRunner())
+        assert not service.refresh_model()
+
+        registry.save("v1", "model-1", "vectorizer-1", {})
+        registry.publish("v1")
+        assert service.refresh_model()
+        assert service.is_ready
+        assert (service.model_version, service.model, service.vectorizer) == ("v1", "model-1", "vectorizer-1")
+
+        registry.save("v2", "model-2", "vectorizer-2", {})
+        registry.publish("v2")
+        assert service.refresh_model()
+        assert (service.model_version, service.model) == ("v2", "model-2")
+        assert not service.refresh_model()
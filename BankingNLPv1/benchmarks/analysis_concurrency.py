@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк конкурентного анализа Banking NLP System
+=================================================
+
+Сравнивает режимы выполнения AnalysisService (inline, thread, process)
+под смешанной нагрузкой: много коротких текстов и доля очень длинных.
+Для каждого режима выводит перцентили задержки по классам текстов
+и задержку event loop — именно она показывает, насколько длинный текст
+тормозит все остальные запросы воркера. Кэш результатов и деградация
+под нагрузкой отключены: иначе повторяющиеся тексты отвечаются из кэша,
+а этапы анализа пропускаются, и режимы сравниваются не на равной работе.
+
+Запуск из корня проекта:
+    python -m benchmarks.analysis_concurrency --requests 400 --large-ratio 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from src.banking_nlp.core.config import AnalysisConfig, CacheConfig, DegradationConfig, ExecutionMode
+from src.banking_nlp.services.analysis import AnalysisRequest, AnalysisService
+
+SAMPLE_PHRASES = [
+    "Хочу оформить потребительский кредит, какие условия?",
+    "Не работает мобильный банк, ошибка при входе.",
+    "Спасибо, все быстро и удобно.",
+    "Интересует срочный вклад с капитализацией.",
+    "Проблема с кредитной картой, списали лишние деньги.",
+]
+
+
+def build_text(target_chars: int, rng: random.Random) -> str:
+    """Сборка текста нужной длины из типовых фраз"""
+    parts: List[str] = []
+    length = 0
+    while length < target_chars:
+        phrase = rng.choice(SAMPLE_PHRASES)
+        parts.append(phrase)
+        length += len(phrase) + 1
+    return " ".join(parts)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Перцентили задержки в миллисекундах"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: List[float], interval: float = 0.001) -> None:
+    """Фоновая задача: насколько позже запланированного просыпается event loop"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_mode(mode: ExecutionMode, args: argparse.Namespace) -> Dict[str, Any]:
+    """Прогон нагрузки для одного режима выполнения"""
+    rng = random.Random(args.seed)
+    service = AnalysisService(
+        AnalysisConfig(
+            execution_mode=mode,
+            max_workers=args.workers,
+            inline_threshold_chars=args.threshold,
+        ),
+        cache_config=CacheConfig(enabled=False),
+        degradation_config=DegradationConfig(enabled=False),
+    )
+
+    # Прогрев пула, чтобы не мерить запуск процессов
+    await service.analyze(AnalysisRequest(text=build_text(args.large_chars, rng)))
+
+    small_text = build_text(args.small_chars, rng)
+    large_text = build_text(args.large_chars, rng)
+    latencies: Dict[str, List[float]] = {"small": [], "large": []}
+
+    async def one_request(kind: str, arrived: float) -> None:
+        # Задержка считается от момента поступления запроса, включая ожидание event loop
+        text = large_text if kind == "large" else small_text
+        await service.analyze(AnalysisRequest(text=text))
+        latencies[kind].append(time.perf_counter() - arrived)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+
+    tasks = []
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        kind = "large" if rng.random() < args.large_ratio else "small"
+        tasks.append(asyncio.create_task(one_request(kind, time.perf_counter())))
+        # Пуассоновский поток запросов с заданной интенсивностью
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await lag_task
+    service.shutdown()
+
+    return {
+        "mode": mode.value,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "small": percentiles(latencies["small"]),
+        "large": percentiles(latencies["large"]),
+        "loop_lag": percentiles(lags),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк режимов выполнения AnalysisService")
+    parser.add_argument("--requests", type=int, default=400, help="Количество запросов")
+    parser.add_argument("--rate", type=float, default=200.0, help="Интенсивность запросов в секунду")
+    parser.add_argument("--large-ratio", type=float, default=0.05, help="Доля длинных текстов")
+    parser.add_argument("--small-chars", type=int, default=200, help="Длина короткого текста")
+    parser.add_argument("--large-chars", type=int, default=200_000, help="Длина длинного текста")
+    parser.add_argument("--threshold", type=int, default=2000, help="Порог inline-анализа в символах")
+    parser.add_argument("--workers", type=int, default=None, help="Размер пула (по умолчанию — число ядер)")
+    parser.add_argument("--modes", nargs="+", default=[m.value for m in ExecutionMode],
+                        choices=[m.value for m in ExecutionMode], help="Режимы для сравнения")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора нагрузки")
+    parser.add_argument("--json", dest="json_path", help="Сохранить отчет в JSON-файл")
+    args = parser.parse_args()
+
+    reports = [asyncio.run(run_mode(ExecutionMode(mode), args)) for mode in args.modes]
+
+    header = f"{'mode':<8} {'class':<9} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        for kind in ("small", "large", "loop_lag"):
+            row = report[kind]
+            if not row.get("count"):
+                continue
+            print(f"{report['mode']:<8} {kind:<9} {row['count']:>6} {row['p50_ms']:>9} "
+                  f"{row['p95_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9}")
+        print(f"{report['mode']:<8} throughput: {report['throughput_rps']} rps, elapsed: {report['elapsed_s']} s")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(reports, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк памяти таблицы разговоров Banking NLP System
+=====================================================
+
+Сравнивает объем таблицы разговоров в памяти при обычном pd.read_csv и
+после загрузки типизированным загрузчиком (категории, уменьшенные целые).
+
+Без --source таблица нужного размера собирается из строк файла данных:
+тексты и справочные колонки берутся из существующих разговоров, а
+идентификаторы клиентов, операторов и метки времени генерируются заново,
+чтобы их количество различных значений соответствовало реальным данным.
+
+Запуск из корня проекта:
+    python -m benchmarks.conversation_memory --rows 10000000
+    python -m benchmarks.conversation_memory --source data/processed/conversations_processed.csv
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from src.banking_nlp.utils.conversation_store import memory_usage_bytes, optimize_dtypes, read_csv_typed
+
+DEFAULT_SAMPLE = "data/processed/conversations_processed.csv"
+
+
+def synthesize(sample_path: str, rows: int, seed: int) -> pd.DataFrame:
+    """Таблица из rows строк в том виде, в каком ее вернул бы pd.read_csv"""
+    rng = np.random.default_rng(seed)
+    sample = pd.read_csv(sample_path, encoding="utf-8-sig")
+    df = sample.iloc[rng.integers(0, len(sample), rows)].reset_index(drop=True)
+
+    minutes = rng.integers(0, 31 * 24 * 60, rows)
+    df["conversation_id"] = np.arange(1, rows + 1)
+    df["client_id"] = pd.Series(rng.integers(10000, 100000, rows)).map("client_{}".format)
+    df["agent_id"] = pd.Series(rng.integers(100, 1000, rows)).map("agent_{}".format)
+    df["timestamp"] = (
+        pd.Timestamp("2025-01-01") + pd.to_timedelta(minutes, unit="min")
+    ).strftime("%Y-%m-%d %H:%M:00")
+    return df
+
+
+def measure(args: argparse.Namespace) -> Dict[str, Any]:
+    """Объем памяти до и после типизации"""
+    started = time.perf_counter()
+    if args.source:
+        plain = pd.read_csv(args.source, encoding="utf-8-sig")
+    else:
+        plain = synthesize(args.sample, args.rows, args.seed)
+    plain_seconds = time.perf_counter() - started
+    before = memory_usage_bytes(plain)
+
+    started = time.perf_counter()
+    if args.source:
+        del plain
+        typed = read_csv_typed(args.source)
+    else:
+        typed = optimize_dtypes(plain)
+    typed_seconds = time.perf_counter() - started
+    after = memory_usage_bytes(typed)
+
+    return {
+        "rows": len(typed),
+        "source": args.source or f"synthetic from {args.sample}",
+        "plain_mb": round(before / 1024 ** 2, 1),
+        "typed_mb": round(after / 1024 ** 2, 1),
+        "reduction": round(before / after, 2),
+        "plain_load_seconds": round(plain_seconds, 2),
+        "typed_seconds": round(typed_seconds, 2),
+        "bytes_per_row": {"plain": round(before / len(typed), 1), "typed": round(after / len(typed), 1)},
+        "dtypes": {column: str(dtype) for column, dtype in typed.dtypes.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Память таблицы разговоров до и после типизации")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Строк в синтетической таблице")
+    parser.add_argument("--sample", default=DEFAULT_SAMPLE, help="CSV, из строк которого собирается таблица")
+    parser.add_argument("--source", default=None, help="Измерить загрузку этого CSV вместо синтетической таблицы")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
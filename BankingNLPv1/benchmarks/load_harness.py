@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный стенд API Banking NLP System
+========================================
+
+Генерирует поток запросов к /api/analyze (v1) или /api/v1/nlp/analyze (v2)
+из разговоров BankingDataGenerator и выводит JSON-отчет: пропускную
+способность, перцентили задержки и долю ошибок.
+
+Поток открытый: момент отправки каждого запроса заранее вычисляется из
+процесса поступления (poisson, burst или constant), и задержка считается
+от запланированного момента, а не от фактической отправки. Поэтому если
+приложение не успевает, это видно в задержке, а не маскируется снижением
+темпа нагрузки. Расписание зависит только от параметров и --seed, поэтому
+отчеты разных коммитов сравнимы; --baseline выводит изменение ключевых
+метрик относительно сохраненного отчета.
+
+Приложение вызывается в процессе через ASGI (httpx.ASGITransport, со
+startup/shutdown обработчиками) или по адресу --url запущенного сервера.
+Для v2 в процессе токен JWT выпускается через create_access_token
+приложения; для сервера по адресу его нужно передать в --token.
+
+Запуск из корня проекта:
+    python -m benchmarks.load_harness --target v1 --arrival poisson --rate 100 --duration 30
+    python -m benchmarks.load_harness --target v1 --url http://127.0.0.1:8000 --arrival burst --json report.json
+    python -m benchmarks.load_harness --target v2 --app-dir ../BankingNLP_v2 --batch-sizes 1 1 1 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.analysis_concurrency import percentiles
+from src.banking_nlp.utils.data_generator import BankingDataGenerator
+
+# Пути анализа одного разговора и пакета для каждой версии API
+TARGETS = {
+    "v1": {"single": "/api/analyze", "batch": "/api/analyze/batch"},
+    "v2": {"single": "/api/v1/nlp/analyze", "batch": "/api/v1/nlp/batch-analyze"},
+}
+
+
+def arrival_offsets(args: argparse.Namespace, rng: random.Random) -> List[float]:
+    """
+    Моменты отправки запросов в секундах от начала прогона
+
+    poisson — экспоненциальные интервалы со средней интенсивностью --rate;
+    burst — пуассоновский поток, в котором каждые --burst-period секунд на
+    --burst-seconds интенсивность умножается на --burst-factor;
+    constant — равные интервалы 1/--rate.
+    """
+    offsets: List[float] = []
+    now = 0.0
+    while now < args.duration and len(offsets) < args.max_requests:
+        rate = args.rate
+        if args.arrival == "burst" and now % args.burst_period < args.burst_seconds:
+            rate *= args.burst_factor
+        if args.arrival == "constant":
+            now += 1.0 / rate
+        else:
+            now += rng.expovariate(rate)
+        if now < args.duration:
+            offsets.append(now)
+    return offsets
+
+
+def build_texts(args: argparse.Namespace, rng: random.Random) -> List[str]:
+    """
+    Тексты запросов с заданным распределением длины
+
+    generator — тексты разговоров как есть; lognormal — длина в символах
+    из логнормального распределения с медианой --text-median и параметром
+    --text-sigma, текст набирается из разговоров генератора.
+    """
+    random.seed(args.seed)
+    generator = BankingDataGenerator()
+    pool = [generator.generate_conversation(i + 1)["conversation_text"] for i in range(args.text_pool)]
+    if args.text_length == "generator":
+        return pool
+
+    texts = []
+    for _ in range(args.text_pool):
+        target = max(1, int(rng.lognormvariate(math.log(args.text_median), args.text_sigma)))
+        parts: List[str] = []
+        length = 0
+        while length < target:
+            part = rng.choice(pool)
+            parts.append(part)
+            length += len(part) + 1
+        texts.append(" ".join(parts)[:target])
+    return texts
+
+
+def build_schedule(args: argparse.Namespace) -> List[Tuple[float, List[str]]]:
+    """Расписание: момент отправки и тексты запроса (один или пакет)"""
+    rng = random.Random(args.seed)
+    texts = build_texts(args, rng)
+    return [
+        (offset, [rng.choice(texts) for _ in range(rng.choice(args.batch_sizes))])
+        for offset in arrival_offsets(args, rng)
+    ]
+
+
+def request_body(target: str, texts: List[str]) -> Tuple[str, Any]:
+    """Путь и тело запроса для одного текста или пакета"""
+    paths = TARGETS[target]
+    if len(texts) == 1:
+        return paths["single"], {"text": texts[0]}
+    if target == "v2":
+        return paths["batch"], {"conversations": [{"text": text} for text in texts]}
+    return paths["batch"], [{"text": text} for text in texts]
+
+
+def load_app(args: argparse.Namespace) -> Tuple[Any, Dict[str, str]]:
+    """Приложение для вызова в процессе и заголовки авторизации"""
+    if args.target == "v1":
+        from src.banking_nlp.main import app
+        return app, {}
+
+    # v2 импортируется из своей директории; токен подписывается тем же
+    # секретом, что проверяет приложение в этом процессе
+    sys.path.insert(0, str(Path(args.app_dir).resolve()))
+    from app.core.security import create_access_token
+    from app.main import app
+    return app, {"Authorization": f"Bearer {create_access_token({'sub': 'load-harness'})}"}
+
+
+@contextlib.asynccontextmanager
+async def open_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP-клиент к серверу по адресу или к приложению в процессе"""
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+        async with httpx.AsyncClient(base_url=args.url, headers=headers, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+
+    app, headers = load_app(args)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-harness",
+                                     headers=headers, timeout=timeout) as client:
+            yield client
+
+
+async def run_schedule(args: argparse.Namespace, schedule: List[Tuple[float, str, Any, int]]) -> Dict[str, Any]:
+    """
+    Отправка запросов расписания и сбор отчета
+
+    Args:
+        args: Параметры клиента (--target, --url, --timeout, --warmup, ...)
+        schedule: Момент отправки, путь, тело и количество разговоров в запросе
+
+    Returns:
+        Dict: Отчет с пропускной способностью, задержками и ошибками
+    """
+    if not schedule:
+        raise ValueError("Расписание пустое")
+    batch_path = TARGETS[args.target]["batch"]
+    latencies: Dict[str, List[float]] = {"single": [], "batch": []}
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    conversations = 0
+
+    async with open_client(args) as client:
+        for _ in range(args.warmup):
+            _, path, body, _ = schedule[0]
+            await client.post(path, json=body)
+
+        async def send(started: float, offset: float, path: str, body: Any, count: int) -> None:
+            nonlocal conversations
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response = await client.post(path, json=body)
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+                return
+            latencies["batch" if path == batch_path else "single"].append(time.perf_counter() - started - offset)
+            statuses[str(response.status_code)] += 1
+            if response.is_success:
+                conversations += count
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(started, *request) for request in schedule))
+        elapsed = time.perf_counter() - started
+
+    total = len(schedule)
+    span = schedule[-1][0]
+    failed = sum(count for code, count in statuses.items() if not code.startswith("2")) + sum(errors.values())
+    return {
+        "meta": {
+            "target": args.target,
+            "mode": f"url {args.url}" if args.url else "asgi",
+            "commit": git_commit(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "params": {key: value for key, value in vars(args).items()
+                       if key not in ("json_path", "baseline", "token")},
+        },
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "offered_rps": round(total / span, 1) if span else None,
+        "throughput_rps": round((total - failed) / elapsed, 1) if elapsed else 0.0,
+        "conversations_per_s": round(conversations / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "status_codes": dict(sorted(statuses.items())),
+        "transport_errors": dict(errors),
+        "latency": percentiles(latencies["single"] + latencies["batch"]),
+        "latency_single": percentiles(latencies["single"]),
+        "latency_batch": percentiles(latencies["batch"]),
+    }
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    """Прогон синтетического расписания"""
+    schedule = []
+    for offset, texts in build_schedule(args):
+        path, body = request_body(args.target, texts)
+        schedule.append((offset, path, body, len(texts)))
+    if not schedule:
+        raise ValueError("Расписание пустое: увеличьте --rate или --duration")
+    return await run_schedule(args, schedule)
+
+
+def git_commit() -> Optional[str]:
+    """Текущий коммит репозитория, если он доступен"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Изменение ключевых метрик относительно отчета baseline"""
+    def delta(current: Optional[float], previous: Optional[float]) -> Optional[str]:
+        if current is None or not previous:
+            return None
+        return f"{(current - previous) / previous * 100:+.1f}%"
+
+    return {
+        "baseline_commit": baseline["meta"].get("commit"),
+        "throughput_rps": delta(report["throughput_rps"], baseline["throughput_rps"]),
+        "p50_ms": delta(report["latency"].get("p50_ms"), baseline["latency"].get("p50_ms")),
+        "p95_ms": delta(report["latency"].get("p95_ms"), baseline["latency"].get("p95_ms")),
+        "p99_ms": delta(report["latency"].get("p99_ms"), baseline["latency"].get("p99_ms")),
+        "error_rate": f"{report['error_rate'] - baseline['error_rate']:+.4f}",
+    }
+
+
+def add_client_arguments(parser: argparse.ArgumentParser) -> None:
+    """Аргументы выбора приложения, клиента и отчета"""
+    parser.add_argument("--target", choices=sorted(TARGETS), default="v1", help="Версия API")
+    parser.add_argument("--url", default=None, help="Адрес запущенного сервера (по умолчанию — ASGI в процессе)")
+    parser.add_argument("--token", default=None, help="JWT для v2 при работе по --url")
+    parser.add_argument("--app-dir", default="../BankingNLP_v2", help="Корень проекта v2 для вызова в процессе")
+    parser.add_argument("--connections", type=int, default=100, help="Соединений к серверу по --url")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Таймаут запроса в секундах")
+    parser.add_argument("--warmup", type=int, default=5, help="Прогревочных запросов перед замером")
+    parser.add_argument("--json", dest="json_path", help="Сохранить отчет в JSON-файл")
+    parser.add_argument("--baseline", default=None, help="Отчет предыдущего прогона для сравнения")
+
+
+def emit_report(args: argparse.Namespace, report: Dict[str, Any]) -> None:
+    """Сравнение с --baseline, вывод и сохранение отчета"""
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            report["comparison"] = compare(report, json.load(fh))
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный стенд API анализа разговоров")
+    add_client_arguments(parser)
+    parser.add_argument("--arrival", choices=["poisson", "burst", "constant"], default="poisson",
+                        help="Процесс поступления запросов")
+    parser.add_argument("--rate", type=float, default=50.0, help="Средняя интенсивность, запросов в секунду")
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность расписания в секундах")
+    parser.add_argument("--max-requests", type=int, default=100_000, help="Предел количества запросов")
+    parser.add_argument("--burst-factor", type=float, default=10.0, help="Во сколько раз растет интенсивность во всплеске")
+    parser.add_argument("--burst-seconds", type=float, default=1.0, help="Длительность всплеска")
+    parser.add_argument("--burst-period", type=float, default=5.0, help="Период всплесков")
+    parser.add_argument("--text-length", choices=["generator", "lognormal"], default="generator",
+                        help="Распределение длины текстов")
+    parser.add_argument("--text-median", type=int, default=300, help="Медиана длины текста в символах (lognormal)")
+    parser.add_argument("--text-sigma", type=float, default=1.0, help="Параметр sigma логнормального распределения")
+    parser.add_argument("--text-pool", type=int, default=500, help="Количество различных текстов")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1],
+                        help="Размеры пакетов, из которых равновероятно выбирается размер запроса (1 — одиночный)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора нагрузки")
+    args = parser.parse_args()
+
+    emit_report(args, asyncio.run(run_load(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Воспроизведение записанного трафика Banking NLP System
+======================================================
+
+Читает файлы записи TrafficCaptureMiddleware (v1 — CAPTURE__ENABLED, v2 —
+CAPTURE_ENABLED) и отправляет записанные запросы с исходными интервалами,
+ускоренными в --speed раз, в приложение в процессе или по --url. Запросы
+разных файлов (воркеров) сливаются по времени поступления; порядок и
+интервалы определяются только записью, поэтому повторные прогоны одного
+файла сравнимы между коммитами. Отчет — как у benchmarks.load_harness.
+
+Записи v1 и v2 различаются путями, поэтому воспроизводятся только запросы
+к маршрутам --target.
+
+Запуск из корня проекта:
+    python -m benchmarks.replay_capture logs/traffic_capture.ndjson.gz --speed 1
+    python -m benchmarks.replay_capture capture-*.ndjson.gz --speed 10 --url http://127.0.0.1:8000 --json replay.json
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.load_harness import TARGETS, add_client_arguments, emit_report, run_schedule
+
+
+def read_capture(paths: List[str]) -> List[Dict[str, Any]]:
+    """Записи всех файлов в порядке поступления"""
+    records = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            records.extend(json.loads(line) for line in fh if line.strip())
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def conversations_in(body: Any) -> int:
+    """Количество разговоров в теле запроса"""
+    if isinstance(body, list):
+        return len(body)
+    if isinstance(body, dict) and isinstance(body.get("conversations"), list):
+        return len(body["conversations"])
+    return 1
+
+
+def build_replay(records: List[Dict[str, Any]], target: str, speed: float,
+                 limit: int = 0) -> List[Tuple[float, str, Any, int]]:
+    """
+    Расписание воспроизведения
+
+    Args:
+        records: Записи в порядке поступления
+        target: Версия API, запросы к другим маршрутам пропускаются
+        speed: Во сколько раз сжимаются интервалы между запросами
+        limit: Максимум запросов (0 — все)
+
+    Returns:
+        List: Момент отправки, путь, тело и количество разговоров
+    """
+    paths = set(TARGETS[target].values())
+    records = [record for record in records if record["path"] in paths]
+    if limit:
+        records = records[:limit]
+    if not records:
+        return []
+    first = records[0]["ts"]
+    return [
+        ((record["ts"] - first) / speed, record["path"], record["body"], conversations_in(record["body"]))
+        for record in records
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизведение записанного трафика анализа")
+    parser.add_argument("capture", nargs="+", help="Файлы записи (gzip NDJSON)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Ускорение относительно записи (1 — исходный темп)")
+    parser.add_argument("--limit", type=int, default=0, help="Воспроизвести только первые N запросов")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed должен быть положительным")
+
+    records = read_capture(args.capture)
+    schedule = build_replay(records, args.target, args.speed, args.limit)
+    if not schedule:
+        parser.error(f"В записи нет запросов к маршрутам {args.target}")
+
+    report = asyncio.run(run_schedule(args, schedule))
+    report["capture"] = {
+        "files": args.capture,
+        "recorded_requests": len(records),
+        "recorded_span_s": round(records[-1]["ts"] - records[0]["ts"], 3),
+        "speed": args.speed,
+    }
+    emit_report(args, report)
+
+
+if __name__ == "__main__":
+    main()
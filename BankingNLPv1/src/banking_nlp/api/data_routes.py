@@ -0,0 +1,178 @@
+"""
+API маршруты данных разговоров
+=============================
+
+Постраничная выдача сгенерированных разговоров, сведения о данных и
+аналитика. Таблица хранится в памяти DataInitializer, поэтому стоимость
+запроса страницы зависит от ее размера, а не от размера файла; строки
+отдаются потоком в формате JSON или NDJSON.
+"""
+
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..core.config import get_settings
+from ..utils.data_initializer import DataInitializer
+from .streaming import NDJSON_MEDIA_TYPE
+
+logger = logging.getLogger(__name__)
+
+# Создание роутера
+router = APIRouter(prefix="/data")
+
+# Инициализатор данных с кэшем таблицы разговоров
+data_initializer = DataInitializer()
+
+_settings = get_settings().data
+
+
+def encode_cursor(version: str, offset: int) -> str:
+    """Курсор следующей страницы: версия данных и смещение"""
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Разбор курсора страницы
+
+    Raises:
+        ValueError: Курсор поврежден
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, offset = base64.urlsafe_b64decode(padded).decode("ascii").rsplit(":", 1)
+        return version, int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Некорректный курсор")
+
+
+async def _iter_rows(page: pd.DataFrame) -> AsyncIterator[bytes]:
+    """Строки страницы в виде объектов JSON"""
+    if page.empty:
+        return
+    for line in page.to_json(orient="records", lines=True, force_ascii=False).splitlines():
+        yield line.encode("utf-8")
+
+
+async def _json_body(header: dict, rows: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Объект JSON, массив conversations которого выводится построчно"""
+    head = json.dumps(header, ensure_ascii=False)
+    yield head[:-1].encode("utf-8") + b', "conversations": ['
+    first = True
+    async for row in rows:
+        yield row if first else b"," + row
+        first = False
+    yield b"]}"
+
+
+async def _ndjson_body(rows: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    async for row in rows:
+        yield row + b"\n"
+
+
+@router.get("/conversations")
+async def get_conversations(
+    request: Request,
+    limit: int = Query(_settings.default_page_size, ge=1, le=_settings.max_page_size),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор next_cursor предыдущей страницы"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="Формат ответа"),
+):
+    """
+    Постраничное получение разговоров
+
+    Страница задается смещением offset или курсором из предыдущего ответа.
+    Курсор привязан к версии данных: если файл обновился, возвращается 409
+    и выдачу нужно начать заново. Формат NDJSON выбирается параметром
+    format=ndjson или заголовком Accept: application/x-ndjson; сведения о
+    странице в этом случае передаются заголовками X-Total-Count и X-Next-Cursor.
+    """
+    expected_version = None
+    if cursor is not None:
+        try:
+            expected_version, offset = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        page, total, version = await data_initializer.get_conversations_page(offset, limit)
+    except Exception as e:
+        logger.error(f"Ошибка получения данных разговоров: {e}")
+        return {
+            "status": "error",
+            "error": str(e),
+            "message": "Ошибка получения данных"
+        }
+
+    if expected_version is not None and expected_version != version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Данные обновились, начните выдачу с первой страницы"
+        )
+
+    next_offset = offset + len(page) if offset + len(page) < total else None
+    next_cursor = encode_cursor(version, next_offset) if next_offset is not None else None
+
+    if format is None:
+        format = "ndjson" if NDJSON_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+
+    if format == "ndjson":
+        headers = {"X-Total-Count": str(total)}
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+        return StreamingResponse(_ndjson_body(_iter_rows(page)), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    header = {
+        "status": "success",
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "total_returned": len(page),
+        "next_offset": next_offset,
+        "next_cursor": next_cursor,
+        "message": f"Возвращено {len(page)} разговоров",
+    }
+    return StreamingResponse(_json_body(header, _iter_rows(page)), media_type="application/json")
+
+
+@router.get("/ready")
+async def get_data_readiness():
+    """
+    Готовность и свежесть данных
+
+    503, пока данных нет совсем (идет первая генерация); устаревшие данные
+    обслуживаются с stale=true, пока фоновое обновление не подменит их.
+    """
+    readiness = await data_initializer.get_readiness()
+    status_code = status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=readiness)
+
+
+@router.get("/info")
+async def get_data_info():
+    """Получение информации о доступных данных"""
+    return await data_initializer.get_data_info()
+
+
+@router.get("/analytics")
+async def get_data_analytics():
+    """Получение аналитических данных"""
+    try:
+        return {
+            "status": "success",
+            "analytics": await data_initializer.get_data_analytics(),
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
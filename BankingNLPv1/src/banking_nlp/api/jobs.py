@@ -0,0 +1,89 @@
+"""
+API маршруты фоновых заданий
+===========================
+
+Endpoints для постановки пакетного анализа в очередь, отслеживания
+прогресса, отмены и постраничного получения результатов.
+"""
+
+import logging
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from ..services.jobs import JobInfo, JobResultsPage, JobService, JobSubmitRequest
+from .routes import admission_controller, analysis_service
+
+logger = logging.getLogger(__name__)
+
+# Создание роутера
+router = APIRouter(prefix="/jobs")
+
+# Инициализация сервиса
+job_service = JobService(analysis_service)
+
+
+@router.post("", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: JobSubmitRequest):
+    """
+    Создание задания пакетного анализа
+    """
+    async with admission_controller.admit("jobs"):
+        try:
+            return await job_service.submit(request)
+        except ValueError as e:
+            logger.warning(f"Ошибка создания задания: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+
+@router.get("", response_model=List[JobInfo])
+async def list_jobs(limit: int = Query(50, ge=1, le=500)):
+    """
+    Список последних заданий
+    """
+    return await job_service.list_jobs(limit)
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """
+    Состояние и прогресс задания
+    """
+    info = await job_service.get(job_id)
+    if info is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задание не найдено")
+    return info
+
+
+@router.get("/{job_id}/results", response_model=JobResultsPage)
+async def get_job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1)):
+    """
+    Постраничное получение результатов задания
+
+    Результаты доступны по мере обработки порций, до завершения задания.
+    """
+    page = await job_service.results(job_id, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задание не найдено")
+    return page
+
+
+@router.delete("/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """
+    Отмена задания
+
+    Уже сохраненные результаты остаются доступны.
+    """
+    info = await job_service.get(job_id)
+    if info is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задание не найдено")
+    if not await job_service.cancel(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Задание уже завершено со статусом {info.status.value}"
+        )
+    return await job_service.get(job_id)
@@ -6,12 +6,22 @@ API маршруты Banking NLP System
 включая классификацию тематик, анализ продуктов и эмоций.
 """
 
+import asyncio
 import logging
-from typing import List
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, List
+from fastapi import APIRouter, HTTPException, Request, status
 
+from ..core.admission import AdmissionController
+from ..core.config import get_settings
 from ..services.analysis import AnalysisService, AnalysisRequest, AnalysisResult
 from ..services.health import HealthService
+from .streaming import (
+    NDJSON_MEDIA_TYPE,
+    NDJSONStreamingResponse,
+    iter_ndjson_lines,
+    make_decompressor,
+    stream_analysis,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +31,8 @@ router = APIRouter()
 # Инициализация сервисов
 analysis_service = AnalysisService()
 health_service = HealthService()
+admission_controller = AdmissionController()
+analysis_service.degradation.bind_queue_depth(admission_controller.queue_depth)
 
 
 @router.post("/analyze", response_model=AnalysisResult)
@@ -28,32 +40,33 @@ async def analyze_conversation(request: AnalysisRequest):
     """
     Анализ банковского разговора
     """
-    try:
-        logger.info(f"Получен запрос на анализ текста длиной {len(request.text)} символов")
+    async with admission_controller.admit("analyze"):
+        try:
+            logger.info(f"Получен запрос на анализ текста длиной {len(request.text)} символов")
+
+            if not request.text.strip():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Текст для анализа не может быть пустым"
+                )
+
+            result = await analysis_service.analyze(request)
 
-        if not request.text.strip():
+            logger.info(f"Анализ завершен. Найдено тематик: {len(result.themes)}, продуктов: {len(result.products)}")
+            return result
+
+        except ValueError as e:
+            logger.warning(f"Ошибка валидации данных: {e}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Текст для анализа не может быть пустым"
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Ошибка анализа: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Ошибка анализа: {str(e)}"
             )
-
-        result = await analysis_service.analyze(request)
-
-        logger.info(f"Анализ завершен. Найдено тематик: {len(result.themes)}, продуктов: {len(result.products)}")
-        return result
-
-    except ValueError as e:
-        logger.warning(f"Ошибка валидации данных: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        logger.error(f"Ошибка анализа: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ошибка анализа: {str(e)}"
-        )
 
 
 @router.post("/analyze/batch", response_model=List[AnalysisResult])
@@ -61,40 +74,65 @@ async def analyze_conversations_batch(requests: List[AnalysisRequest]):
     """
     Пакетный анализ нескольких разговоров
     """
-    try:
-        logger.info(f"Получен пакетный запрос на анализ {len(requests)} разговоров")
+    async with admission_controller.admit("batch"):
+        try:
+            logger.info(f"Получен пакетный запрос на анализ {len(requests)} разговоров")
+
+            if len(requests) > 100:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Максимальное количество разговоров в пакете: 100"
+                )
 
-        if len(requests) > 100:
+            results = []
+            for i, request in enumerate(requests):
+                try:
+                    result = await analysis_service.analyze(request)
+                    results.append(result)
+                except Exception as e:
+                    logger.error(f"Ошибка анализа разговора {i}: {e}")
+                    error_result = AnalysisResult(
+                        themes=[],
+                        products=[],
+                        emotions={},
+                        confidence=0.0,
+                        error=str(e)
+                    )
+                    results.append(error_result)
+
+            logger.info(f"Пакетный анализ завершен. Обработано: {len(results)} разговоров")
+            return results
+
+        except Exception as e:
+            logger.error(f"Ошибка пакетного анализа: {e}")
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Максимальное количество разговоров в пакете: 100"
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Ошибка пакетного анализа: {str(e)}"
             )
 
-        results = []
-        for i, request in enumerate(requests):
-            try:
-                result = await analysis_service.analyze(request)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Ошибка анализа разговора {i}: {e}")
-                error_result = AnalysisResult(
-                    themes=[],
-                    products=[],
-                    emotions={},
-                    confidence=0.0,
-                    error=str(e)
-                )
-                results.append(error_result)
 
-        logger.info(f"Пакетный анализ завершен. Обработано: {len(results)} разговоров")
-        return results
+@router.post("/analyze/stream", response_class=NDJSONStreamingResponse)
+async def analyze_conversations_stream(request: Request):
+    """
+    Потоковый анализ разговоров в формате NDJSON
 
-    except Exception as e:
-        logger.error(f"Ошибка пакетного анализа: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ошибка пакетного анализа: {str(e)}"
-        )
+    Тело запроса — NDJSON, по одному AnalysisRequest в строке, при
+    необходимости сжатое (Content-Encoding: gzip или zstd). Результаты
+    возвращаются NDJSON-потоком в порядке входных строк по мере готовности;
+    каждая строка ответа содержит поле index с номером входной строки.
+    """
+    streaming_config = get_settings().streaming
+    decompressor = make_decompressor(request.headers.get("content-encoding"))
+    logger.info("Получен потоковый запрос на анализ")
+
+    # Слот занят на все время потока и освобождается после отправки ответа
+    await admission_controller.acquire("stream")
+    lines = iter_ndjson_lines(request, decompressor, streaming_config.max_line_bytes)
+    return NDJSONStreamingResponse(
+        stream_analysis(lines, analysis_service, streaming_config.max_concurrency),
+        media_type=NDJSON_MEDIA_TYPE,
+        on_close=admission_controller.release,
+    )
 
 
 @router.get("/themes", response_model=List[str])
@@ -129,6 +167,36 @@ async def get_available_products():
         )
 
 
+@router.get("/lexicons")
+async def get_lexicons() -> Dict[str, Any]:
+    """
+    Активная и доступные версии словарей анализа
+    """
+    return {
+        "active": analysis_service.lexicon_version,
+        "versions": await asyncio.to_thread(analysis_service.available_lexicons),
+    }
+
+
+@router.post("/lexicons/{version}/activate")
+async def activate_lexicon(version: str) -> Dict[str, Any]:
+    """
+    Переключение активной версии словарей без перезапуска
+
+    Текущий воркер переключается сразу, остальные — при следующей
+    проверке файла ACTIVE (LEXICON__RELOAD_INTERVAL_SECONDS).
+    """
+    try:
+        lexicon = await asyncio.to_thread(analysis_service.activate_lexicon, version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        logger.warning(f"Ошибка активации словарей {version}: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {"active": lexicon.version, "fingerprint": lexicon.fingerprint}
+
+
 @router.get("/statistics")
 async def get_system_statistics():
     """
@@ -136,6 +204,9 @@ async def get_system_statistics():
     """
     try:
         stats = await health_service.get_system_statistics()
+        stats["analysis_cache"] = analysis_service.cache.stats()
+        stats["admission"] = admission_controller.stats()
+        stats["degradation"] = analysis_service.degradation.stats()
         return stats
     except Exception as e:
         logger.error(f"Ошибка получения статистики: {e}")
@@ -152,6 +223,7 @@ async def health_check():
     """
     try:
         health_status = await health_service.check_health()
+        health_status["lexicon_version"] = analysis_service.lexicon_version
         return health_status
     except Exception as e:
         logger.error(f"Ошибка проверки здоровья: {e}")
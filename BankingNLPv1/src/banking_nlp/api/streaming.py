@@ -0,0 +1,248 @@
+"""
+Потоковый анализ NDJSON Banking NLP System
+=========================================
+
+Чтение NDJSON-потока из тела запроса (в том числе сжатого gzip или zstd),
+конкурентный анализ строк с ограниченным параллелизмом и отдача
+результатов в виде NDJSON по мере готовности. Память сервера не зависит
+от количества строк: одновременно в работе не больше max_concurrency строк.
+"""
+
+import asyncio
+import json
+import logging
+import zlib
+from collections import deque
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+
+from ..services.analysis import AnalysisRequest, AnalysisResult, AnalysisService
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Потоковый ответ, который читает тело запроса во время отправки
+
+    Базовый StreamingResponse параллельно слушает receive() в ожидании
+    отключения клиента и тем самым перехватывает чанки тела запроса.
+    Здесь тело читает сам генератор ответа, а отключение клиента
+    обнаруживается через ClientDisconnect при чтении.
+
+    on_close вызывается после окончания отправки при любом исходе —
+    например, для освобождения слота контроля допуска.
+    """
+
+    def __init__(self, *args, on_close: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except (OSError, ClientDisconnect):
+            logger.warning("Клиент отключился во время потокового анализа")
+        finally:
+            if self.on_close is not None:
+                self.on_close()
+        if self.background is not None:
+            await self.background()
+
+
+# Наибольший объем распакованных данных за один шаг разбора
+DECOMPRESS_STEP_BYTES = 65_536
+# zstandard не ограничивает объем вывода, поэтому вход подается порциями:
+# из 64 байт zstd получается не больше нескольких МБ (RLE-блоки по 128 КБ)
+ZSTD_INPUT_STEP_BYTES = 64
+
+
+class _GzipInflater:
+    """Потоковая распаковка gzip порциями не больше step байт"""
+
+    def __init__(self, step: int = DECOMPRESS_STEP_BYTES):
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.step = step
+
+    def steps(self, data: bytes) -> Iterator[bytes]:
+        while True:
+            output = self._decompressor.decompress(data, self.step)
+            data = self._decompressor.unconsumed_tail
+            if output:
+                yield output
+            # Полный буфер вывода — во внутреннем состоянии могут остаться данные
+            if not data and len(output) < self.step:
+                return
+
+    def flush(self) -> bytes:
+        return self._decompressor.flush()
+
+
+class _ZstdInflater:
+    """Потоковая распаковка zstd малыми порциями входа"""
+
+    def __init__(self, zstandard):
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def steps(self, data: bytes) -> Iterator[bytes]:
+        view = memoryview(data)
+        for start in range(0, len(view), ZSTD_INPUT_STEP_BYTES):
+            output = self._decompressor.decompress(view[start:start + ZSTD_INPUT_STEP_BYTES])
+            if output:
+                yield output
+
+    def flush(self) -> bytes:
+        return b""
+
+
+def make_decompressor(content_encoding: Optional[str]):
+    """
+    Создание потокового декомпрессора по заголовку Content-Encoding
+
+    Args:
+        content_encoding: Значение заголовка (gzip, zstd или пусто)
+
+    Returns:
+        Объект с методами steps(chunk) и flush() или None для несжатого тела
+    """
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return None
+    if encoding in ("gzip", "x-gzip"):
+        return _GzipInflater()
+    if encoding == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Сжатие zstd не поддерживается: не установлен пакет zstandard"
+            )
+        return _ZstdInflater(zstandard)
+
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=f"Неподдерживаемая кодировка тела запроса: {content_encoding}"
+    )
+
+
+def _check_line(line: bytes, max_line_bytes: int) -> bytes:
+    """Проверка размера строки NDJSON"""
+    if len(line) > max_line_bytes:
+        raise ValueError(f"Строка NDJSON превышает {max_line_bytes} байт")
+    return line
+
+
+async def iter_ndjson_lines(request: Request, decompressor, max_line_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Построчное чтение NDJSON из тела запроса
+
+    Сжатое тело распаковывается порциями ограниченного размера, и каждая
+    порция сразу разбирается на строки, поэтому в памяти одновременно
+    находится не больше одной строки и одной порции — даже для тела с
+    очень высокой степенью сжатия.
+
+    Args:
+        request: HTTP запрос
+        decompressor: Декомпрессор из make_decompressor или None
+        max_line_bytes: Максимальный размер одной строки
+
+    Yields:
+        bytes: Строки без символа перевода строки
+
+    Raises:
+        ValueError: Строка длиннее max_line_bytes
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        pieces = decompressor.steps(chunk) if decompressor is not None else (chunk,)
+        for piece in pieces:
+            buffer += piece
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield _check_line(line, max_line_bytes)
+            _check_line(buffer, max_line_bytes)
+
+    if decompressor is not None:
+        buffer += decompressor.flush()
+    for line in buffer.split(b"\n"):
+        yield _check_line(line, max_line_bytes)
+
+
+async def _analyze_line(service: AnalysisService, index: int, line: bytes) -> bytes:
+    """Анализ одной строки NDJSON с сериализацией результата"""
+    try:
+        request = AnalysisRequest.model_validate_json(line)
+        result = await service.analyze(request)
+    except ValidationError as e:
+        result = AnalysisResult(error=f"Некорректная строка: {e.errors()[0]['msg']}")
+    except Exception as e:
+        logger.error(f"Ошибка анализа строки {index}: {e}")
+        result = AnalysisResult(error=str(e))
+
+    payload = {"index": index, **result.model_dump()}
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+async def stream_analysis(lines: AsyncIterator[bytes], service: AnalysisService,
+                          max_concurrency: int) -> AsyncIterator[bytes]:
+    """
+    Конкурентный анализ потока строк с сохранением порядка
+
+    В работе одновременно не больше max_concurrency строк; пока самая
+    старая строка не готова, новые строки из запроса не читаются, так что
+    медленный клиент или медленный анализ естественно тормозят входной поток.
+
+    Args:
+        lines: Строки NDJSON
+        service: Сервис анализа
+        max_concurrency: Ограничение параллелизма
+
+    Yields:
+        bytes: Строки NDJSON с результатами в порядке входных строк
+    """
+    pending = deque()
+    index = 0
+    processed = 0
+
+    try:
+        try:
+            async for line in lines:
+                if not line.strip():
+                    continue
+
+                pending.append(asyncio.ensure_future(_analyze_line(service, index, line)))
+                index += 1
+
+                if len(pending) >= max_concurrency:
+                    yield await pending.popleft()
+                    processed += 1
+                # Отдаем все уже готовые результаты, не дожидаясь заполнения окна
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+                    processed += 1
+        except ClientDisconnect:
+            raise
+        except Exception as e:
+            logger.warning(f"Ошибка чтения NDJSON потока: {e}")
+            while pending:
+                yield await pending.popleft()
+                processed += 1
+            yield json.dumps({"index": index, "error": str(e)}, ensure_ascii=False).encode("utf-8") + b"\n"
+            return
+
+        while pending:
+            yield await pending.popleft()
+            processed += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        logger.info(f"Потоковый анализ завершен. Обработано строк: {processed}")
@@ -0,0 +1,174 @@
+"""
+Контроль допуска запросов
+========================
+
+Ограничивает количество одновременно выполняющихся запросов анализа в
+воркере. Сверх лимита запросы ждут в ограниченной очереди своего
+маршрута; если очередь заполнена или ожидание затянулось, запрос сразу
+отклоняется с 503 и заголовком Retry-After. Так при всплесках нагрузки
+принятые запросы выполняются с прежней задержкой, а лишние быстро
+получают отказ вместо общего замедления.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from . import metrics
+from .config import AdmissionConfig, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонен из-за перегрузки"""
+
+    def __init__(self, route: str, reason: str, retry_after: int):
+        """
+        Args:
+            route: Маршрут, для которого запрос был отклонен
+            reason: Причина: queue_full или timeout
+            retry_after: Через сколько секунд имеет смысл повторить запрос
+        """
+        super().__init__(f"Сервис перегружен ({route}: {reason})")
+        self.route = route
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Ограничение одновременных запросов с очередями по маршрутам
+
+    Слот освободившегося запроса передается первому ожидающему (FIFO по
+    всем маршрутам), поэтому новые запросы не обгоняют очередь.
+    Рассчитан на использование из одного event loop.
+    """
+
+    def __init__(self, config: Optional[AdmissionConfig] = None):
+        """
+        Args:
+            config: Настройки допуска (по умолчанию — из конфигурации приложения)
+        """
+        self.config = config or get_settings().admission
+        self.in_flight = 0
+        self._waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._queued: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+
+    def queue_limit(self, route: str) -> int:
+        """Максимальная длина очереди маршрута"""
+        return self.config.route_queue_sizes.get(route, self.config.queue_size)
+
+    @asynccontextmanager
+    async def admit(self, route: str) -> AsyncIterator[None]:
+        """
+        Выполнение блока с занятым слотом
+
+        Args:
+            route: Имя маршрута для очереди и метрик
+
+        Raises:
+            AdmissionRejected: Очередь маршрута заполнена или время ожидания истекло
+        """
+        await self.acquire(route)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, route: str) -> None:
+        """
+        Занятие слота; парный вызов release() обязателен
+
+        Raises:
+            AdmissionRejected: Очередь маршрута заполнена или время ожидания истекло
+        """
+        if not self.config.enabled:
+            return
+
+        if self.in_flight < self.config.max_in_flight and not self._waiters:
+            self._take_slot()
+            metrics.ADMISSION_WAIT_SECONDS.labels(route).observe(0.0)
+            return
+
+        if self._queued.get(route, 0) >= self.queue_limit(route):
+            self._reject(route, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (route, future)
+        self._waiters.append(entry)
+        self._change_queued(route, 1)
+        started = time.perf_counter()
+
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.config.queue_timeout_seconds)
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if not done:
+            self._abandon(entry)
+            self._reject(route, "timeout")
+
+        # Слот уже передан этому запросу в release()
+        metrics.ADMISSION_WAIT_SECONDS.labels(route).observe(time.perf_counter() - started)
+
+    def release(self) -> None:
+        """Освобождение слота с передачей первому ожидающему"""
+        if not self.config.enabled:
+            return
+
+        while self._waiters:
+            route, future = self._waiters.popleft()
+            self._change_queued(route, -1)
+            if not future.done():
+                future.set_result(None)
+                return  # слот переходит ожидающему, in_flight не меняется
+
+        self.in_flight -= 1
+        metrics.ADMISSION_IN_FLIGHT.dec()
+
+    def queue_depth(self) -> int:
+        """Общее количество запросов в очередях ожидания"""
+        return len(self._waiters)
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущее состояние контроля допуска"""
+        return {
+            "enabled": self.config.enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.config.max_in_flight,
+            "queued": dict(self._queued),
+            "rejected": dict(self._rejected),
+        }
+
+    def _take_slot(self) -> None:
+        self.in_flight += 1
+        metrics.ADMISSION_IN_FLIGHT.inc()
+
+    def _abandon(self, entry: Tuple[str, asyncio.Future]) -> None:
+        """Выход из очереди при отмене или таймауте"""
+        route, future = entry
+        if future.done() and not future.cancelled():
+            # Слот был передан в момент отмены — возвращаем его
+            self.release()
+            return
+
+        future.cancel()
+        try:
+            self._waiters.remove(entry)
+            self._change_queued(route, -1)
+        except ValueError:
+            pass
+
+    def _change_queued(self, route: str, delta: int) -> None:
+        self._queued[route] = self._queued.get(route, 0) + delta
+        metrics.ADMISSION_QUEUE_DEPTH.labels(route).inc(delta)
+
+    def _reject(self, route: str, reason: str) -> None:
+        self._rejected[route] = self._rejected.get(route, 0) + 1
+        metrics.ADMISSION_REJECTED.labels(route, reason).inc()
+        logger.warning(f"Запрос к {route} отклонен: {reason}, выполняется {self.in_flight}")
+        raise AdmissionRejected(route, reason, self.config.retry_after_seconds)
@@ -0,0 +1,200 @@
+"""
+Запись трафика анализа Banking NLP System
+=========================================
+
+Необязательная ASGI middleware: выборка тел запросов к маршрутам анализа
+пишется в файл NDJSON, сжатый gzip, для последующего воспроизведения
+(benchmarks/replay_capture.py). Все строки тела перед записью проходят
+через mask_personal_data, поэтому в файл не попадают телефоны, email,
+номера карт и имена.
+
+Каждая строка файла — запрос: время поступления (Unix time), метод, путь,
+статус, длительность и анонимизированное тело. Записи копятся в очереди и
+раз в flush_interval_seconds дописываются фоновым потоком одним
+gzip-фрагментом через O_APPEND, поэтому несколько воркеров могут писать в
+один файл, а gzip.open читает его целиком. Если очередь заполнена, запись
+отбрасывается, а запрос обслуживается как обычно. Middleware передает
+тело как есть: разбор JSON и анонимизация выполняются в потоке записи,
+а не в event loop.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.preprocessing import mask_personal_data
+from .config import CaptureConfig
+from .metrics import TRAFFIC_CAPTURE_RECORDS
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_WRITTEN = TRAFFIC_CAPTURE_RECORDS.labels(result="written")
+CAPTURE_DROPPED = TRAFFIC_CAPTURE_RECORDS.labels(result="dropped")
+
+
+def anonymize_payload(value: Any) -> Any:
+    """Тело запроса, в котором все строки прошли через mask_personal_data"""
+    if isinstance(value, str):
+        return mask_personal_data(value)
+    if isinstance(value, list):
+        return [anonymize_payload(item) for item in value]
+    if isinstance(value, dict):
+        return {key: anonymize_payload(item) for key, item in value.items()}
+    return value
+
+
+class CaptureWriter:
+    """Фоновая дозапись записей трафика в gzip NDJSON файл"""
+
+    def __init__(self, path: str, queue_size: int = 10_000, flush_interval_seconds: float = 1.0):
+        """
+        Args:
+            path: Файл записи
+            queue_size: Максимум записей, ожидающих записи на диск
+            flush_interval_seconds: Период дозаписи накопленных записей
+        """
+        self.path = Path(path)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запуск потока записи"""
+        if self._thread is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"📼 Запись трафика в {self.path}")
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Постановка записи с телом в байтах (поле body) в очередь без ожидания"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            CAPTURE_DROPPED.inc()
+
+    def close(self) -> None:
+        """Запись оставшихся записей и остановка потока"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval_seconds
+            while not stopping:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                else:
+                    batch.append(record)
+            if batch:
+                self._append(batch)
+
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        lines = ""
+        written = 0
+        for record in batch:
+            try:
+                payload = json.loads(record["body"])
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            record["body"] = anonymize_payload(payload)
+            lines += json.dumps(record, ensure_ascii=False) + "\n"
+            written += 1
+        if not written:
+            return
+        member = gzip.compress(lines.encode("utf-8"), mtime=0)
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, member)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось дописать запись трафика: {e}")
+            CAPTURE_DROPPED.inc(written)
+            return
+        CAPTURE_WRITTEN.inc(written)
+
+
+class TrafficCaptureMiddleware:
+    """ASGI middleware выборочной записи запросов анализа
+
+    Тело читается по мере того, как его читает приложение, поэтому запрос
+    не буферизуется повторно; запись ставится в очередь после отправки
+    ответа.
+    """
+
+    def __init__(self, app: ASGIApp, writer: CaptureWriter, config: CaptureConfig):
+        """
+        Args:
+            app: Приложение ASGI
+            writer: Получатель записей
+            config: Доля записываемых запросов, маршруты и предел размера тела
+        """
+        self.app = app
+        self.writer = writer
+        self.sample_rate = config.sample_rate
+        self.paths = frozenset(config.paths)
+        self.max_body_bytes = config.max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths
+                or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.time()
+        start = time.perf_counter()
+        chunks: List[bytes] = []
+        size = 0
+        status_code = 500
+
+        async def receive_wrapper() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request" and size <= self.max_body_bytes:
+                body = message.get("body", b"")
+                size += len(body)
+                chunks.append(body)
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if 0 < size <= self.max_body_bytes:
+                self._record(scope, b"".join(chunks), arrived, status_code, time.perf_counter() - start)
+
+    def _record(self, scope: Scope, body: bytes, arrived: float, status_code: int, elapsed: float) -> None:
+        self.writer.submit({
+            "ts": round(arrived, 6),
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "body": body,
+        })
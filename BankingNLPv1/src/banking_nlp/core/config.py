@@ -8,7 +8,7 @@
 
 import os
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pathlib import Path
 
 from pydantic import BaseModel, Field
@@ -22,6 +22,13 @@ class Environment(str, Enum):
     PRODUCTION = "production"
 
 
+class ExecutionMode(str, Enum):
+    """Режимы выполнения CPU-работы анализа"""
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
 class DatabaseConfig(BaseModel):
     """Конфигурация базы данных"""
     host: str = Field(default="localhost", description="Хост базы данных")
@@ -52,6 +59,125 @@ class MLConfig(BaseModel):
     confidence_threshold: float = Field(default=0.85, description="Порог уверенности модели")
 
 
+class AnalysisConfig(BaseModel):
+    """Конфигурация выполнения анализа текстов"""
+    execution_mode: ExecutionMode = Field(
+        default=ExecutionMode.INLINE,
+        description="Где выполнять анализ: в event loop, в пуле потоков или в пуле процессов"
+    )
+    max_workers: Optional[int] = Field(
+        default=None, ge=1, description="Размер пула (по умолчанию — число ядер CPU)"
+    )
+    inline_threshold_chars: int = Field(
+        default=2000, ge=0, description="Тексты короче порога анализируются прямо в event loop"
+    )
+
+
+class StreamingConfig(BaseModel):
+    """Конфигурация потокового (NDJSON) анализа"""
+    max_concurrency: int = Field(default=16, ge=1, description="Максимум одновременно анализируемых строк")
+    max_line_bytes: int = Field(default=1_048_576, ge=1, description="Максимальный размер одной строки NDJSON")
+
+
+class LexiconConfig(BaseModel):
+    """Конфигурация словарей анализа"""
+    directory: str = Field(default="config/lexicons", description="Директория с версиями словарей")
+    reload_interval_seconds: float = Field(
+        default=5.0, ge=0,
+        description="Как часто проверять смену активной версии другими воркерами (0 — не проверять)"
+    )
+
+
+class CacheConfig(BaseModel):
+    """Конфигурация кэша результатов анализа"""
+    enabled: bool = Field(default=True, description="Включить кэширование результатов")
+    max_entries: int = Field(default=10_000, ge=1, description="Максимальное количество записей")
+    ttl_seconds: float = Field(default=300.0, gt=0, description="Время жизни записи в секундах")
+    max_text_chars: int = Field(
+        default=10_000, ge=1, description="Более длинные тексты не кэшируются"
+    )
+
+
+class AdmissionConfig(BaseModel):
+    """Конфигурация контроля допуска запросов анализа"""
+    enabled: bool = Field(default=True, description="Включить ограничение одновременных запросов")
+    max_in_flight: int = Field(default=32, ge=1, description="Максимум одновременно выполняемых запросов на воркер")
+    queue_size: int = Field(default=64, ge=0, description="Длина очереди ожидания маршрута по умолчанию")
+    route_queue_sizes: Dict[str, int] = Field(
+        default_factory=lambda: {"batch": 8, "stream": 4, "jobs": 16},
+        description="Длина очереди для отдельных маршрутов (analyze, batch, stream, jobs)"
+    )
+    queue_timeout_seconds: float = Field(
+        default=0.5, gt=0, description="Максимальное ожидание в очереди до отказа"
+    )
+    retry_after_seconds: int = Field(default=1, ge=0, description="Значение заголовка Retry-After")
+
+
+class DegradationConfig(BaseModel):
+    """Конфигурация деградации анализа под нагрузкой"""
+    enabled: bool = Field(default=True, description="Отключать необязательные этапы при перегрузке")
+    optional_stages: List[Literal["themes", "products", "emotions"]] = Field(
+        default_factory=lambda: ["emotions", "products"],
+        description="Этапы, пропускаемые в режиме деградации"
+    )
+    queue_depth_threshold: int = Field(
+        default=16, ge=1, description="Глубина очереди допуска, при которой включается деградация"
+    )
+    latency_threshold_seconds: float = Field(
+        default=0.25, gt=0, description="Сглаженное время анализа, при котором включается деградация"
+    )
+    recovery_ratio: float = Field(
+        default=0.5, gt=0, le=1, description="Доля порогов, ниже которой режим выключается"
+    )
+    min_hold_seconds: float = Field(default=5.0, ge=0, description="Минимальное время в режиме деградации")
+    latency_smoothing: float = Field(
+        default=0.2, gt=0, le=1, description="Коэффициент экспоненциального сглаживания задержки"
+    )
+
+
+class MonitoringConfig(BaseModel):
+    """Конфигурация сбора системных метрик"""
+    sample_interval_seconds: float = Field(
+        default=5.0, gt=0, description="Период обновления снимка CPU/памяти/диска"
+    )
+    disk_path: str = Field(default="/", description="Путь, для которого проверяется свободное место")
+
+
+class JobsConfig(BaseModel):
+    """Конфигурация фоновых заданий пакетного анализа"""
+    workers: int = Field(default=1, ge=1, description="Количество фоновых обработчиков заданий")
+    chunk_size: int = Field(default=5000, ge=1, description="Размер порции строк при обработке")
+    max_inline_items: int = Field(default=100_000, ge=1, description="Максимум текстов в задании из тела запроса")
+    max_page_size: int = Field(default=1000, ge=1, description="Максимальный размер страницы результатов")
+
+
+class DataConfig(BaseModel):
+    """Конфигурация хранения и API данных разговоров"""
+    storage_format: Literal["csv", "parquet"] = Field(
+        default="csv", description="Формат файла разговоров (parquet требует pyarrow)"
+    )
+    refresh_after_days: int = Field(default=7, ge=1, description="Возраст данных, после которого они обновляются в фоне")
+    generate_conversations: int = Field(default=1000, ge=1, description="Количество генерируемых разговоров")
+    vectorized_generator: bool = Field(default=False, description="Генерировать данные векторизованно (NumPy)")
+    generation_chunk_size: int = Field(default=100_000, ge=1, description="Строк в одной записываемой части при генерации")
+    default_page_size: int = Field(default=100, ge=1, description="Размер страницы /data/conversations по умолчанию")
+    max_page_size: int = Field(default=1000, ge=1, description="Максимальный размер страницы /data/conversations")
+
+
+class CaptureConfig(BaseModel):
+    """Конфигурация записи трафика для воспроизведения"""
+    enabled: bool = Field(default=False, description="Записывать выборку запросов анализа")
+    path: str = Field(default="logs/traffic_capture.ndjson.gz", description="Файл записи (gzip NDJSON, дозапись)")
+    sample_rate: float = Field(default=0.1, ge=0, le=1, description="Доля записываемых запросов")
+    paths: List[str] = Field(
+        default_factory=lambda: ["/api/analyze", "/api/analyze/batch"],
+        description="Записываемые маршруты (POST с телом JSON)"
+    )
+    max_body_bytes: int = Field(default=1_048_576, ge=1, description="Запросы с телом больше не записываются")
+    queue_size: int = Field(default=10_000, ge=1, description="Максимум записей в очереди на запись")
+    flush_interval_seconds: float = Field(default=1.0, gt=0, description="Период дозаписи в файл")
+
+
 class AppConfig(BaseSettings):
     """Основная конфигурация приложения"""
 
@@ -69,6 +195,16 @@ class AppConfig(BaseSettings):
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     ml: MLConfig = Field(default_factory=MLConfig)
+    analysis: AnalysisConfig = Field(default_factory=AnalysisConfig)
+    streaming: StreamingConfig = Field(default_factory=StreamingConfig)
+    jobs: JobsConfig = Field(default_factory=JobsConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    lexicon: LexiconConfig = Field(default_factory=LexiconConfig)
+    monitoring: MonitoringConfig = Field(default_factory=MonitoringConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    degradation: DegradationConfig = Field(default_factory=DegradationConfig)
+    data: DataConfig = Field(default_factory=DataConfig)
+    capture: CaptureConfig = Field(default_factory=CaptureConfig)
 
     # Настройки логирования
     log_level: str = Field(default="INFO", description="Уровень логирования")
@@ -0,0 +1,200 @@
+"""
+Метрики Banking NLP System
+=========================
+
+Счетчики и гистограммы в формате Prometheus: HTTP запросы, время этапов
+анализа, кэш результатов. Гистограммы имеют фиксированный набор
+интервалов, поэтому занимают постоянный объем памяти независимо от
+количества запросов.
+
+При запуске нескольких воркеров uvicorn/gunicorn задайте переменную
+окружения PROMETHEUS_MULTIPROC_DIR (пустая директория, очищаемая перед
+запуском сервера): каждый процесс пишет значения в свои файлы, а /metrics
+любого воркера отдает сумму по всем процессам.
+"""
+
+import os
+import time
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Интервалы для анализа одного текста: от десятков микросекунд до секунд
+ANALYSIS_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+# Интервалы для HTTP запросов, включая пакетные и потоковые
+HTTP_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+HTTP_REQUESTS = Counter(
+    "banking_nlp_http_requests_total",
+    "Количество HTTP запросов",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "banking_nlp_http_request_duration_seconds",
+    "Время обработки HTTP запроса",
+    ["method", "route"],
+    buckets=HTTP_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "banking_nlp_http_requests_in_progress",
+    "Количество выполняющихся HTTP запросов",
+    multiprocess_mode="livesum",
+)
+
+ANALYSIS_SECONDS = Histogram(
+    "banking_nlp_analysis_duration_seconds",
+    "Время анализа одного текста",
+    ["source"],
+    buckets=ANALYSIS_BUCKETS,
+)
+ANALYSIS_STAGE_SECONDS = Histogram(
+    "banking_nlp_analysis_stage_duration_seconds",
+    "Время этапа анализа одного текста",
+    ["stage"],
+    buckets=ANALYSIS_BUCKETS,
+)
+ANALYSIS_CACHE = Counter(
+    "banking_nlp_analysis_cache_requests_total",
+    "Обращения к кэшу результатов анализа",
+    ["result"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "banking_nlp_admission_in_flight",
+    "Количество запросов, допущенных к выполнению",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "banking_nlp_admission_queue_depth",
+    "Количество запросов в очереди ожидания",
+    ["route"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "banking_nlp_admission_wait_seconds",
+    "Время ожидания в очереди допуска",
+    ["route"],
+    buckets=HTTP_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "banking_nlp_admission_rejected_total",
+    "Запросы, отклоненные из-за перегрузки",
+    ["route", "reason"],
+)
+
+ANALYSIS_DEGRADED = Gauge(
+    "banking_nlp_analysis_degraded",
+    "1, если анализ работает в режиме деградации",
+    multiprocess_mode="livemax",
+)
+ANALYSIS_DEGRADED_RESULTS = Counter(
+    "banking_nlp_analysis_degraded_results_total",
+    "Результаты анализа с пропущенными этапами",
+)
+TRAFFIC_CAPTURE_RECORDS = Counter(
+    "banking_nlp_traffic_capture_records_total",
+    "Записи трафика для воспроизведения",
+    ["result"],
+)
+
+# Заранее созданные серии горячего пути: без поиска по меткам на каждый вызов
+ANALYSIS_COMPUTED = ANALYSIS_SECONDS.labels(source="computed")
+ANALYSIS_CACHED = ANALYSIS_SECONDS.labels(source="cache")
+STAGE_KEYWORDS = ANALYSIS_STAGE_SECONDS.labels(stage="keywords")
+STAGE_THEMES = ANALYSIS_STAGE_SECONDS.labels(stage="themes")
+STAGE_PRODUCTS = ANALYSIS_STAGE_SECONDS.labels(stage="products")
+STAGE_EMOTIONS = ANALYSIS_STAGE_SECONDS.labels(stage="emotions")
+CACHE_HITS = ANALYSIS_CACHE.labels(result="hit")
+CACHE_MISSES = ANALYSIS_CACHE.labels(result="miss")
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Метрики в текстовом формате Prometheus
+
+    Returns:
+        Tuple: Тело ответа и его Content-Type
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Удаление значений gauge остановившегося процесса в многопроцессном режиме"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def _route_template(scope: Scope) -> str:
+    """Шаблон пути сработавшего маршрута с учетом префикса include_router"""
+    # Новые версии FastAPI хранят в scope["route"] путь без префикса роутера,
+    # полный шаблон — в контексте маршрута
+    route = (scope.get("fastapi") or {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware учета HTTP запросов
+
+    Время считается до конца отправки тела ответа, поэтому потоковые
+    ответы учитываются целиком. Маршрут записывается шаблоном
+    (например, /api/jobs/{job_id}), чтобы количество серий не росло.
+    """
+
+    def __init__(self, app: ASGIApp, health_service=None):
+        """
+        Args:
+            app: Приложение ASGI
+            health_service: Сервис здоровья, счетчики которого нужно обновлять
+        """
+        self.app = app
+        self.health_service = health_service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route_path = _route_template(scope)
+            method = scope["method"]
+
+            HTTP_REQUEST_SECONDS.labels(method, route_path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+            if self.health_service is not None:
+                self.health_service.increment_request_count()
+                if status_code >= 500:
+                    self.health_service.increment_error_count()
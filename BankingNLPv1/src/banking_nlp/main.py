@@ -8,11 +8,15 @@ from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 
+from .core.admission import AdmissionRejected
+from .core.capture import CaptureWriter, TrafficCaptureMiddleware
 from .core.config import get_settings
-from .api.routes import router as api_router
-from .utils.data_initializer import DataInitializer
+from .core.metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from .api.routes import router as api_router, analysis_service, health_service
+from .api.jobs import router as jobs_router, job_service
+from .api.data_routes import router as data_router, data_initializer
 from src.banking_nlp.core.logging_config import setup_logging
 
 # Настройка централизованного логирования
@@ -27,26 +31,68 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Учет запросов для /metrics и счетчиков HealthService
+app.add_middleware(MetricsMiddleware, health_service=health_service)
+
+# Выборочная запись анонимизированного трафика (benchmarks/replay_capture.py)
+capture_config = get_settings().capture
+capture_writer = None
+if capture_config.enabled:
+    capture_writer = CaptureWriter(
+        capture_config.path,
+        queue_size=capture_config.queue_size,
+        flush_interval_seconds=capture_config.flush_interval_seconds,
+    )
+    app.add_middleware(TrafficCaptureMiddleware, writer=capture_writer, config=capture_config)
+
+# Быстрый отказ при перегрузке: клиент повторит запрос через Retry-After
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # Подключаем статику и шаблоны
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# Инициализатор данных
-data_initializer = DataInitializer()
-
 @app.on_event("startup")
 async def startup_event():
-    logger.info("🏦 Banking NLP System - Инициализация данных...")
-    await data_initializer.ensure_data_available()
-    logger.info("✅ Данные готовы к использованию!")
+    await health_service.start()
+    if capture_writer is not None:
+        capture_writer.start()
+    # Сервер принимает запросы сразу; генерация или обновление данных идут в фоне
+    logger.info("🏦 Banking NLP System - Проверка данных...")
+    await data_initializer.start()
+    await job_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await data_initializer.stop()
+    await job_service.stop()
+    await health_service.stop()
+    analysis_service.shutdown()
+    if capture_writer is not None:
+        capture_writer.close()
+    mark_process_dead()
 
 # Красивая форма на главной странице
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+# Метрики в формате Prometheus (сумма по всем воркерам при PROMETHEUS_MULTIPROC_DIR)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Подключение маршрутов API
 app.include_router(api_router, prefix="/api", tags=["analysis"])
+app.include_router(jobs_router, prefix="/api", tags=["jobs"])
+app.include_router(data_router, prefix="/api", tags=["data"])
 
 def main():
     settings = get_settings()
@@ -7,15 +7,38 @@
 """
 
 import logging
+import os
 import re
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field
 
+from ..core import metrics
+from ..core.config import (
+    AnalysisConfig,
+    CacheConfig,
+    DegradationConfig,
+    ExecutionMode,
+    LexiconConfig,
+    get_settings,
+)
+from .cache import TTLCache
+from .degradation import DegradationPolicy
+from .lexicon import CompiledLexicon, list_versions, load_lexicon, read_active_version, write_active_version
+
 # Настройка логгера
 logger = logging.getLogger(__name__)
 
+# Эмоциональная окраска по умолчанию, когда ключевые слова не найдены
+DEFAULT_EMOTION_SCORES = {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
+
 
 class AnalysisRequest(BaseModel):
     """Модель запроса на анализ"""
@@ -35,136 +58,178 @@ class AnalysisResult(BaseModel):
     processing_time: Optional[float] = Field(default=None, description="Время обработки в секундах")
     timestamp: Optional[str] = Field(default=None, description="Время анализа")
     error: Optional[str] = Field(default=None, description="Ошибка анализа")
+    degraded: bool = Field(default=False, description="Часть этапов пропущена из-за нагрузки")
+    skipped_stages: List[str] = Field(default=[], description="Пропущенные из-за нагрузки этапы")
 
 
 class AnalysisService:
     """Сервис анализа банковских разговоров"""
 
-    def __init__(self):
-        """Инициализация сервиса анализа"""
-        self.themes_dict = self._load_themes()
-        self.products_dict = self._load_products()
-        self.emotion_keywords = self._load_emotion_keywords()
-        logger.info("Сервис анализа инициализирован")
-
-    def _load_themes(self) -> Dict[str, List[str]]:
-        """Загрузка словаря тематик и ключевых слов"""
-        return {
-            "кредиты": [
-                "кредит", "займ", "ссуда", "кредитная линия", "овердрафт",
-                "процентная ставка", "переплата", "долг", "задолженность"
-            ],
-            "ипотека": [
-                "ипотека", "ипотечный", "жилищный кредит", "недвижимость",
-                "квартира", "дом", "покупка жилья", "первоначальный взнос"
-            ],
-            "вклады": [
-                "вклад", "депозит", "накопления", "сбережения", "процент по вкладу",
-                "капитализация", "пополнение", "срочный вклад"
-            ],
-            "карты": [
-                "карта", "кредитная карта", "дебетовая карта", "пластик",
-                "снятие наличных", "лимит", "cashback", "кешбэк"
-            ],
-            "страхование": [
-                "страхование", "страховка", "полис", "страховая премия",
-                "страховой случай", "выплата", "КАСКО", "ОСАГО"
-            ],
-            "инвестиции": [
-                "инвестиции", "ИИС", "брокерский счет", "акции", "облигации",
-                "паи", "доходность", "портфель", "риски"
-            ],
-            "жалобы": [
-                "жалоба", "недовольство", "проблема", "ошибка", "не работает",
-                "плохое обслуживание", "некорректно", "неправильно"
-            ],
-            "техническая_поддержка": [
-                "не работает", "ошибка", "сбой", "технические проблемы",
-                "приложение", "интернет-банк", "мобильный банк", "восстановление"
-            ]
-        }
-
-    def _load_products(self) -> Dict[str, List[str]]:
-        """Загрузка словаря банковских продуктов"""
-        return {
-            "потребительский_кредит": [
-                "потребительский кредит", "кредит наличными", "личный кредит",
-                "кредит на покупки", "нецелевой кредит"
-            ],
-            "автокредит": [
-                "автокредит", "кредит на машину", "кредит на автомобиль",
-                "автомобильный кредит"
-            ],
-            "кредитная_карта": [
-                "кредитная карта", "кредитка", "карта с лимитом"
-            ],
-            "срочный_вклад": [
-                "срочный вклад", "депозит", "сберегательный вклад"
-            ],
-            "дебетовая_карта": [
-                "дебетовая карта", "зарплатная карта", "карта для расчетов"
-            ],
-            "страхование_жизни": [
-                "страхование жизни", "полис жизни", "накопительное страхование"
-            ],
-            "страхование_имущества": [
-                "страхование квартиры", "страхование дома", "имущественное страхование"
-            ]
-        }
-
-    def _load_emotion_keywords(self) -> Dict[str, List[str]]:
-        """Загрузка словаря эмоциональных ключевых слов"""
-        return {
-            "positive": [
-                "отлично", "хорошо", "замечательно", "спасибо", "благодарю",
-                "доволен", "рад", "удобно", "быстро", "качественно"
-            ],
-            "negative": [
-                "плохо", "ужасно", "недоволен", "расстроен", "злой",
-                "медленно", "некачественно", "проблема", "ошибка", "сбой"
-            ],
-            "neutral": [
-                "хочу узнать", "интересует", "расскажите", "объясните",
-                "можно ли", "как получить", "какие условия"
-            ]
-        }
+    def __init__(self, config: Optional[AnalysisConfig] = None, cache_config: Optional[CacheConfig] = None,
+                 lexicon_config: Optional[LexiconConfig] = None,
+                 degradation_config: Optional[DegradationConfig] = None):
+        """
+        Инициализация сервиса анализа
 
-    async def analyze(self, request: AnalysisRequest) -> AnalysisResult:
+        Args:
+            config: Настройки выполнения анализа (по умолчанию — из конфигурации приложения)
+            cache_config: Настройки кэша результатов (по умолчанию — из конфигурации приложения)
+            lexicon_config: Настройки словарей (по умолчанию — из конфигурации приложения)
+            degradation_config: Настройки деградации под нагрузкой (по умолчанию — из конфигурации приложения)
         """
-        Выполнение анализа текста
+        self.config = config or get_settings().analysis
+        self.lexicon_config = lexicon_config or get_settings().lexicon
+        self._lexicon_dir = Path(self.lexicon_config.directory)
+        self._lexicon = load_lexicon(self._lexicon_dir, read_active_version(self._lexicon_dir))
+        self._lexicon_checked_at = time.monotonic()
+        self.cache = TTLCache(cache_config or get_settings().cache)
+        self.degradation = DegradationPolicy(degradation_config)
+        self._executor: Optional[Executor] = None
+        logger.info(f"Сервис анализа инициализирован. Режим выполнения: {self.config.execution_mode.value}")
+
+    @property
+    def themes_dict(self) -> Dict[str, List[str]]:
+        """Словарь тематик и ключевых слов активной версии"""
+        return self._lexicon.themes
+
+    @property
+    def products_dict(self) -> Dict[str, List[str]]:
+        """Словарь банковских продуктов активной версии"""
+        return self._lexicon.products
+
+    @property
+    def emotion_keywords(self) -> Dict[str, List[str]]:
+        """Словарь эмоциональных ключевых слов активной версии"""
+        return self._lexicon.emotions
+
+    @property
+    def lexicon_version(self) -> str:
+        """Активная версия словарей"""
+        return self._lexicon.version
+
+    def use_lexicon(self, version: str) -> CompiledLexicon:
+        """
+        Загрузка и атомарная замена словарей в этом процессе
+
+        Выполняющиеся анализы дорабатывают со словарями, которые они взяли
+        в начале, новые запросы сразу используют новую версию.
 
         Args:
-            request: Запрос на анализ
+            version: Версия словарей
 
         Returns:
-            AnalysisResult: Результат анализа
+            CompiledLexicon: Загруженные словари
+        """
+        lexicon = load_lexicon(self._lexicon_dir, version)
+        self._lexicon = lexicon
+        logger.info(f"Активированы словари {lexicon.fingerprint}")
+        return lexicon
+
+    def activate_lexicon(self, version: str) -> CompiledLexicon:
         """
-        start_time = datetime.now()
+        Переключение активной версии словарей для всех воркеров
+
+        Версия записывается в файл ACTIVE, который остальные процессы
+        проверяют раз в reload_interval_seconds.
+
+        Args:
+            version: Версия словарей
 
+        Returns:
+            CompiledLexicon: Загруженные словари
+
+        Raises:
+            FileNotFoundError: Версия не найдена
+            ValueError: Некорректный файл словарей
+        """
+        if version not in list_versions(self._lexicon_dir):
+            raise FileNotFoundError(f"Версия словарей не найдена: {version}")
+        lexicon = self.use_lexicon(version)
+        write_active_version(self._lexicon_dir, version)
+        return lexicon
+
+    def available_lexicons(self) -> List[str]:
+        """Доступные версии словарей"""
+        return list_versions(self._lexicon_dir)
+
+    def _refresh_lexicon(self) -> None:
+        """Подхват версии словарей, активированной в другом воркере"""
+        interval = self.lexicon_config.reload_interval_seconds
+        now = time.monotonic()
+        if not interval or now - self._lexicon_checked_at < interval:
+            return
+
+        self._lexicon_checked_at = now
         try:
-            # Подготовка текста
-            text_lower = request.text.lower()
+            version = read_active_version(self._lexicon_dir)
+            if version != self._lexicon.version:
+                self.use_lexicon(version)
+        except (OSError, ValueError) as e:
+            logger.error(f"Ошибка обновления словарей, используется {self._lexicon.fingerprint}: {e}")
+
+    def _cache_key(self, request: AnalysisRequest) -> Optional[Tuple]:
+        """
+        Ключ кэша для запроса или None, если запрос не кэшируется
+
+        Текст приводится к нижнему регистру и обрезается по краям: анализ
+        и так работает с text.lower(), а ключевые слова не начинаются и не
+        заканчиваются пробелами, поэтому результат от этого не меняется.
+        В ключ входит версия словарей, так что после их изменения старые
+        записи перестают находиться и вытесняются по LRU.
+        """
+        if not self.cache.config.enabled or len(request.text) > self.cache.config.max_text_chars:
+            return None
+        return (
+            self._lexicon.fingerprint,
+            request.text.strip().lower(),
+            request.include_themes,
+            request.include_products,
+            request.include_emotions,
+        )
 
-            # Анализ тематик
-            themes = []
-            if request.include_themes:
-                themes = self._analyze_themes(text_lower)
+    async def analyze(self, request: AnalysisRequest) -> AnalysisResult:
+        """
+        Выполнение анализа текста
 
-            # Анализ продуктов  
-            products = []
-            if request.include_products:
-                products = self._analyze_products(text_lower)
+        Args:
+            request: Запрос на анализ
 
-            # Эмоциональный анализ
-            emotions = {}
-            if request.include_emotions:
-                emotions = self._analyze_emotions(text_lower)
+        Returns:
+            AnalysisResult: Результат анализа
+        """
+        start_time = time.perf_counter()
+        self._refresh_lexicon()
+
+        cache_key = self._cache_key(request)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                processing_time = time.perf_counter() - start_time
+                metrics.CACHE_HITS.inc()
+                metrics.ANALYSIS_CACHED.observe(processing_time)
+                return cached.model_copy(update={
+                    "themes": list(cached.themes),
+                    "products": list(cached.products),
+                    "emotions": dict(cached.emotions),
+                    "processing_time": processing_time,
+                    "timestamp": datetime.now().isoformat(),
+                })
+            metrics.CACHE_MISSES.inc()
+
+        # Под нагрузкой необязательные этапы пропускаются
+        flags = [request.include_themes, request.include_products, request.include_emotions]
+        skipped = self.degradation.stages_to_skip(*flags)
+        for position, stage in enumerate(("themes", "products", "emotions")):
+            if stage in skipped:
+                flags[position] = False
 
-            # Расчет общей уверенности
-            confidence = self._calculate_confidence(themes, products, emotions)
+        try:
+            themes, products, emotions, confidence = await self._run_stages(request.text, *flags)
 
             # Время обработки
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
+            metrics.ANALYSIS_COMPUTED.observe(processing_time)
+            self.degradation.observe_latency(processing_time)
 
             result = AnalysisResult(
                 themes=themes,
@@ -172,8 +237,15 @@ class AnalysisService:
                 emotions=emotions,
                 confidence=confidence,
                 processing_time=processing_time,
-                timestamp=datetime.now().isoformat()
+                timestamp=datetime.now().isoformat(),
+                degraded=bool(skipped),
+                skipped_stages=skipped
             )
+            if skipped:
+                # Неполный результат не кэшируется, чтобы не отдавать его после спада нагрузки
+                metrics.ANALYSIS_DEGRADED_RESULTS.inc()
+            elif cache_key is not None:
+                self.cache.set(cache_key, result.model_copy(deep=True))
 
             logger.info(f"Анализ завершен за {processing_time:.3f}с. Уверенность: {confidence:.2f}")
             return result
@@ -185,40 +257,114 @@ class AnalysisService:
                 timestamp=datetime.now().isoformat()
             )
 
-    def _analyze_themes(self, text: str) -> List[str]:
-        """Анализ тематик в тексте"""
-        found_themes = []
+    async def _run_stages(self, text: str, include_themes: bool, include_products: bool,
+                          include_emotions: bool) -> Tuple[List[str], List[str], Dict[str, float], float]:
+        """
+        Выполнение этапов анализа в настроенном режиме
 
-        for theme, keywords in self.themes_dict.items():
-            for keyword in keywords:
-                if keyword in text:
-                    found_themes.append(theme)
-                    break  # Найдена тематика, переходим к следующей
+        Короткие тексты анализируются прямо в event loop: передача в пул
+        стоит дороже самого анализа. Длинные уходят в пул потоков или
+        процессов, чтобы не блокировать остальные запросы воркера.
+        """
+        flags = (include_themes, include_products, include_emotions)
+        executor = self._get_executor()
 
-        return found_themes
+        if executor is None or len(text) < self.config.inline_threshold_chars:
+            return self.analyze_text(text, *flags)
 
-    def _analyze_products(self, text: str) -> List[str]:
-        """Анализ упоминаний банковских продуктов"""
-        found_products = []
+        loop = asyncio.get_running_loop()
+        if self.config.execution_mode == ExecutionMode.PROCESS:
+            return await loop.run_in_executor(
+                executor, _analyze_in_worker, self.lexicon_version, text, *flags
+            )
+        return await loop.run_in_executor(executor, self.analyze_text, text, *flags)
 
-        for product, keywords in self.products_dict.items():
-            for keyword in keywords:
-                if keyword in text:
-                    found_products.append(product)
-                    break
+    def analyze_text(self, text: str, include_themes: bool = True, include_products: bool = True,
+                     include_emotions: bool = True) -> Tuple[List[str], List[str], Dict[str, float], float]:
+        """
+        Синхронное выполнение всех этапов анализа
 
-        return found_products
+        Args:
+            text: Текст для анализа
+            include_themes: Включить анализ тематик
+            include_products: Включить анализ продуктов
+            include_emotions: Включить эмоциональный анализ
 
-    def _analyze_emotions(self, text: str) -> Dict[str, float]:
-        """Эмоциональный анализ текста"""
+        Returns:
+            Tuple: Тематики, продукты, эмоции и общая уверенность
+        """
+        # Словари берем один раз: замена версии не влияет на уже начатый анализ
+        lexicon = self._lexicon
+
+        # Подготовка текста
+        text_lower = text.lower()
+
+        # Поиск ключевых слов всех включенных этапов за один проход
+        started = time.perf_counter()
+        theme_mask, product_mask, emotion_counts = lexicon.match(
+            text_lower, include_themes, include_products, include_emotions
+        )
+        finished = time.perf_counter()
+        metrics.STAGE_KEYWORDS.observe(finished - started)
+
+        # Анализ тематик
+        themes = []
+        if include_themes:
+            started = finished
+            themes = lexicon.labels(theme_mask, lexicon.theme_names)
+            finished = time.perf_counter()
+            metrics.STAGE_THEMES.observe(finished - started)
+
+        # Анализ продуктов
+        products = []
+        if include_products:
+            started = finished
+            products = lexicon.labels(product_mask, lexicon.product_names)
+            finished = time.perf_counter()
+            metrics.STAGE_PRODUCTS.observe(finished - started)
+
+        # Эмоциональный анализ
+        emotions = {}
+        if include_emotions:
+            started = finished
+            emotions = self._analyze_emotions(text_lower, lexicon.emotion_names, emotion_counts)
+            metrics.STAGE_EMOTIONS.observe(time.perf_counter() - started)
+
+        # Расчет общей уверенности
+        confidence = self._calculate_confidence(themes, products, emotions)
+        return themes, products, emotions, confidence
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Ленивое создание пула для выбранного режима выполнения"""
+        mode = self.config.execution_mode
+        if mode == ExecutionMode.INLINE:
+            return None
+
+        if self._executor is None:
+            workers = self.config.max_workers or os.cpu_count() or 1
+            if mode == ExecutionMode.PROCESS:
+                self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+            logger.info(f"Создан пул анализа: режим={mode.value}, воркеров={workers}")
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Остановка пула выполнения анализа"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Пул анализа остановлен")
+
+    def _analyze_emotions(self, text: str, emotion_names: List[str], emotion_counts: List[int]) -> Dict[str, float]:
+        """Эмоциональный анализ текста по количеству найденных ключевых слов"""
         emotion_scores = {"positive": 0.0, "negative": 0.0, "neutral": 0.0}
         word_count = len(text.split())
 
         if word_count == 0:
             return emotion_scores
 
-        for emotion, keywords in self.emotion_keywords.items():
-            matches = sum(1 for keyword in keywords if keyword in text)
+        for emotion, matches in zip(emotion_names, emotion_counts):
             emotion_scores[emotion] = matches / word_count
 
         # Нормализация к сумме 1.0
@@ -226,7 +372,7 @@ class AnalysisService:
         if total_score > 0:
             emotion_scores = {k: v / total_score for k, v in emotion_scores.items()}
         else:
-            emotion_scores = {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
+            emotion_scores = dict(DEFAULT_EMOTION_SCORES)
 
         return emotion_scores
 
@@ -249,6 +395,129 @@ class AnalysisService:
 
         return round(confidence, 3)
 
+    def analyze_frame(
+        self,
+        texts: pd.Series,
+        include_themes: bool = True,
+        include_products: bool = True,
+        include_emotions: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Векторизованный анализ колонки текстов
+
+        Повторяет логику analyze(), но обрабатывает колонку целиком: одинаковые
+        тексты анализируются один раз, каждое ключевое слово ищется один раз
+        по всем уникальным текстам, а результат собирается в DataFrame без
+        создания AnalysisResult на каждую строку.
+
+        Args:
+            texts: Колонка с текстами разговоров
+            include_themes: Включить анализ тематик
+            include_products: Включить анализ продуктов
+            include_emotions: Включить эмоциональный анализ
+
+        Returns:
+            pd.DataFrame: Колонки themes, products, emotion_<эмоция> и confidence
+            с тем же индексом, что и texts
+        """
+        # Дубликаты (шаблоны ботов, IVR, повторы) анализируем один раз
+        lexicon = self._lexicon
+        codes, uniques = pd.factorize(texts.fillna("").astype(str))
+        lowered = [text.lower() for text in uniques]
+        n_unique = len(lowered)
+        keyword_hits: Dict[str, np.ndarray] = {}
+
+        def hits(keyword: str) -> np.ndarray:
+            # Одно и то же слово встречается в нескольких словарях — ищем его один раз
+            found = keyword_hits.get(keyword)
+            if found is None:
+                found = np.array([keyword in text for text in lowered], dtype=bool)
+                keyword_hits[keyword] = found
+            return found
+
+        columns: Dict[str, np.ndarray] = {}
+        confidence = np.zeros(n_unique, dtype=np.float64)
+
+        themes_matrix = self._match_categories_frame(lexicon.themes, hits, n_unique, include_themes)
+        columns["themes"] = self._labels_from_matrix(themes_matrix, lexicon.theme_names)
+        confidence += 0.4 * np.minimum(themes_matrix.sum(axis=1) / 3, 1.0)
+
+        products_matrix = self._match_categories_frame(lexicon.products, hits, n_unique, include_products)
+        columns["products"] = self._labels_from_matrix(products_matrix, lexicon.product_names)
+        confidence += 0.3 * np.minimum(products_matrix.sum(axis=1) / 2, 1.0)
+
+        if include_emotions:
+            word_counts = np.array([len(text.split()) for text in lowered], dtype=np.float64)
+            has_words = word_counts > 0
+            safe_counts = np.where(has_words, word_counts, 1.0)
+
+            raw_scores = {}
+            for emotion, keywords in lexicon.emotions.items():
+                matches = np.zeros(n_unique, dtype=np.float64)
+                for keyword in keywords:
+                    matches += hits(keyword)
+                raw_scores[emotion] = matches / safe_counts
+
+            total = np.zeros(n_unique, dtype=np.float64)
+            for scores in raw_scores.values():
+                total += scores
+            has_matches = total > 0
+            safe_total = np.where(has_matches, total, 1.0)
+
+            max_score = np.zeros(n_unique, dtype=np.float64)
+            for emotion, scores in raw_scores.items():
+                default = DEFAULT_EMOTION_SCORES.get(emotion, 0.0)
+                normalized = np.where(has_matches, scores / safe_total, default)
+                normalized = np.where(has_words, normalized, 0.0)
+                columns[f"emotion_{emotion}"] = normalized
+                max_score = np.maximum(max_score, normalized)
+            confidence += 0.3 * max_score
+
+        columns["confidence"] = np.round(confidence, 3)
+
+        # Разворачиваем результаты уникальных текстов обратно на все строки
+        return pd.DataFrame({name: values[codes] for name, values in columns.items()}, index=texts.index)
+
+    @staticmethod
+    def _match_categories_frame(categories: Dict[str, List[str]], hits, n_rows: int,
+                                enabled: bool) -> np.ndarray:
+        """Матрица совпадений «строка × категория» для analyze_frame"""
+        matrix = np.zeros((n_rows, len(categories)), dtype=bool)
+        if not enabled:
+            return matrix
+
+        for column, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                matrix[:, column] |= hits(keyword)
+        return matrix
+
+    @staticmethod
+    def _labels_from_matrix(matrix: np.ndarray, labels: List[str]) -> np.ndarray:
+        """
+        Преобразование матрицы совпадений в колонку кортежей с названиями
+
+        Кортеж строится один раз на каждую уникальную комбинацию категорий,
+        а не на каждую строку.
+        """
+        column = np.empty(matrix.shape[0], dtype=object)
+        if matrix.shape[0] == 0:
+            return column
+
+        if matrix.shape[1] <= 64:
+            # Битовая маска строки — сортировать одно число быстрее, чем строку матрицы
+            weights = np.left_shift(np.uint64(1), np.arange(matrix.shape[1], dtype=np.uint64))
+            masks = (matrix * weights).sum(axis=1, dtype=np.uint64)
+            _, first_rows, inverse = np.unique(masks, return_index=True, return_inverse=True)
+            combinations = matrix[first_rows]
+        else:
+            combinations, inverse = np.unique(matrix, axis=0, return_inverse=True)
+
+        labelled = np.empty(len(combinations), dtype=object)
+        for position, row in enumerate(combinations):
+            labelled[position] = tuple(label for label, found in zip(labels, row) if found)
+        column[:] = labelled[inverse.reshape(-1)]
+        return column
+
     def get_available_themes(self) -> List[str]:
         """Получение списка доступных тематик"""
         return list(self.themes_dict.keys())
@@ -256,3 +525,23 @@ class AnalysisService:
     def get_available_products(self) -> List[str]:
         """Получение списка банковских продуктов"""
         return list(self.products_dict.keys())
+
+
+# Экземпляр сервиса внутри процесса пула (режим ExecutionMode.PROCESS)
+_worker_service: Optional[AnalysisService] = None
+
+
+def _init_worker() -> None:
+    """Инициализация сервиса анализа в процессе пула"""
+    global _worker_service
+    _worker_service = AnalysisService(AnalysisConfig(execution_mode=ExecutionMode.INLINE))
+
+
+def _analyze_in_worker(lexicon_version: str, text: str, include_themes: bool, include_products: bool,
+                       include_emotions: bool) -> Tuple[List[str], List[str], Dict[str, float], float]:
+    """Выполнение анализа в процессе пула со словарями той же версии, что и у родителя"""
+    if _worker_service is None:
+        _init_worker()
+    if _worker_service.lexicon_version != lexicon_version:
+        _worker_service.use_lexicon(lexicon_version)
+    return _worker_service.analyze_text(text, include_themes, include_products, include_emotions)
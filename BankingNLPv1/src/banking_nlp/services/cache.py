@@ -0,0 +1,78 @@
+"""
+Кэш результатов анализа
+======================
+
+Ограниченный по размеру LRU кэш с временем жизни записей для повторяющихся
+текстов (шаблоны IVR и ботов, повторные отправки клиентов).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..core.config import CacheConfig
+
+
+class TTLCache:
+    """LRU кэш с временем жизни записей
+
+    Рассчитан на использование из одного event loop: операции не
+    блокируются и выполняются за O(1).
+    """
+
+    def __init__(self, config: CacheConfig):
+        """
+        Args:
+            config: Настройки кэша
+        """
+        self.config = config
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получение значения; просроченные записи удаляются"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранение значения с вытеснением самых давно использованных записей"""
+        self._entries[key] = (time.monotonic() + self.config.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Очистка кэша"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика использования кэша"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.config.enabled,
+            "size": len(self._entries),
+            "max_entries": self.config.max_entries,
+            "ttl_seconds": self.config.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
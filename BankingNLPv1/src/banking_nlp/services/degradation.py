@@ -0,0 +1,95 @@
+"""
+Деградация анализа под нагрузкой
+===============================
+
+Политика, которая при перегрузке отключает необязательные этапы анализа
+(по умолчанию — продукты и эмоции), сохраняя классификацию тематик в
+пределах бюджета задержки. Сигналы нагрузки — глубина очереди контроля
+допуска и сглаженное время анализа. Включение и выключение разнесены
+порогами (гистерезис) и минимальным временем удержания, чтобы режим не
+переключался на каждом запросе.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core import metrics
+from ..core.config import DegradationConfig, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class DegradationPolicy:
+    """Решение о пропуске необязательных этапов анализа"""
+
+    def __init__(self, config: Optional[DegradationConfig] = None):
+        """
+        Args:
+            config: Настройки деградации (по умолчанию — из конфигурации приложения)
+        """
+        self.config = config or get_settings().degradation
+        self.degraded = False
+        self.latency_ewma = 0.0
+        self._queue_depth: Callable[[], int] = lambda: 0
+        self._changed_at = time.monotonic()
+
+    def bind_queue_depth(self, source: Callable[[], int]) -> None:
+        """Подключение источника глубины очереди (например, контроля допуска)"""
+        self._queue_depth = source
+
+    def observe_latency(self, seconds: float) -> None:
+        """Учет времени очередного анализа в экспоненциальном среднем"""
+        alpha = self.config.latency_smoothing
+        self.latency_ewma += alpha * (seconds - self.latency_ewma)
+
+    def stages_to_skip(self, include_themes: bool, include_products: bool,
+                       include_emotions: bool) -> List[str]:
+        """
+        Этапы, которые нужно пропустить для запроса при текущей нагрузке
+
+        Returns:
+            List[str]: Запрошенные этапы, отключенные политикой
+        """
+        if not self.config.enabled or not self._update():
+            return []
+
+        requested = {"themes": include_themes, "products": include_products, "emotions": include_emotions}
+        return [stage for stage in self.config.optional_stages if requested.get(stage)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущее состояние политики"""
+        return {
+            "enabled": self.config.enabled,
+            "degraded": self.degraded,
+            "optional_stages": list(self.config.optional_stages),
+            "queue_depth": self._queue_depth(),
+            "latency_ewma_seconds": round(self.latency_ewma, 6),
+        }
+
+    def _update(self) -> bool:
+        """Пересчет режима с гистерезисом"""
+        config = self.config
+        depth = self._queue_depth()
+        now = time.monotonic()
+
+        if not self.degraded:
+            if depth >= config.queue_depth_threshold or self.latency_ewma >= config.latency_threshold_seconds:
+                self._switch(True, now, depth)
+        elif now - self._changed_at >= config.min_hold_seconds:
+            recovered = (
+                depth <= config.queue_depth_threshold * config.recovery_ratio
+                and self.latency_ewma <= config.latency_threshold_seconds * config.recovery_ratio
+            )
+            if recovered:
+                self._switch(False, now, depth)
+        return self.degraded
+
+    def _switch(self, degraded: bool, now: float, depth: int) -> None:
+        self.degraded = degraded
+        self._changed_at = now
+        metrics.ANALYSIS_DEGRADED.set(1 if degraded else 0)
+        state = "включен" if degraded else "выключен"
+        logger.warning(
+            f"Режим деградации {state}: очередь={depth}, задержка={self.latency_ewma:.3f}с"
+        )
@@ -4,23 +4,36 @@
 
 Обеспечивает проверку работоспособности всех компонентов системы
 и сбор статистики производительности.
+
+Показатели CPU, памяти и диска собирает фоновая задача с периодом
+MONITORING__SAMPLE_INTERVAL_SECONDS; обработчики /api/health и
+/api/statistics только читают готовый снимок и не блокируют event loop.
 """
 
 import logging
+import time
 import psutil
 import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseModel
 
+from ..core.config import MonitoringConfig, get_settings
+
 logger = logging.getLogger(__name__)
 
+GB = 1024 ** 3
+
 
 class SystemMetrics(BaseModel):
     """Метрики системы"""
     cpu_percent: float
     memory_percent: float
+    memory_available_gb: float
+    memory_total_gb: float
     disk_percent: float
+    disk_free_gb: float
+    disk_total_gb: float
     uptime_seconds: float
     timestamp: str
 
@@ -28,13 +41,72 @@ class SystemMetrics(BaseModel):
 class HealthService:
     """Сервис мониторинга здоровья системы"""
 
-    def __init__(self):
-        """Инициализация сервиса"""
+    def __init__(self, config: Optional[MonitoringConfig] = None):
+        """
+        Инициализация сервиса
+
+        Args:
+            config: Настройки сбора метрик (по умолчанию — из конфигурации приложения)
+        """
+        self.config = config or get_settings().monitoring
         self.start_time = datetime.now()
         self.request_count = 0
         self.error_count = 0
+        self._sampler: Optional[asyncio.Task] = None
+        self._sampled_at = time.monotonic()
+
+        # Первый вызов cpu_percent(interval=None) задает точку отсчета и возвращает 0
+        psutil.cpu_percent(interval=None)
+        self._snapshot = self._sample()
         logger.info("Сервис здоровья системы инициализирован")
 
+    def _sample(self) -> SystemMetrics:
+        """Снятие показателей системы: по одному вызову psutil на показатель"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.config.disk_path)
+        return SystemMetrics(
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=memory.percent,
+            memory_available_gb=round(memory.available / GB, 2),
+            memory_total_gb=round(memory.total / GB, 2),
+            disk_percent=disk.percent,
+            disk_free_gb=round(disk.free / GB, 2),
+            disk_total_gb=round(disk.total / GB, 2),
+            uptime_seconds=(datetime.now() - self.start_time).total_seconds(),
+            timestamp=datetime.now().isoformat(),
+        )
+
+    async def start(self) -> None:
+        """Запуск фонового сбора показателей"""
+        if self._sampler is None:
+            self._sampler = asyncio.create_task(self._sample_periodically(), name="system-sampler")
+
+    async def stop(self) -> None:
+        """Остановка фонового сбора показателей"""
+        if self._sampler is not None:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+
+    async def _sample_periodically(self) -> None:
+        """Периодическое обновление снимка; вызовы psutil выполняются в потоке"""
+        while True:
+            await asyncio.sleep(self.config.sample_interval_seconds)
+            try:
+                self._snapshot = await asyncio.to_thread(self._sample)
+                self._sampled_at = time.monotonic()
+            except Exception as e:
+                logger.error(f"Ошибка сбора системных метрик: {e}")
+
+    @property
+    def snapshot(self) -> SystemMetrics:
+        """Последний снимок показателей системы"""
+        return self._snapshot
+
+    def snapshot_age_seconds(self) -> float:
+        """Возраст последнего снимка в секундах"""
+        return round(time.monotonic() - self._sampled_at, 3)
+
     async def check_health(self) -> Dict[str, Any]:
         """
         Проверка здоровья всех компонентов системы
@@ -87,19 +159,19 @@ class HealthService:
     async def _check_memory_health(self) -> Dict[str, Any]:
         """Проверка использования памяти"""
         try:
-            memory = psutil.virtual_memory()
+            snapshot = self._snapshot
             status = "healthy"
 
-            if memory.percent > 90:
+            if snapshot.memory_percent > 90:
                 status = "unhealthy"
-            elif memory.percent > 80:
+            elif snapshot.memory_percent > 80:
                 status = "degraded"
 
             return {
                 "status": status,
-                "percent_used": memory.percent,
-                "available_gb": round(memory.available / (1024**3), 2),
-                "total_gb": round(memory.total / (1024**3), 2)
+                "percent_used": snapshot.memory_percent,
+                "available_gb": snapshot.memory_available_gb,
+                "total_gb": snapshot.memory_total_gb
             }
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
@@ -107,19 +179,19 @@ class HealthService:
     async def _check_disk_health(self) -> Dict[str, Any]:
         """Проверка дискового пространства"""
         try:
-            disk = psutil.disk_usage('/')
+            snapshot = self._snapshot
             status = "healthy"
 
-            if disk.percent > 95:
+            if snapshot.disk_percent > 95:
                 status = "unhealthy"
-            elif disk.percent > 85:
+            elif snapshot.disk_percent > 85:
                 status = "degraded"
 
             return {
                 "status": status,
-                "percent_used": disk.percent,
-                "free_gb": round(disk.free / (1024**3), 2),
-                "total_gb": round(disk.total / (1024**3), 2)
+                "percent_used": snapshot.disk_percent,
+                "free_gb": snapshot.disk_free_gb,
+                "total_gb": snapshot.disk_total_gb
             }
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
@@ -132,6 +204,7 @@ class HealthService:
             Dict: Статистика работы системы
         """
         try:
+            snapshot = self._snapshot
             stats = {
                 "timestamp": datetime.now().isoformat(),
                 "uptime_seconds": (datetime.now() - self.start_time).total_seconds(),
@@ -141,15 +214,17 @@ class HealthService:
                     "success_rate": 1 - (self.error_count / max(self.request_count, 1))
                 },
                 "system": {
-                    "cpu_percent": psutil.cpu_percent(interval=1),
+                    "cpu_percent": snapshot.cpu_percent,
                     "memory": {
-                        "percent": psutil.virtual_memory().percent,
-                        "available_gb": round(psutil.virtual_memory().available / (1024**3), 2)
+                        "percent": snapshot.memory_percent,
+                        "available_gb": snapshot.memory_available_gb
                     },
                     "disk": {
-                        "percent": psutil.disk_usage('/').percent,
-                        "free_gb": round(psutil.disk_usage('/').free / (1024**3), 2)
-                    }
+                        "percent": snapshot.disk_percent,
+                        "free_gb": snapshot.disk_free_gb
+                    },
+                    "sampled_at": snapshot.timestamp,
+                    "sample_age_seconds": self.snapshot_age_seconds()
                 }
             }
 
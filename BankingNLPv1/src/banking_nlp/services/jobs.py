@@ -0,0 +1,567 @@
+"""
+Сервис фоновых заданий пакетного анализа
+=======================================
+
+Позволяет поставить в очередь большой пакет разговоров (из тела запроса
+или из CSV/Parquet файла в директории data/) и не держать HTTP соединение
+открытым. Задания обрабатываются фоновыми обработчиками порциями через
+AnalysisService.analyze_frame; прогресс, статус и результаты хранятся
+в локальной SQLite базе и выдаются постранично.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from ..core.config import JobsConfig, get_settings
+from ..utils.data_initializer import DataInitializer
+from .analysis import AnalysisService
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SOURCE_SUFFIXES = (".csv", ".parquet")
+
+
+class JobStatus(str, Enum):
+    """Статусы задания"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobItem(BaseModel):
+    """Разговор в задании: флаги анализа задаются на уровне задания"""
+    model_config = ConfigDict(extra="forbid")
+
+    text: str = Field(..., description="Текст для анализа", min_length=1)
+
+
+class JobSubmitRequest(BaseModel):
+    """Модель запроса на создание задания"""
+    items: Optional[List[JobItem]] = Field(default=None, description="Разговоры для анализа")
+    source_path: Optional[str] = Field(
+        default=None, description="Путь к CSV или Parquet файлу относительно директории data/"
+    )
+    text_column: str = Field(default="conversation_text", description="Колонка с текстом в файле")
+    include_emotions: bool = Field(default=True, description="Включить эмоциональный анализ")
+    include_products: bool = Field(default=True, description="Включить анализ продуктов")
+    include_themes: bool = Field(default=True, description="Включить анализ тематик")
+
+    @model_validator(mode="after")
+    def _check_source(self) -> "JobSubmitRequest":
+        if (self.items is None) == (self.source_path is None):
+            raise ValueError("Укажите либо items, либо source_path")
+        if self.items is not None and not self.items:
+            raise ValueError("Список items не может быть пустым")
+        return self
+
+
+class JobInfo(BaseModel):
+    """Модель состояния задания"""
+    job_id: str
+    status: JobStatus
+    source: str
+    total: Optional[int] = Field(default=None, description="Всего строк (если известно заранее)")
+    processed: int = Field(default=0, description="Обработано строк")
+    progress: Optional[float] = Field(default=None, description="Доля выполнения от 0 до 1")
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+
+
+class JobResultsPage(BaseModel):
+    """Страница результатов задания"""
+    job_id: str
+    status: JobStatus
+    offset: int
+    limit: int
+    total: int = Field(description="Количество сохраненных результатов")
+    next_offset: Optional[int] = None
+    results: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class JobStore:
+    """Хранилище заданий и результатов в SQLite"""
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: Путь к файлу базы данных
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    total INTEGER,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    owner_pid INTEGER,
+                    owner_token TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_inputs (
+                    job_id TEXT NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (job_id, item_index)
+                );
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (job_id, item_index)
+                );
+            """)
+            # Базы, созданные до появления owner_token
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner_token" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner_token TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Соединение на одну транзакцию: фиксация или откат и закрытие"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, job_id: str, source: str, params: Dict[str, Any], total: Optional[int],
+                   texts: Optional[List[str]] = None) -> None:
+        """Создание задания (и сохранение входных текстов для inline-заданий)"""
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, source, params, total, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JobStatus.PENDING.value, source, json.dumps(params, ensure_ascii=False),
+                 total, now, now),
+            )
+            if texts is not None:
+                conn.executemany(
+                    "INSERT INTO job_inputs (job_id, item_index, text) VALUES (?, ?, ?)",
+                    ((job_id, index, text) for index, text in enumerate(texts)),
+                )
+
+    def get_job(self, job_id: str) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+    def list_jobs(self, limit: int) -> List[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def claim_job(self, job_id: str) -> bool:
+        """Атомарный захват ожидающего задания текущим процессом"""
+        pid = os.getpid()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, owner_pid = ?, owner_token = ?, updated_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (JobStatus.RUNNING.value, pid, _process_token(pid), datetime.now().isoformat(), job_id,
+                 JobStatus.PENDING.value),
+            )
+            return cursor.rowcount == 1
+
+    def pending_job_ids(self) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at", (JobStatus.PENDING.value,)
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    def release_orphaned_jobs(self) -> int:
+        """
+        Возврат в очередь заданий, чей процесс-обработчик завершился
+
+        Вызывается при запуске, до захвата заданий текущим процессом, поэтому
+        задания с его PID остались от предыдущего процесса (например, PID 1
+        в контейнере после перезапуска). Владелец сверяется по PID и времени
+        запуска процесса, чтобы повторно занятый PID не считался живым.
+        """
+        released = 0
+        current_pid = os.getpid()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, owner_pid, owner_token FROM jobs WHERE status = ?", (JobStatus.RUNNING.value,)
+            ).fetchall()
+            for row in rows:
+                pid = row["owner_pid"]
+                if (pid and pid != current_pid and row["owner_token"]
+                        and _process_token(pid) == row["owner_token"]):
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner_pid = NULL, owner_token = NULL, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (JobStatus.PENDING.value, datetime.now().isoformat(), row["job_id"]),
+                )
+                released += 1
+        return released
+
+    def read_inputs(self, job_id: str, offset: int, limit: int) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT text FROM job_inputs WHERE job_id = ? AND item_index >= ? "
+                "ORDER BY item_index LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [row["text"] for row in rows]
+
+    def save_chunk(self, job_id: str, offset: int, payloads: List[str]) -> bool:
+        """
+        Сохранение порции результатов и прогресса одной транзакцией
+
+        Returns:
+            bool: False, если задание было отменено и сохранять больше нечего
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET processed = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (offset + len(payloads), datetime.now().isoformat(), job_id, JobStatus.RUNNING.value),
+            )
+            if cursor.rowcount != 1:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, item_index, payload) VALUES (?, ?, ?)",
+                ((job_id, offset + position, payload) for position, payload in enumerate(payloads)),
+            )
+        return True
+
+    def finish_job(self, job_id: str, status: JobStatus, error: Optional[str] = None,
+                   total: Optional[int] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, total = COALESCE(?, total), updated_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (status.value, error, total, datetime.now().isoformat(), job_id, JobStatus.RUNNING.value),
+            )
+            conn.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+
+    def cancel_job(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                (JobStatus.CANCELLED.value, datetime.now().isoformat(), job_id,
+                 JobStatus.PENDING.value, JobStatus.RUNNING.value),
+            )
+            conn.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+            return cursor.rowcount == 1
+
+    def read_results(self, job_id: str, offset: int, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        with self._connect() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT payload FROM job_results WHERE job_id = ? AND item_index >= ? "
+                "ORDER BY item_index LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return total, [json.loads(row["payload"]) for row in rows]
+
+
+def _process_token(pid: int) -> Optional[str]:
+    """
+    Идентификатор процесса: PID и время его запуска
+
+    Returns:
+        Optional[str]: None, если процесса нет; без /proc — только PID
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as fh:
+            stat = fh.read()
+    except OSError:
+        return str(pid)
+    # Имя процесса в скобках может содержать пробелы; starttime — 22-е поле
+    return f"{pid}:{stat.rsplit(')', 1)[1].split()[19]}"
+
+
+class JobService:
+    """Сервис фоновых заданий пакетного анализа"""
+
+    def __init__(self, analysis_service: AnalysisService, config: Optional[JobsConfig] = None,
+                 data_initializer: Optional[DataInitializer] = None):
+        """
+        Args:
+            analysis_service: Сервис анализа, которым обрабатываются задания
+            config: Настройки заданий (по умолчанию — из конфигурации приложения)
+            data_initializer: Источник путей к директориям данных
+        """
+        self.analysis_service = analysis_service
+        self.config = config or get_settings().jobs
+        self.data_initializer = data_initializer or DataInitializer()
+        self.store = JobStore(self.data_initializer.jobs_dir / "jobs.sqlite3")
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        logger.info("Сервис заданий инициализирован")
+
+    async def start(self) -> None:
+        """Запуск фоновых обработчиков и возобновление незавершенных заданий"""
+        if self._workers:
+            return
+        released = await asyncio.to_thread(self.store.release_orphaned_jobs)
+        if released:
+            logger.info(f"Возвращено в очередь незавершенных заданий: {released}")
+        for job_id in await asyncio.to_thread(self.store.pending_job_ids):
+            self._queue.put_nowait(job_id)
+
+        self._workers = [
+            asyncio.create_task(self._worker(number), name=f"job-worker-{number}")
+            for number in range(self.config.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Остановка фоновых обработчиков"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, request: JobSubmitRequest) -> JobInfo:
+        """
+        Создание задания и постановка его в очередь
+
+        Args:
+            request: Запрос на создание задания
+
+        Returns:
+            JobInfo: Состояние созданного задания
+        """
+        job_id = uuid.uuid4().hex
+        params = {
+            "include_themes": request.include_themes,
+            "include_products": request.include_products,
+            "include_emotions": request.include_emotions,
+            "text_column": request.text_column,
+        }
+
+        texts = None
+        if request.items is not None:
+            if len(request.items) > self.config.max_inline_items:
+                raise ValueError(f"Максимальное количество разговоров в задании: {self.config.max_inline_items}")
+            texts = [item.text for item in request.items]
+            source, total = "inline", len(texts)
+        else:
+            path = self.resolve_source_path(request.source_path)
+            params["source_path"] = str(path)
+            source, total = str(path.relative_to(self.data_initializer.data_dir.resolve())), None
+            if path.suffix == ".parquet":
+                total = await asyncio.to_thread(_parquet_row_count, path)
+
+        await asyncio.to_thread(self.store.create_job, job_id, source, params, total, texts)
+        self._queue.put_nowait(job_id)
+        logger.info(f"Создано задание {job_id}: источник={source}, строк={total}")
+        return await self.get(job_id)
+
+    def resolve_source_path(self, source_path: str) -> Path:
+        """
+        Проверка пути к файлу-источнику: только CSV/Parquet внутри data/
+
+        Raises:
+            ValueError: Путь вне директории данных, файл не найден или формат не поддерживается
+        """
+        data_dir = self.data_initializer.data_dir.resolve()
+        path = (data_dir / source_path).resolve()
+        if data_dir not in path.parents:
+            raise ValueError("Файл-источник должен находиться в директории data/")
+        if path.suffix.lower() not in SUPPORTED_SOURCE_SUFFIXES:
+            raise ValueError("Поддерживаются только файлы CSV и Parquet")
+        if not path.is_file():
+            raise ValueError(f"Файл не найден: {source_path}")
+        return path
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        """Получение состояния задания"""
+        row = await asyncio.to_thread(self.store.get_job, job_id)
+        return _job_info(row) if row is not None else None
+
+    async def list_jobs(self, limit: int = 50) -> List[JobInfo]:
+        """Последние задания"""
+        rows = await asyncio.to_thread(self.store.list_jobs, limit)
+        return [_job_info(row) for row in rows]
+
+    async def cancel(self, job_id: str) -> bool:
+        """Отмена ожидающего или выполняющегося задания"""
+        cancelled = await asyncio.to_thread(self.store.cancel_job, job_id)
+        if cancelled:
+            logger.info(f"Задание {job_id} отменено")
+        return cancelled
+
+    async def results(self, job_id: str, offset: int, limit: int) -> Optional[JobResultsPage]:
+        """Страница результатов задания"""
+        info = await self.get(job_id)
+        if info is None:
+            return None
+
+        limit = min(limit, self.config.max_page_size)
+        total, results = await asyncio.to_thread(self.store.read_results, job_id, offset, limit)
+        next_offset = offset + len(results)
+        return JobResultsPage(
+            job_id=job_id,
+            status=info.status,
+            offset=offset,
+            limit=limit,
+            total=total,
+            next_offset=next_offset if next_offset < total else None,
+            results=results,
+        )
+
+    async def _worker(self, number: int) -> None:
+        """Фоновый обработчик очереди заданий"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                if await asyncio.to_thread(self.store.claim_job, job_id):
+                    await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка выполнения задания {job_id}: {e}")
+                await asyncio.to_thread(self.store.finish_job, job_id, JobStatus.FAILED, str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str) -> None:
+        """Обработка задания порциями с сохранением прогресса"""
+        row = await asyncio.to_thread(self.store.get_job, job_id)
+        params = json.loads(row["params"])
+        offset = row["processed"]
+        logger.info(f"Обработка задания {job_id} с позиции {offset}")
+
+        chunks = self._iter_chunks(job_id, row["source"], params, offset)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+
+            payloads = await asyncio.to_thread(self._analyze_chunk, chunk, offset, params)
+            if not await asyncio.to_thread(self.store.save_chunk, job_id, offset, payloads):
+                logger.info(f"Задание {job_id} остановлено после отмены на позиции {offset}")
+                return
+            offset += len(payloads)
+
+        await asyncio.to_thread(self.store.finish_job, job_id, JobStatus.COMPLETED, None, offset)
+        logger.info(f"Задание {job_id} завершено. Обработано строк: {offset}")
+
+    def _iter_chunks(self, job_id: str, source: str, params: Dict[str, Any], offset: int) -> Iterator[pd.Series]:
+        """Порции текстов задания начиная с offset"""
+        chunk_size = self.config.chunk_size
+
+        if source == "inline":
+            while True:
+                texts = self.store.read_inputs(job_id, offset, chunk_size)
+                if not texts:
+                    return
+                yield pd.Series(texts)
+                offset += len(texts)
+
+        path = Path(params["source_path"])
+        column = params["text_column"]
+        skipped = 0
+        for texts in _iter_file_column(path, column, chunk_size):
+            # При возобновлении пропускаем уже обработанные строки
+            if skipped + len(texts) <= offset:
+                skipped += len(texts)
+                continue
+            if skipped < offset:
+                texts = texts.iloc[offset - skipped:]
+                skipped = offset
+            yield texts.reset_index(drop=True)
+
+    def _analyze_chunk(self, texts: pd.Series, offset: int, params: Dict[str, Any]) -> List[str]:
+        """Векторизованный анализ порции и сериализация результатов"""
+        frame = self.analysis_service.analyze_frame(
+            texts,
+            include_themes=params["include_themes"],
+            include_products=params["include_products"],
+            include_emotions=params["include_emotions"],
+        )
+        emotion_columns = [name for name in frame.columns if name.startswith("emotion_")]
+
+        payloads = []
+        for position, row in enumerate(frame.itertuples(index=False)):
+            record = row._asdict()
+            payloads.append(json.dumps({
+                "index": offset + position,
+                "themes": list(record["themes"]),
+                "products": list(record["products"]),
+                "emotions": {name[len("emotion_"):]: float(record[name]) for name in emotion_columns},
+                "confidence": float(record["confidence"]),
+            }, ensure_ascii=False))
+        return payloads
+
+
+def _iter_file_column(path: Path, column: str, chunk_size: int) -> Iterator[pd.Series]:
+    """Чтение одной колонки CSV/Parquet файла порциями"""
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[column]):
+            yield batch.column(0).to_pandas()
+        return
+
+    reader = pd.read_csv(path, usecols=[column], chunksize=chunk_size, encoding="utf-8-sig")
+    for frame in reader:
+        yield frame[column]
+
+
+def _parquet_row_count(path: Path) -> int:
+    """Количество строк Parquet файла из метаданных"""
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def _job_info(row: sqlite3.Row) -> JobInfo:
+    total = row["total"]
+    progress = None
+    if total:
+        progress = round(min(row["processed"] / total, 1.0), 4)
+    elif row["status"] == JobStatus.COMPLETED.value:
+        progress = 1.0
+
+    return JobInfo(
+        job_id=row["job_id"],
+        status=JobStatus(row["status"]),
+        source=row["source"],
+        total=total,
+        processed=row["processed"],
+        progress=progress,
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        error=row["error"],
+    )
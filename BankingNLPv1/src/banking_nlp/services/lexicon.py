@@ -0,0 +1,262 @@
+"""
+Версионированные словари анализа
+===============================
+
+Словари тематик, продуктов и эмоций хранятся в файлах
+config/lexicons/<версия>.json, а активная версия — в файле ACTIVE той же
+директории. Каждая версия компилируется в таблицу уникальных ключевых
+слов с битовыми масками категорий и сохраняется артефактом
+compiled/<версия>.pkl, который загружается без повторной компиляции,
+пока исходный JSON не изменился.
+"""
+
+import argparse
+import hashlib
+import importlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_POINTER = "ACTIVE"
+COMPILED_DIR = "compiled"
+
+# Версия формата артефакта: при изменении CompiledLexicon старые артефакты пересобираются
+ARTIFACT_FORMAT = 1
+
+
+class LexiconSource(BaseModel):
+    """Исходный файл словарей"""
+    version: str = Field(..., min_length=1, description="Версия словарей")
+    description: Optional[str] = Field(default=None, description="Описание изменений")
+    themes: Dict[str, List[str]] = Field(..., description="Тематики и их ключевые слова")
+    products: Dict[str, List[str]] = Field(..., description="Продукты и их ключевые слова")
+    emotions: Dict[str, List[str]] = Field(..., description="Эмоции и их ключевые слова")
+
+
+class CompiledLexicon:
+    """Скомпилированные словари
+
+    Каждое ключевое слово проверяется в тексте один раз, даже если оно
+    входит в несколько категорий; совпадение сохраняет семантику
+    `keyword in text` исходного анализа.
+    """
+
+    def __init__(self, source: LexiconSource, source_sha: str):
+        """
+        Args:
+            source: Исходные словари
+            source_sha: SHA-256 исходного файла
+        """
+        self.format = ARTIFACT_FORMAT
+        self.version = source.version
+        self.source_sha = source_sha
+        self.themes = source.themes
+        self.products = source.products
+        self.emotions = source.emotions
+        self.theme_names = list(source.themes)
+        self.product_names = list(source.products)
+        self.emotion_names = list(source.emotions)
+
+        table: Dict[str, List] = {}
+
+        def entry(keyword: str) -> List:
+            return table.setdefault(keyword, [0, 0, [0] * len(self.emotion_names)])
+
+        for bit, keywords in enumerate(source.themes.values()):
+            for keyword in keywords:
+                entry(keyword)[0] |= 1 << bit
+        for bit, keywords in enumerate(source.products.values()):
+            for keyword in keywords:
+                entry(keyword)[1] |= 1 << bit
+        for position, keywords in enumerate(source.emotions.values()):
+            for keyword in keywords:
+                # Повтор слова в списке эмоции учитывается столько раз, сколько он указан
+                entry(keyword)[2][position] += 1
+
+        self.keywords: Tuple[str, ...] = tuple(table)
+        self.theme_masks: Tuple[int, ...] = tuple(value[0] for value in table.values())
+        self.product_masks: Tuple[int, ...] = tuple(value[1] for value in table.values())
+        self.emotion_counts: Tuple[Tuple[int, ...], ...] = tuple(tuple(value[2]) for value in table.values())
+
+        # Для каждой комбинации включенных этапов — только нужные ключевые слова
+        self._plans: Dict[Tuple[bool, bool, bool], Tuple[int, ...]] = {}
+        for flags in [(t, p, e) for t in (False, True) for p in (False, True) for e in (False, True)]:
+            self._plans[flags] = tuple(
+                index for index in range(len(self.keywords))
+                if (flags[0] and self.theme_masks[index])
+                or (flags[1] and self.product_masks[index])
+                or (flags[2] and any(self.emotion_counts[index]))
+            )
+
+    @property
+    def fingerprint(self) -> str:
+        """Версия и хэш содержимого: меняется при любой правке словарей"""
+        return f"{self.version}:{self.source_sha[:12]}"
+
+    def match(self, text: str, include_themes: bool = True, include_products: bool = True,
+              include_emotions: bool = True) -> Tuple[int, int, List[int]]:
+        """
+        Поиск ключевых слов в тексте
+
+        Args:
+            text: Текст в нижнем регистре
+            include_themes: Искать ключевые слова тематик
+            include_products: Искать ключевые слова продуктов
+            include_emotions: Искать ключевые слова эмоций
+
+        Returns:
+            Tuple: Битовая маска тематик, битовая маска продуктов и
+            количество совпадений по каждой эмоции
+        """
+        themes = products = 0
+        emotions = [0] * len(self.emotion_names)
+        keywords = self.keywords
+
+        for index in self._plans[(include_themes, include_products, include_emotions)]:
+            if keywords[index] in text:
+                themes |= self.theme_masks[index]
+                products |= self.product_masks[index]
+                for position, count in enumerate(self.emotion_counts[index]):
+                    emotions[position] += count
+
+        if not include_themes:
+            themes = 0
+        if not include_products:
+            products = 0
+        if not include_emotions:
+            emotions = [0] * len(self.emotion_names)
+        return themes, products, emotions
+
+    @staticmethod
+    def labels(mask: int, names: List[str]) -> List[str]:
+        """Названия категорий, соответствующие битовой маске, в порядке словаря"""
+        return [name for bit, name in enumerate(names) if mask >> bit & 1]
+
+
+def list_versions(directory: Path) -> List[str]:
+    """Доступные версии словарей"""
+    return sorted(path.stem for path in directory.glob("*.json"))
+
+
+def read_active_version(directory: Path) -> str:
+    """
+    Активная версия словарей из файла ACTIVE
+
+    Если файла нет, используется последняя по имени версия.
+
+    Raises:
+        FileNotFoundError: В директории нет ни одной версии словарей
+    """
+    pointer = directory / ACTIVE_POINTER
+    if pointer.exists():
+        return pointer.read_text(encoding="utf-8").strip()
+
+    versions = list_versions(directory)
+    if not versions:
+        raise FileNotFoundError(f"Словари не найдены в {directory}")
+    return versions[-1]
+
+
+def write_active_version(directory: Path, version: str) -> None:
+    """Атомарная запись активной версии"""
+    _atomic_write(directory / ACTIVE_POINTER, f"{version}\n".encode("utf-8"))
+
+
+def compile_lexicon(source_path: Path) -> CompiledLexicon:
+    """
+    Компиляция словарей из JSON файла
+
+    Raises:
+        ValueError: Файл не соответствует формату или версия не совпадает с именем файла
+    """
+    raw = source_path.read_bytes()
+    source = LexiconSource.model_validate_json(raw)
+    if source.version != source_path.stem:
+        raise ValueError(f"Версия {source.version} не совпадает с именем файла {source_path.name}")
+    return CompiledLexicon(source, hashlib.sha256(raw).hexdigest())
+
+
+def load_lexicon(directory: Path, version: str) -> CompiledLexicon:
+    """
+    Загрузка скомпилированных словарей указанной версии
+
+    Используется готовый артефакт, если он собран из текущего содержимого
+    JSON файла; иначе словари компилируются и артефакт пересохраняется.
+
+    Args:
+        directory: Директория со словарями
+        version: Версия словарей
+
+    Returns:
+        CompiledLexicon: Скомпилированные словари
+
+    Raises:
+        FileNotFoundError: Версия не найдена
+        ValueError: Некорректный файл словарей
+    """
+    source_path = directory / f"{version}.json"
+    source_sha = hashlib.sha256(source_path.read_bytes()).hexdigest()
+    artifact_path = directory / COMPILED_DIR / f"{version}.pkl"
+
+    try:
+        with open(artifact_path, "rb") as artifact:
+            compiled = pickle.load(artifact)
+        if getattr(compiled, "format", None) == ARTIFACT_FORMAT and compiled.source_sha == source_sha:
+            return compiled
+    except FileNotFoundError:
+        pass
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        logger.warning(f"Артефакт словарей {artifact_path} поврежден, пересборка: {e}")
+
+    compiled = compile_lexicon(source_path)
+    try:
+        save_artifact(compiled, artifact_path)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить артефакт словарей {artifact_path}: {e}")
+    return compiled
+
+
+def save_artifact(compiled: CompiledLexicon, artifact_path: Path) -> None:
+    """Атомарное сохранение скомпилированных словарей"""
+    _atomic_write(artifact_path, pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL))
+    logger.info(f"Собран артефакт словарей {compiled.fingerprint}: {artifact_path}")
+
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    """Запись во временный файл и атомарная замена целевого"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def main() -> None:
+    """Сборка артефактов всех версий словарей (например, при сборке образа)"""
+    parser = argparse.ArgumentParser(description="Компиляция словарей анализа")
+    parser.add_argument("--directory", default="config/lexicons", help="Директория со словарями")
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    for version in list_versions(directory):
+        compiled = compile_lexicon(directory / f"{version}.json")
+        save_artifact(compiled, directory / COMPILED_DIR / f"{version}.pkl")
+        print(f"{compiled.fingerprint}: {len(compiled.keywords)} ключевых слов")
+
+
+if __name__ == "__main__":
+    # При запуске через -m модуль загружен как __main__, и pickle записал бы
+    # класс как __main__.CompiledLexicon, который приложение не найдет.
+    # Сборка выполняется из модуля под его настоящим именем.
+    importlib.import_module(__spec__.name).main()
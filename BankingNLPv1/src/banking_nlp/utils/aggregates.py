@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Материализованные агрегаты разговоров Banking NLP System
+
+Сводная статистика (количества и суммы из compute_stats) хранится в JSON
+файле рядом с данными вместе с версией файла разговоров, по которой она
+посчитана. Статистика записывается при генерации данных и дополняется
+статистикой новых строк при дозаписи, поэтому /data/analytics отдает ее без
+чтения строк. Если версия файла данных не совпадает с записанной (файл
+изменили в обход генератора), агрегаты считаются устаревшими и
+пересчитываются.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+AGGREGATES_FORMAT = 1
+
+
+def file_version(path: Path) -> Optional[str]:
+    """Версия файла (время изменения и размер) или None, если файла нет"""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def merge_stats(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Сложение статистик двух непересекающихся наборов строк
+
+    Args:
+        left: Статистика первого набора
+        right: Статистика второго набора
+
+    Returns:
+        Dict: Статистика объединения
+    """
+    def add_counts(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = merged.get(key, 0) + value
+        return merged
+
+    return {
+        "rows": left["rows"] + right["rows"],
+        "themes": add_counts(left["themes"], right["themes"]),
+        "products": add_counts(left["products"], right["products"]),
+        "emotions": add_counts(left["emotions"], right["emotions"]),
+        "satisfaction_sum": left["satisfaction_sum"] + right["satisfaction_sum"],
+        "duration_sum": left["duration_sum"] + right["duration_sum"],
+    }
+
+
+class MaterializedAggregates:
+    """JSON файл со статистикой, привязанной к версии файла данных"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Путь к файлу агрегатов
+        """
+        self.path = Path(path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Содержимое файла агрегатов или None, если файла нет или он поврежден"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"⚠️ Не удалось прочитать агрегаты {self.path}: {e}")
+            return None
+
+        if payload.get("format") != AGGREGATES_FORMAT:
+            return None
+        return payload
+
+    def current(self, source: Path) -> Optional[Dict[str, Any]]:
+        """
+        Статистика, если она посчитана по текущей версии файла данных
+
+        Args:
+            source: Файл разговоров
+
+        Returns:
+            Optional[Dict]: Статистика или None, если агрегаты устарели
+        """
+        payload = self.load()
+        if payload is None or payload["source"] != str(source):
+            return None
+        if payload["source_version"] != file_version(source):
+            return None
+        return payload["stats"]
+
+    def save(self, stats: Dict[str, Any], source: Path) -> None:
+        """
+        Атомарная запись статистики для текущей версии файла данных
+
+        Args:
+            stats: Статистика всего файла
+            source: Файл разговоров, по которому она посчитана
+        """
+        payload = {
+            "format": AGGREGATES_FORMAT,
+            "source": str(source),
+            "source_version": file_version(source),
+            "updated_at": datetime.now().isoformat(),
+            "stats": stats,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def apply(self, delta: Dict[str, Any], source: Path, previous_version: Optional[str]) -> bool:
+        """
+        Добавление статистики дописанных строк
+
+        Args:
+            delta: Статистика дописанных строк
+            source: Файл разговоров после дозаписи
+            previous_version: Версия файла до дозаписи
+
+        Returns:
+            bool: False, если агрегаты не соответствовали файлу до дозаписи
+            и должны быть пересчитаны полностью
+        """
+        payload = self.load()
+        if payload is None or payload["source"] != str(source):
+            return False
+        if payload["source_version"] != previous_version:
+            return False
+        self.save(merge_stats(payload["stats"], delta), source)
+        return True
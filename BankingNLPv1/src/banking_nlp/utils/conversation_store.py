@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Колоночное хранилище разговоров Banking NLP System
+
+Запись и чтение таблицы разговоров в формате Parquet (pyarrow):
+низкокардинальные колонки хранятся словарным кодированием и читаются как
+категории pandas, а количество строк и сводная статистика лежат в
+метаданных файла. Сведения о данных и аналитика поэтому читаются из футера
+за постоянное время, без чтения строк. pyarrow — необязательная
+зависимость (pip install -e ".[parquet]").
+
+ConversationWriter пишет таблицу частями (CSV или Parquet), поэтому память
+при записи ограничена размером части, а не всей таблицы.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .aggregates import merge_stats
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Колонки, хранящиеся как категории: справочные значения и идентификаторы
+CATEGORICAL_COLUMNS = (
+    "theme", "product", "product_keywords", "emotion", "region", "channel",
+    "call_result", "client_id", "agent_id",
+)
+
+# Остальные строковые колонки становятся категориями, если различных
+# значений не больше этой доли строк (тексты из шаблонов, метки времени)
+AUTO_CATEGORY_MAX_RATIO = 0.5
+
+# Целочисленные колонки, которые хранятся в наименьшем подходящем типе
+DOWNCAST_COLUMNS = {"conversation_id": "unsigned", "duration_minutes": "unsigned"}
+
+# Колонки, нужные для сводной статистики
+STATS_COLUMNS = ["theme", "product", "emotion", "client_satisfaction", "duration_minutes"]
+
+# Ключ метаданных схемы Parquet со сводной статистикой
+STATS_METADATA_KEY = b"banking_nlp.stats"
+
+
+def parquet_available() -> bool:
+    """Установлен ли pyarrow"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compute_stats(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Сводная статистика таблицы разговоров
+
+    Хранятся количества и суммы, а не средние, поэтому статистики частей
+    таблицы складываются без повторного чтения строк.
+
+    Args:
+        df: Таблица разговоров
+
+    Returns:
+        Dict: Количество строк, распределения и суммы
+    """
+    def counts(column: str) -> Dict[str, int]:
+        if column not in df.columns:
+            return {}
+        return {str(key): int(value) for key, value in df[column].value_counts().items() if value}
+
+    def total(column: str) -> float:
+        return float(df[column].sum()) if column in df.columns else 0.0
+
+    return {
+        "rows": int(len(df)),
+        "themes": counts("theme"),
+        "products": counts("product"),
+        "emotions": counts("emotion"),
+        "satisfaction_sum": total("client_satisfaction"),
+        "duration_sum": total("duration_minutes"),
+    }
+
+
+def analytics_from_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Аналитика для /data/analytics из сводной статистики
+
+    Args:
+        stats: Результат compute_stats
+
+    Returns:
+        Dict: Распределения по убыванию и средние значения
+    """
+    rows = stats["rows"]
+
+    def ordered(distribution: Dict[str, int]) -> Dict[str, int]:
+        return dict(sorted(distribution.items(), key=lambda item: item[1], reverse=True))
+
+    return {
+        "total_conversations": rows,
+        "themes_distribution": ordered(stats["themes"]),
+        "products_distribution": ordered(stats["products"]),
+        "emotions_distribution": ordered(stats["emotions"]),
+        "average_satisfaction": stats["satisfaction_sum"] / rows if rows else None,
+        "average_duration": stats["duration_sum"] / rows if rows else None,
+    }
+
+
+def to_categorical(df: pd.DataFrame) -> pd.DataFrame:
+    """Перевод низкокардинальных колонок в категории"""
+    columns = {column: "category" for column in CATEGORICAL_COLUMNS if column in df.columns}
+    return df.astype(columns) if columns else df
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Компактное представление таблицы разговоров в памяти
+
+    Справочные колонки и идентификаторы хранятся как категории (каждая
+    строка хранится один раз, в ячейке — целочисленный код), целые числа
+    приводятся к наименьшему типу. Значения и их порядок не меняются.
+
+    Args:
+        df: Таблица разговоров
+
+    Returns:
+        pd.DataFrame: Таблица с компактными типами колонок
+    """
+    df = to_categorical(df)
+    for column in df.columns:
+        series = df[column]
+        if column in DOWNCAST_COLUMNS and pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast=DOWNCAST_COLUMNS[column])
+        elif pd.api.types.is_string_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            if len(series) and series.nunique(dropna=False) <= AUTO_CATEGORY_MAX_RATIO * len(series):
+                df[column] = series.astype("category")
+    return df
+
+
+def read_csv_typed(path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Чтение CSV разговоров сразу в компактные типы
+
+    Категориальные колонки разбираются в категории при чтении, без
+    промежуточных строковых объектов на каждую ячейку.
+
+    Args:
+        path: Путь к файлу
+        columns: Читаемые колонки
+
+    Returns:
+        pd.DataFrame: Таблица с компактными типами колонок
+    """
+    dtype = {column: "category" for column in CATEGORICAL_COLUMNS
+             if columns is None or column in columns}
+    df = pd.read_csv(path, usecols=columns, dtype=dtype, encoding="utf-8-sig")
+    return optimize_dtypes(df)
+
+
+def memory_usage_bytes(df: pd.DataFrame) -> int:
+    """Объем памяти таблицы с учетом строковых объектов"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def write_parquet(df: pd.DataFrame, path: Path, row_group_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Атомарная запись таблицы разговоров в Parquet со статистикой в метаданных
+
+    Args:
+        df: Таблица разговоров
+        path: Путь к файлу
+        row_group_size: Количество строк в группе (по умолчанию — решает pyarrow)
+
+    Returns:
+        Dict: Записанная сводная статистика
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    stats = compute_stats(df)
+    table = pa.Table.from_pandas(to_categorical(df), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[STATS_METADATA_KEY] = json.dumps(stats, ensure_ascii=False).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        pq.write_table(table, tmp_path, row_group_size=row_group_size, compression="zstd")
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return stats
+
+
+def read_parquet(path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Чтение таблицы разговоров из Parquet
+
+    Args:
+        path: Путь к файлу
+        columns: Читаемые колонки; остальные не читаются с диска
+
+    Returns:
+        pd.DataFrame: Таблица с компактными типами колонок
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=list(columns) if columns is not None else None)
+    return optimize_dtypes(table.to_pandas())
+
+
+def read_parquet_summary(path: Path) -> Tuple[int, Optional[Dict[str, Any]], List[str]]:
+    """
+    Количество строк, статистика и колонки из футера Parquet без чтения данных
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Tuple: Количество строк, статистика (None, если файл записан не write_parquet) и имена колонок
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    # ConversationWriter дописывает статистику в метаданные файла после записи строк
+    raw_stats = (parquet_file.metadata.metadata or {}).get(STATS_METADATA_KEY) \
+        or (schema.metadata or {}).get(STATS_METADATA_KEY)
+    stats = json.loads(raw_stats) if raw_stats else None
+    return parquet_file.metadata.num_rows, stats, list(schema.names)
+
+
+class ConversationWriter:
+    """
+    Потоковая запись таблицы разговоров частями
+
+    Части дописываются в временный файл рядом с целевым, который
+    переименовывается в path при close; при ошибке внутри with временный
+    файл удаляется, а целевой остается прежним. Статистика всех частей
+    складывается по мере записи и для Parquet сохраняется в метаданных
+    файла, как у write_parquet.
+    """
+
+    def __init__(self, path: Path, storage_format: str = "csv"):
+        """
+        Args:
+            path: Путь к файлу
+            storage_format: Формат файла: csv или parquet
+        """
+        self.path = Path(path)
+        self.storage_format = storage_format
+        self.stats: Optional[Dict[str, Any]] = None
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._handle = None
+        self._schema = None
+
+    def __enter__(self) -> "ConversationWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Дозапись части таблицы
+
+        Args:
+            df: Очередные строки с одинаковым набором колонок
+        """
+        chunk_stats = compute_stats(df)
+        self.stats = chunk_stats if self.stats is None else merge_stats(self.stats, chunk_stats)
+
+        if self.storage_format == "parquet":
+            self._write_parquet(df)
+        else:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = open(self._tmp_path, "w", encoding="utf-8-sig", newline="")
+                df.to_csv(self._handle, index=False)
+            else:
+                df.to_csv(self._handle, index=False, header=False)
+
+    def _write_parquet(self, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._handle is None:
+            # Категории частей различаются, поэтому словарные колонки
+            # приводятся к одному типу индексов для всех групп строк
+            schema = pa.Table.from_pandas(to_categorical(df), preserve_index=False).schema
+            for i, field in enumerate(schema):
+                if pa.types.is_dictionary(field.type):
+                    schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), field.type.value_type)))
+            self._schema = schema
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = pq.ParquetWriter(self._tmp_path, schema, compression="zstd")
+
+        self._handle.write_table(pa.Table.from_pandas(to_categorical(df), schema=self._schema, preserve_index=False))
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Завершение записи и атомарная замена целевого файла
+
+        Returns:
+            Dict: Статистика всех записанных строк
+        """
+        if self._handle is None:
+            raise ValueError("Нет записанных строк")
+        if self.storage_format == "parquet":
+            self._handle.add_key_value_metadata(
+                {STATS_METADATA_KEY: json.dumps(self.stats, ensure_ascii=False).encode("utf-8")}
+            )
+        self._handle.close()
+        self._handle = None
+        os.replace(self._tmp_path, self.path)
+        return self.stats
+
+    def abort(self) -> None:
+        """Прерывание записи без замены целевого файла"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._tmp_path.unlink(missing_ok=True)
@@ -5,24 +5,81 @@
 """
 
 import csv
+import hashlib
 import json
+import os
 import random
-import uuid
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, Tuple, Union
+import numpy as np
 import pandas as pd
 from faker import Faker
 
+from .aggregates import MaterializedAggregates, merge_stats
+from .conversation_store import ConversationWriter, compute_stats, write_parquet
+
 import logging
 logger = logging.getLogger(__name__)
 
 
+# Позитивные и негативные маркеры для определения эмоции
+POSITIVE_WORDS = ['спасибо', 'отлично', 'хорошо', 'интересует', 'понравилось', 'удобно']
+NEGATIVE_WORDS = ['проблема', 'недоволен', 'плохо', 'жалуюсь', 'не работает', 'ошибка']
+
+CALL_RESULTS_BY_THEME = {
+    'продажи': ['заявка оформлена', 'требуется консультация', 'отказ', 'перезвонить позже'],
+    'поддержка': ['проблема решена', 'эскалация', 'требуется время', 'дополнительная информация'],
+    'жалобы': ['жалоба рассмотрена', 'компенсация', 'эскалация', 'повторный контакт'],
+    'информация': ['информация предоставлена', 'отправлены документы', 'консультация завершена'],
+    'техподдержка': ['проблема решена', 'тикет создан', 'инструкции отправлены', 'требуется визит']
+}
+
+REGIONS = [
+    'Москва', 'Санкт-Петербург', 'Екатеринбург', 'Новосибирск',
+    'Казань', 'Ростов-на-Дону', 'Краснодар', 'Воронеж', 'Самара'
+]
+
+CHANNELS = ['телефон', 'чат', 'email', 'офис']
+
+
+def _grouped_choice(rng: np.random.Generator, groups: Sequence[Sequence[str]],
+                    group_codes: np.ndarray) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Равновероятный выбор значения из списка группы каждой строки
+
+    Args:
+        rng: Генератор случайных чисел
+        groups: Списки значений по группам
+        group_codes: Номер группы для каждой строки
+
+    Returns:
+        Tuple: Коды значений для каждой строки и уникальные значения
+    """
+    sizes = np.array([len(group) for group in groups])
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    flat_codes, uniques = pd.factorize(pd.Index([value for group in groups for value in group]))
+
+    picks = offsets[group_codes] + (rng.random(len(group_codes)) * sizes[group_codes]).astype(np.int64)
+    return flat_codes[picks], uniques
+
+
 class BankingDataGenerator:
     """Генератор реалистичных банковских разговоров"""
     
-    def __init__(self, locale: str = 'ru_RU'):
-        """Инициализация генератора"""
+    def __init__(self, locale: str = 'ru_RU', storage_format: str = 'csv', output_dir: str = 'data'):
+        """
+        Инициализация генератора
+
+        Args:
+            locale: Локаль Faker
+            storage_format: Формат файлов разговоров: csv или parquet
+            output_dir: Директория с поддиректориями raw/ и processed/
+        """
+        self.storage_format = storage_format
+        self.output_dir = output_dir
         self.faker = Faker(locale)
         self.faker.seed_instance(42)  # Для воспроизводимости результатов
         
@@ -137,7 +194,7 @@ class BankingDataGenerator:
             'call_result': self._determine_call_result(theme),
             'follow_up_required': random.choice([True, False]),
             'region': self._random_region(),
-            'channel': random.choice(['телефон', 'чат', 'email', 'офис'])
+            'channel': random.choice(CHANNELS)
         }
     
     def _create_conversation_text(self, theme: str, product: str) -> str:
@@ -179,26 +236,25 @@ class BankingDataGenerator:
     
     def _analyze_emotion(self, text: str, theme: str) -> str:
         """Анализ эмоций на основе тематики и ключевых слов"""
-        text_lower = text.lower()
-        
-        # Позитивные и негативные маркеры
-        positive_words = ['спасибо', 'отлично', 'хорошо', 'интересует', 'понравилось', 'удобно']
-        negative_words = ['проблема', 'недоволен', 'плохо', 'жалуюсь', 'не работает', 'ошибка']
-        
-        # Базовая эмоция по тематике
+        emotion = self._keyword_emotion(text)
+        if emotion is not None:
+            return emotion
+
+        # Используем вероятность на основе тематики
         emotion_base = self.themes[theme]['emotion_weight']
-        
-        # Корректировка по ключевым словам
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
+        return 'позитивная' if random.random() < emotion_base else 'негативная'
+
+    def _keyword_emotion(self, text: str) -> Optional[str]:
+        """Эмоция по ключевым словам или None, если маркеров поровну"""
+        text_lower = text.lower()
+        positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+        negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+
         if negative_count > positive_count:
             return 'негативная'
         elif positive_count > negative_count:
             return 'позитивная'
-        else:
-            # Используем вероятность на основе тематики
-            return 'позитивная' if random.random() < emotion_base else 'негативная'
+        return None
     
     def _generate_satisfaction_score(self, emotion: str) -> float:
         """Генерирует оценку удовлетворенности клиента"""
@@ -211,23 +267,11 @@ class BankingDataGenerator:
     
     def _determine_call_result(self, theme: str) -> str:
         """Определяет результат звонка"""
-        results_by_theme = {
-            'продажи': ['заявка оформлена', 'требуется консультация', 'отказ', 'перезвонить позже'],
-            'поддержка': ['проблема решена', 'эскалация', 'требуется время', 'дополнительная информация'],
-            'жалобы': ['жалоба рассмотрена', 'компенсация', 'эскалация', 'повторный контакт'],
-            'информация': ['информация предоставлена', 'отправлены документы', 'консультация завершена'],
-            'техподдержка': ['проблема решена', 'тикет создан', 'инструкции отправлены', 'требуется визит']
-        }
-        
-        return random.choice(results_by_theme.get(theme, ['обработано']))
+        return random.choice(CALL_RESULTS_BY_THEME.get(theme, ['обработано']))
     
     def _random_region(self) -> str:
         """Генерирует случайный регион"""
-        regions = [
-            'Москва', 'Санкт-Петербург', 'Екатеринбург', 'Новосибирск',
-            'Казань', 'Ростов-на-Дону', 'Краснодар', 'Воронеж', 'Самара'
-        ]
-        return random.choice(regions)
+        return random.choice(REGIONS)
     
     def _random_timestamp(self) -> str:
         """Генерирует случайную временную метку за последние 30 дней"""
@@ -243,500 +287,402 @@ class BankingDataGenerator:
         
         return random_date.strftime('%Y-%m-%d %H:%M:%S')
     
-    def generate_csv_files(self, num_conversations: int = 1000) -> None:
-        """Генерирует CSV файлы с банковскими разговорами"""
+    def generate_dataframe(self, num_conversations: int,
+                           seed: Union[int, np.random.SeedSequence, np.random.Generator, None] = None,
+                           reference_date: Optional[datetime] = None, first_id: int = 1) -> pd.DataFrame:
+        """
+        Векторизованная генерация разговоров
+
+        Все колонки выбираются целыми массивами NumPy с теми же
+        распределениями, что и в generate_conversation. Тексты собираются
+        заранее для каждой пары тематика/продукт, а строки хранят только
+        номер текста, поэтому справочные колонки сразу получаются
+        категориальными.
+
+        Args:
+            num_conversations: Количество разговоров
+            seed: Зерно или numpy.random.Generator (None — случайное)
+            reference_date: Конец 30-дневного окна меток времени (по умолчанию — сейчас)
+            first_id: conversation_id первой строки
+
+        Returns:
+            pd.DataFrame: Таблица разговоров с колонками generate_conversation
+        """
+        rng = np.random.default_rng(seed)
+        n = num_conversations
+        theme_names = list(self.themes.keys())
+        product_names = list(self.products.keys())
+
+        theme_codes = rng.integers(0, len(theme_names), n)
+        product_codes = rng.integers(0, len(product_names), n)
+
+        # Тексты: шаблон тематики, подставленный продукт и дополнительные реплики
+        text_groups = []
+        for theme in theme_names:
+            for product in product_names:
+                additional = self._get_additional_phrases(theme, product)
+                text_groups.append([
+                    template.format(product=product) + (f"\n{additional}" if additional else "")
+                    for template in self.themes[theme]['templates']
+                ])
+        text_codes, texts = _grouped_choice(rng, text_groups, theme_codes * len(product_names) + product_codes)
+
+        # Эмоция: по ключевым словам текста, при равенстве — по весу тематики
+        emotions = ['позитивная', 'негативная']
+        keyword_emotion = np.array([
+            {'позитивная': 0, 'негативная': 1}.get(self._keyword_emotion(text), -1) for text in texts
+        ])
+        emotion_codes = keyword_emotion[text_codes]
+        weights = np.array([self.themes[theme]['emotion_weight'] for theme in theme_names])
+        undecided = emotion_codes < 0
+        emotion_codes[undecided] = np.where(rng.random(n)[undecided] < weights[theme_codes[undecided]], 0, 1)
+        positive = emotion_codes == 0
+
+        satisfaction = np.round(rng.uniform(np.where(positive, 3.5, 1.0), np.where(positive, 5.0, 2.5)), 1)
+
+        # Метки времени: день из 31, час 9-17, минута — как в _random_timestamp
+        start_date = (reference_date or datetime.now()) - timedelta(days=30)
+        days, hours, minutes = np.meshgrid(np.arange(31), np.arange(9, 18), np.arange(60), indexing='ij')
+        offsets = pd.to_timedelta((days * 1440 + hours * 60 + minutes).ravel(), unit='min')
+        timestamps = (pd.Timestamp(start_date) + offsets).strftime('%Y-%m-%d %H:%M:%S')
+        timestamp_codes = rng.integers(0, len(timestamps), n)
+
+        call_result_codes, call_results = _grouped_choice(
+            rng, [CALL_RESULTS_BY_THEME.get(theme, ['обработано']) for theme in theme_names], theme_codes
+        )
+        product_keywords = [', '.join(self.products[product]['keywords'][:3]) for product in product_names]
+
+        def categorical(codes: np.ndarray, categories: Sequence[str]) -> pd.Categorical:
+            return pd.Categorical.from_codes(codes, categories=pd.Index(categories))
+
+        return pd.DataFrame({
+            'conversation_id': np.arange(first_id, first_id + n),
+            'client_id': categorical(rng.integers(0, 90000, n), [f"client_{i}" for i in range(10000, 100000)]),
+            'agent_id': categorical(rng.integers(0, 900, n), [f"agent_{i}" for i in range(100, 1000)]),
+            'timestamp': categorical(timestamp_codes, timestamps),
+            'conversation_text': categorical(text_codes, texts),
+            'theme': categorical(theme_codes, theme_names),
+            'product': categorical(product_codes, product_names),
+            'product_keywords': categorical(product_codes, product_keywords),
+            'emotion': categorical(emotion_codes, emotions),
+            'client_satisfaction': satisfaction,
+            'duration_minutes': rng.integers(2, 46, n),
+            'call_result': categorical(call_result_codes, call_results),
+            'follow_up_required': rng.random(n) < 0.5,
+            'region': categorical(rng.integers(0, len(REGIONS), n), REGIONS),
+            'channel': categorical(rng.integers(0, len(CHANNELS), n), CHANNELS),
+        })
+
+    def generate_csv_files(self, num_conversations: int = 1000, vectorized: bool = False,
+                           seed: Optional[int] = None, chunk_size: int = 100_000) -> None:
+        """
+        Генерирует CSV файлы с банковскими разговорами
+
+        Разговоры генерируются и записываются частями по chunk_size строк,
+        сводки обновляются по каждой части, поэтому память не зависит от
+        num_conversations.
+
+        Args:
+            num_conversations: Количество разговоров
+            vectorized: Использовать векторизованную генерацию generate_dataframe
+            seed: Зерно векторизованной генерации
+            chunk_size: Строк в одной части
+        """
         
         logger.info("🏦 Banking NLP System - Генератор CSV данных")
-        logger.info("🚀 Начинаем генерацию {num_conversations} разговоров...")
+        logger.info(f"🚀 Начинаем генерацию {num_conversations} разговоров...")
         
         # Создаем необходимые директории
         self._create_directories()
-        
-        # Генерируем данные
-        conversations = []
-        
-        for i in range(num_conversations):
-            conversation = self.generate_conversation(i + 1)
-            conversations.append(conversation)
-            
-            # Показываем прогресс каждые 100 записей
-            if (i + 1) % 100 == 0:
-                logger.info("   Сгенерировано: {i + 1}/{num_conversations}")
-        
-        # Создаем DataFrame
-        df = pd.DataFrame(conversations)
-        
+
+        processed_file = Path(f'{self.output_dir}/processed/conversations_processed.{self.storage_format}')
+        summary = GenerationSummary()
+        rng = np.random.default_rng(seed)
+        # Одна опорная дата для всех частей, чтобы окно меток времени совпадало
+        reference_date = datetime.now()
+
+        with ConversationWriter(processed_file, self.storage_format) as writer:
+            for first_row in range(0, num_conversations, chunk_size):
+                rows = min(chunk_size, num_conversations - first_row)
+                if vectorized:
+                    df = self.generate_dataframe(rows, rng, reference_date=reference_date, first_id=first_row + 1)
+                else:
+                    df = pd.DataFrame([
+                        self.generate_conversation(conv_id)
+                        for conv_id in range(first_row + 1, first_row + rows + 1)
+                    ])
+                writer.write(df)
+                summary.update(df)
+                logger.info(f"   Сгенерировано: {first_row + rows}/{num_conversations}")
+        summary.stats = writer.stats
+
         # Сохраняем в различных форматах
-        self._save_to_csv(df, conversations)
+        self._save_outputs(processed_file, summary)
         
-        logger.info("✅ Генерация завершена! Создано записей: {num_conversations}")
-        logger.info("📁 Файлы сохранены в директории: data/")
+        logger.info(f"✅ Генерация завершена! Создано записей: {num_conversations}")
+        logger.info(f"📁 Файлы сохранены в директории: {self.output_dir}/")
         
         # Показываем статистику
-        self._print_statistics(df)
+        self._print_statistics(summary)
     
     def _create_directories(self) -> None:
         """Создает необходимые директории для данных"""
-        directories = ['data', 'data/raw', 'data/processed', 'logs']
+        directories = [self.output_dir, f'{self.output_dir}/raw', f'{self.output_dir}/processed', 'logs']
         
         for directory in directories:
             Path(directory).mkdir(parents=True, exist_ok=True)
-            logger.info("✅ Создана директория: {directory}")
+            logger.info(f"✅ Создана директория: {directory}")
     
-    def _save_to_csv(self, df: pd.DataFrame, conversations: List[Dict]) -> None:
-        """Сохраняет данные в CSV файлы"""
-        
-        # Основной файл с обработанными данными
-        processed_file = 'data/processed/conversations_processed.csv'
-        df.to_csv(processed_file, index=False, encoding='utf-8-sig')
-        logger.info("💾 Сохранен файл: {processed_file}")
+    def _save_outputs(self, processed_file: Path, summary: "GenerationSummary") -> None:
+        """Сохраняет копию, агрегаты и сводки для записанного файла разговоров"""
+        logger.info(f"💾 Сохранен файл: {processed_file}")
+
+        # Агрегаты для /data/analytics, привязанные к версии записанного файла
+        aggregates = MaterializedAggregates(Path(f'{self.output_dir}/processed/conversation_aggregates.json'))
+        aggregates.save(summary.stats, processed_file)
         
-        # Сырые данные с временной меткой
+        # Сырые данные с временной меткой: копия файла без повторной сериализации
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        raw_file = f'data/raw/conversations_raw_{timestamp}.csv'
-        df.to_csv(raw_file, index=False, encoding='utf-8-sig')
-        logger.info("💾 Сохранен файл: {raw_file}")
+        raw_file = f'{self.output_dir}/raw/conversations_raw_{timestamp}.{self.storage_format}'
+        shutil.copyfile(processed_file, raw_file)
+        logger.info(f"💾 Сохранен файл: {raw_file}")
         
         # Аналитический файл с агрегированными данными
-        analytics_df = self._create_analytics(df)
-        analytics_file = 'data/processed/conversation_analytics.csv'
-        analytics_df.to_csv(analytics_file, index=False, encoding='utf-8-sig')
-        logger.info("📊 Сохранен аналитический файл: {analytics_file}")
+        analytics_file = f'{self.output_dir}/processed/conversation_analytics.csv'
+        summary.analytics().to_csv(analytics_file, index=False, encoding='utf-8-sig')
+        logger.info(f"📊 Сохранен аналитический файл: {analytics_file}")
         
         # Сводка по тематикам
-        themes_summary = df.groupby(['theme', 'product']).agg({
-            'conversation_id': 'count',
-            'client_satisfaction': 'mean',
-            'duration_minutes': 'mean'
-        }).round(2).reset_index()
-        themes_summary.columns = ['theme', 'product', 'count', 'avg_satisfaction', 'avg_duration']
-        
-        themes_file = 'data/processed/themes_summary.csv'
-        themes_summary.to_csv(themes_file, index=False, encoding='utf-8-sig')
-        logger.info("📋 Сохранена сводка тематик: {themes_file}")
-    
-    def _create_analytics(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Создает аналитические данные"""
-        analytics = {
-            'metric': [
-                'total_conversations', 'avg_duration', 'avg_satisfaction', 
-                'positive_emotions', 'negative_emotions',
-                'themes_count', 'products_count', 'unique_clients'
-            ],
-            'value': [
-                len(df),
-                round(df['duration_minutes'].mean(), 2),
-                round(df['client_satisfaction'].mean(), 2),
-                len(df[df['emotion'] == 'позитивная']),
-                len(df[df['emotion'] == 'негативная']),
-                df['theme'].nunique(),
-                df['product'].nunique(),
-                df['client_id'].nunique()
-            ]
-        }
-        
-        return pd.DataFrame(analytics)
-    
-    def _print_statistics(self, df: pd.DataFrame) -> None:
+        themes_file = f'{self.output_dir}/processed/themes_summary.csv'
+        summary.themes_summary().to_csv(themes_file, index=False, encoding='utf-8-sig')
+        logger.info(f"📋 Сохранена сводка тематик: {themes_file}")
+
+    def _print_statistics(self, summary: "GenerationSummary") -> None:
         """Выводит статистику сгенерированных данных"""
+        stats = summary.stats
+        total = stats['rows']
         logger.info("\n📊 Статистика сгенерированных данных:")
         logger.info("-" * 40)
-        logger.info("Всего разговоров: {len(df)}")
-        logger.info("Уникальных клиентов: {df['client_id'].nunique()}")
-        logger.info("Тематик: {df['theme'].nunique()}")
-        logger.info("Продуктов: {df['product'].nunique()}")
-        logger.info("Средняя продолжительность: {df['duration_minutes'].mean():.1f} мин")
-        logger.info("Средняя удовлетворенность: {df['client_satisfaction'].mean():.1f}/5.0")
+        logger.info(f"Всего разговоров: {total}")
+        logger.info(f"Уникальных клиентов: {len(summary.clients)}")
+        logger.info(f"Тематик: {len(stats['themes'])}")
+        logger.info(f"Продуктов: {len(stats['products'])}")
+        logger.info(f"Средняя продолжительность: {stats['duration_sum'] / total:.1f} мин")
+        logger.info(f"Средняя удовлетворенность: {stats['satisfaction_sum'] / total:.1f}/5.0")
         
         logger.info("\nРаспределение по тематикам:")
-        theme_counts = df['theme'].value_counts()
-        for theme, count in theme_counts.items():
-            logger.info("  {theme}: {count} ({count/len(df)*100:.1f}%)")
+        for theme, count in sorted(stats['themes'].items(), key=lambda item: item[1], reverse=True):
+            logger.info(f"  {theme}: {count} ({count/total*100:.1f}%)")
         
         logger.info("\nРаспределение эмоций:")
-        emotion_counts = df['emotion'].value_counts()
-        for emotion, count in emotion_counts.items():
-            logger.info("  {emotion}: {count} ({count/len(df)*100:.1f}%)")
+        for emotion, count in sorted(stats['emotions'].items(), key=lambda item: item[1], reverse=True):
+            logger.info(f"  {emotion}: {count} ({count/total*100:.1f}%)")
 
 
-def main():
-    """Основная функция запуска генератора"""
-    generator = BankingDataGenerator()
-    
-    # Генерируем 1000 разговоров (можно изменить количество)
-    generator.generate_csv_files(num_conversations=1000)
-    
-    logger.info("\n🎯 Генерация завершена успешно!")
-    logger.info("📁 Проверьте директорию data/ для просмотра созданных файлов")
-    logger.info("🔗 Файлы готовы для использования в Banking NLP System")
+class GenerationSummary:
+    """
+    Сводки генерации, обновляемые по каждой записанной части
 
+    Хранит суммы по парам тематика/продукт и множество клиентов (не больше
+    90 000 идентификаторов), а не строки, поэтому ее размер не зависит от
+    количества разговоров.
+    """
 
-if __name__ == "__main__":
-    main()
-# -*- coding: utf-8 -*-
-"""
-Генератор CSV данных для Banking NLP System
-Создает реалистичные банковские разговоры для тестирования и обучения
-"""
+    def __init__(self):
+        self.stats: Optional[Dict[str, Any]] = None
+        self.clients = set()
+        self._pairs: Optional[pd.DataFrame] = None
 
-import csv
-import json
-import random
-import uuid
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Dict, Any, Optional
-import pandas as pd
-from faker import Faker
+    def update(self, df: pd.DataFrame) -> None:
+        """Учет очередной части разговоров"""
+        pairs = df.groupby(['theme', 'product'], observed=True).agg(
+            count=('conversation_id', 'count'),
+            satisfaction_sum=('client_satisfaction', 'sum'),
+            duration_sum=('duration_minutes', 'sum'),
+        )
+        pairs.index = pairs.index.set_levels([level.astype(str) for level in pairs.index.levels])
+        self._pairs = pairs if self._pairs is None else self._pairs.add(pairs, fill_value=0)
+        self.clients.update(df['client_id'].astype(str).unique())
 
+    def themes_summary(self) -> pd.DataFrame:
+        """Количество, средняя удовлетворенность и длительность по тематикам и продуктам"""
+        pairs = self._pairs.sort_index()
+        return pd.DataFrame({
+            'theme': pairs.index.get_level_values(0),
+            'product': pairs.index.get_level_values(1),
+            'count': pairs['count'].astype(int).to_numpy(),
+            'avg_satisfaction': (pairs['satisfaction_sum'] / pairs['count']).round(2).to_numpy(),
+            'avg_duration': (pairs['duration_sum'] / pairs['count']).round(2).to_numpy(),
+        })
 
-class BankingDataGenerator:
-    """Генератор реалистичных банковских разговоров"""
-    
-    def __init__(self, locale: str = 'ru_RU'):
-        """Инициализация генератора"""
-        self.faker = Faker(locale)
-        self.faker.seed_instance(42)  # Для воспроизводимости результатов
-        
-        # Банковские продукты и их ключевые слова
-        self.products = {
-            'кредит': {
-                'keywords': ['кредит', 'займ', 'ссуда', 'кредитование', 'заем'],
-                'subcategories': ['потребительский', 'автокредит', 'рефинансирование']
-            },
-            'вклад': {
-                'keywords': ['вклад', 'депозит', 'накопления', 'сбережения', 'проценты'],
-                'subcategories': ['срочный', 'до востребования', 'пенсионный']
-            },
-            'карта': {
-                'keywords': ['карта', 'карточка', 'платежная карта', 'дебетовая', 'кредитная'],
-                'subcategories': ['дебетовая', 'кредитная', 'зарплатная']
-            },
-            'ипотека': {
-                'keywords': ['ипотека', 'жилищный кредит', 'недвижимость', 'квартира', 'дом'],
-                'subcategories': ['первичное жилье', 'вторичное жилье', 'рефинансирование']
-            },
-            'страхование': {
-                'keywords': ['страховка', 'страхование', 'полис', 'КАСКО', 'ОСАГО'],
-                'subcategories': ['автострахование', 'жизнь', 'имущество']
-            },
-            'инвестиции': {
-                'keywords': ['инвестиции', 'ИИС', 'брокерский счет', 'ценные бумаги'],
-                'subcategories': ['ИИС', 'брокерский счет', 'ПИФ']
-            }
-        }
-        
-        # Тематики разговоров с шаблонами
-        self.themes = {
-            'продажи': {
-                'templates': [
-                    'Клиент: Здравствуйте, меня интересует {product}. Можете рассказать подробнее?\nОператор: Конечно! С удовольствием расскажу о наших условиях по {product}.',
-                    'Клиент: Хочу оформить {product}. Какие у вас условия?\nОператор: Отличный выбор! Расскажу вам о наших предложениях.',
-                    'Клиент: Слышал про ваш {product}. Интересно узнать больше.\nОператор: Да, это один из наших популярных продуктов.'
-                ],
-                'emotion_weight': 0.7
-            },
-            'поддержка': {
-                'templates': [
-                    'Клиент: У меня проблема с {product}. Не могу воспользоваться.\nОператор: Давайте разберемся с вашей проблемой.',
-                    'Клиент: Не работает {product}. Что делать?\nОператор: Сейчас поможем решить этот вопрос.',
-                    'Клиент: Возникли трудности с {product}.\nОператор: Понимаю вашу ситуацию, поможем разобраться.'
-                ],
-                'emotion_weight': 0.3
-            },
-            'жалобы': {
-                'templates': [
-                    'Клиент: Я недоволен обслуживанием по {product}.\nОператор: Приносим извинения, поможем решить вопрос.',
-                    'Клиент: Плохо работает {product}. Хочу пожаловаться.\nОператор: Принимаем вашу жалобу, разберемся.',
-                    'Клиент: Не устраивают условия {product}.\nОператор: Давайте найдем решение вместе.'
-                ],
-                'emotion_weight': 0.1
-            },
-            'информация': {
-                'templates': [
-                    'Клиент: Расскажите, как работает {product}?\nОператор: Объясню все детали нашего {product}.',
-                    'Клиент: Какие условия по {product}?\nОператор: С удовольствием расскажу об условиях.',
-                    'Клиент: Хочу узнать больше про {product}.\nОператор: Конечно, объясню все подробно.'
-                ],
-                'emotion_weight': 0.5
-            },
-            'техподдержка': {
-                'templates': [
-                    'Клиент: Не могу войти в мобильное приложение.\nОператор: Поможем восстановить доступ.',
-                    'Клиент: Заблокирована карта, как разблокировать?\nОператор: Сейчас проверим и разблокируем.',
-                    'Клиент: Не приходят SMS с кодами.\nОператор: Проверим настройки SMS-уведомлений.'
-                ],
-                'emotion_weight': 0.4
-            }
-        }
-        
-        # Конкуренты для реалистичности
-        self.competitors = [
-            'Сбербанк', 'ВТБ', 'Газпромбанк', 'Альфа-Банк', 'Тинькофф',
-            'Россельхозбанк', 'Банк Открытие', 'Промсвязьбанк'
-        ]
-        
-    def generate_conversation(self, conv_id: int) -> Dict[str, Any]:
-        """Генерирует один банковский разговор"""
-        
-        # Выбираем случайную тематику и продукт
-        theme = random.choice(list(self.themes.keys()))
-        product_category = random.choice(list(self.products.keys()))
-        product_info = self.products[product_category]
-        
-        # Создаем текст разговора
-        conversation_text = self._create_conversation_text(theme, product_category)
-        
-        # Определяем эмоциональную окраску
-        emotion = self._analyze_emotion(conversation_text, theme)
-        
-        # Генерируем дополнительные поля
-        client_id = f"client_{random.randint(10000, 99999)}"
-        agent_id = f"agent_{random.randint(100, 999)}"
-        
-        return {
-            'conversation_id': conv_id,
-            'client_id': client_id,
-            'agent_id': agent_id,
-            'timestamp': self._random_timestamp(),
-            'conversation_text': conversation_text,
-            'theme': theme,
-            'product': product_category,
-            'product_keywords': ', '.join(product_info['keywords'][:3]),
-            'emotion': emotion,
-            'client_satisfaction': self._generate_satisfaction_score(emotion),
-            'duration_minutes': random.randint(2, 45),
-            'call_result': self._determine_call_result(theme),
-            'follow_up_required': random.choice([True, False]),
-            'region': self._random_region(),
-            'channel': random.choice(['телефон', 'чат', 'email', 'офис'])
-        }
-    
-    def _create_conversation_text(self, theme: str, product: str) -> str:
-        """Создает реалистичный текст разговора"""
-        template = random.choice(self.themes[theme]['templates'])
-        conversation = template.format(product=product)
-        
-        # Добавляем дополнительные реплики для реалистичности
-        additional_phrases = self._get_additional_phrases(theme, product)
-        if additional_phrases:
-            conversation += f"\n{additional_phrases}"
-            
-        return conversation
-    
-    def _get_additional_phrases(self, theme: str, product: str) -> str:
-        """Генерирует дополнительные фразы для разговора"""
-        additional = []
-        
-        if theme == 'продажи':
-            additional.extend([
-                f"Клиент: А какие проценты по {product}?",
-                "Оператор: Процентная ставка зависит от суммы и срока.",
-                "Клиент: Спасибо за информацию, подумаю."
-            ])
-        elif theme == 'поддержка':
-            additional.extend([
-                "Клиент: Когда это можно будет исправить?",
-                "Оператор: Постараемся решить в течение дня.",
-                "Клиент: Хорошо, буду ждать."
-            ])
-        elif theme == 'жалобы':
-            additional.extend([
-                "Клиент: Это уже не первый раз!",
-                "Оператор: Понимаем ваше недовольство, примем меры.",
-                "Клиент: Надеюсь, что ситуация изменится."
-            ])
-            
-        return '\n'.join(additional) if additional else ""
-    
-    def _analyze_emotion(self, text: str, theme: str) -> str:
-        """Анализ эмоций на основе тематики и ключевых слов"""
-        text_lower = text.lower()
-        
-        # Позитивные и негативные маркеры
-        positive_words = ['спасибо', 'отлично', 'хорошо', 'интересует', 'понравилось', 'удобно']
-        negative_words = ['проблема', 'недоволен', 'плохо', 'жалуюсь', 'не работает', 'ошибка']
-        
-        # Базовая эмоция по тематике
-        emotion_base = self.themes[theme]['emotion_weight']
-        
-        # Корректировка по ключевым словам
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if negative_count > positive_count:
-            return 'негативная'
-        elif positive_count > negative_count:
-            return 'позитивная'
-        else:
-            # Используем вероятность на основе тематики
-            return 'позитивная' if random.random() < emotion_base else 'негативная'
-    
-    def _generate_satisfaction_score(self, emotion: str) -> float:
-        """Генерирует оценку удовлетворенности клиента"""
-        if emotion == 'позитивная':
-            return round(random.uniform(3.5, 5.0), 1)
-        elif emotion == 'негативная':
-            return round(random.uniform(1.0, 2.5), 1)
-        else:
-            return round(random.uniform(2.5, 3.5), 1)
-    
-    def _determine_call_result(self, theme: str) -> str:
-        """Определяет результат звонка"""
-        results_by_theme = {
-            'продажи': ['заявка оформлена', 'требуется консультация', 'отказ', 'перезвонить позже'],
-            'поддержка': ['проблема решена', 'эскалация', 'требуется время', 'дополнительная информация'],
-            'жалобы': ['жалоба рассмотрена', 'компенсация', 'эскалация', 'повторный контакт'],
-            'информация': ['информация предоставлена', 'отправлены документы', 'консультация завершена'],
-            'техподдержка': ['проблема решена', 'тикет создан', 'инструкции отправлены', 'требуется визит']
-        }
-        
-        return random.choice(results_by_theme.get(theme, ['обработано']))
-    
-    def _random_region(self) -> str:
-        """Генерирует случайный регион"""
-        regions = [
-            'Москва', 'Санкт-Петербург', 'Екатеринбург', 'Новосибирск',
-            'Казань', 'Ростов-на-Дону', 'Краснодар', 'Воронеж', 'Самара'
-        ]
-        return random.choice(regions)
-    
-    def _random_timestamp(self) -> str:
-        """Генерирует случайную временную метку за последние 30 дней"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        # Генерируем время в рабочие часы (9:00-18:00)
-        random_date = start_date + timedelta(
-            days=random.randint(0, 30),
-            hours=random.randint(9, 17),
-            minutes=random.randint(0, 59)
-        )
-        
-        return random_date.strftime('%Y-%m-%d %H:%M:%S')
-    
-    def generate_csv_files(self, num_conversations: int = 1000) -> None:
-        """Генерирует CSV файлы с банковскими разговорами"""
-        
-        logger.info("🏦 Banking NLP System - Генератор CSV данных")
-        logger.info("🚀 Начинаем генерацию {num_conversations} разговоров...")
-        
-        # Создаем необходимые директории
-        self._create_directories()
-        
-        # Генерируем данные
-        conversations = []
-        
-        for i in range(num_conversations):
-            conversation = self.generate_conversation(i + 1)
-            conversations.append(conversation)
-            
-            # Показываем прогресс каждые 100 записей
-            if (i + 1) % 100 == 0:
-                logger.info("   Сгенерировано: {i + 1}/{num_conversations}")
-        
-        # Создаем DataFrame
-        df = pd.DataFrame(conversations)
-        
-        # Сохраняем в различных форматах
-        self._save_to_csv(df, conversations)
-        
-        logger.info("✅ Генерация завершена! Создано записей: {num_conversations}")
-        logger.info("📁 Файлы сохранены в директории: data/")
-        
-        # Показываем статистику
-        self._print_statistics(df)
-    
-    def _create_directories(self) -> None:
-        """Создает необходимые директории для данных"""
-        directories = ['data', 'data/raw', 'data/processed', 'logs']
-        
-        for directory in directories:
-            Path(directory).mkdir(parents=True, exist_ok=True)
-            logger.info("✅ Создана директория: {directory}")
-    
-    def _save_to_csv(self, df: pd.DataFrame, conversations: List[Dict]) -> None:
-        """Сохраняет данные в CSV файлы"""
-        
-        # Основной файл с обработанными данными
-        processed_file = 'data/processed/conversations_processed.csv'
-        df.to_csv(processed_file, index=False, encoding='utf-8-sig')
-        logger.info("💾 Сохранен файл: {processed_file}")
-        
-        # Сырые данные с временной меткой
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        raw_file = f'data/raw/conversations_raw_{timestamp}.csv'
-        df.to_csv(raw_file, index=False, encoding='utf-8-sig')
-        logger.info("💾 Сохранен файл: {raw_file}")
-        
-        # Аналитический файл с агрегированными данными
-        analytics_df = self._create_analytics(df)
-        analytics_file = 'data/processed/conversation_analytics.csv'
-        analytics_df.to_csv(analytics_file, index=False, encoding='utf-8-sig')
-        logger.info("📊 Сохранен аналитический файл: {analytics_file}")
-        
-        # Сводка по тематикам
-        themes_summary = df.groupby(['theme', 'product']).agg({
-            'conversation_id': 'count',
-            'client_satisfaction': 'mean',
-            'duration_minutes': 'mean'
-        }).round(2).reset_index()
-        themes_summary.columns = ['theme', 'product', 'count', 'avg_satisfaction', 'avg_duration']
-        
-        themes_file = 'data/processed/themes_summary.csv'
-        themes_summary.to_csv(themes_file, index=False, encoding='utf-8-sig')
-        logger.info("📋 Сохранена сводка тематик: {themes_file}")
-    
-    def _create_analytics(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Создает аналитические данные"""
-        analytics = {
+    def analytics(self) -> pd.DataFrame:
+        """Сводные метрики conversation_analytics.csv"""
+        stats = self.stats
+        rows = stats['rows']
+        return pd.DataFrame({
             'metric': [
-                'total_conversations', 'avg_duration', 'avg_satisfaction', 
+                'total_conversations', 'avg_duration', 'avg_satisfaction',
                 'positive_emotions', 'negative_emotions',
                 'themes_count', 'products_count', 'unique_clients'
             ],
             'value': [
-                len(df),
-                round(df['duration_minutes'].mean(), 2),
-                round(df['client_satisfaction'].mean(), 2),
-                len(df[df['emotion'] == 'позитивная']),
-                len(df[df['emotion'] == 'негативная']),
-                df['theme'].nunique(),
-                df['product'].nunique(),
-                df['client_id'].nunique()
+                rows,
+                round(stats['duration_sum'] / rows, 2),
+                round(stats['satisfaction_sum'] / rows, 2),
+                stats['emotions'].get('позитивная', 0),
+                stats['emotions'].get('негативная', 0),
+                len(stats['themes']),
+                len(stats['products']),
+                len(self.clients)
             ]
-        }
-        
-        return pd.DataFrame(analytics)
-    
-    def _print_statistics(self, df: pd.DataFrame) -> None:
-        """Выводит статистику сгенерированных данных"""
-        logger.info("\n📊 Статистика сгенерированных данных:")
-        logger.info("-" * 40)
-        logger.info("Всего разговоров: {len(df)}")
-        logger.info("Уникальных клиентов: {df['client_id'].nunique()}")
-        logger.info("Тематик: {df['theme'].nunique()}")
-        logger.info("Продуктов: {df['product'].nunique()}")
-        logger.info("Средняя продолжительность: {df['duration_minutes'].mean():.1f} мин")
-        logger.info("Средняя удовлетворенность: {df['client_satisfaction'].mean():.1f}/5.0")
-        
-        logger.info("\nРаспределение по тематикам:")
-        theme_counts = df['theme'].value_counts()
-        for theme, count in theme_counts.items():
-            logger.info("  {theme}: {count} ({count/len(df)*100:.1f}%)")
-        
-        logger.info("\nРаспределение эмоций:")
-        emotion_counts = df['emotion'].value_counts()
-        for emotion, count in emotion_counts.items():
-            logger.info("  {emotion}: {count} ({count/len(df)*100:.1f}%)")
+        })
+
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def shard_seed(base_seed: int, shard_index: int) -> np.random.SeedSequence:
+    """Зерно шарда: зависит только от базового зерна и номера шарда"""
+    return np.random.SeedSequence(base_seed, spawn_key=(shard_index,))
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _generate_shard(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Генерация и запись одного шарда (выполняется в процессе пула)"""
+    generator = BankingDataGenerator(storage_format=task['storage_format'])
+    df = generator.generate_dataframe(
+        task['rows'],
+        seed=shard_seed(task['base_seed'], task['index']),
+        reference_date=datetime.fromisoformat(task['reference_date']),
+        first_id=task['first_id'],
+    )
+
+    path = Path(task['path'])
+    if task['storage_format'] == 'parquet':
+        stats = write_parquet(df, path)
+    else:
+        stats = compute_stats(df)
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+
+    return {
+        'index': task['index'],
+        'file': path.name,
+        'rows': task['rows'],
+        'first_id': task['first_id'],
+        'sha256': _file_sha256(path),
+        'bytes': path.stat().st_size,
+        'stats': stats,
+    }
+
+
+def generate_shards(num_conversations: int, output_dir: str, base_seed: int = 42,
+                    shard_rows: int = 1_000_000, workers: Optional[int] = None,
+                    storage_format: str = 'csv', reference_date: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Параллельная генерация разговоров шардами
+
+    Разбиение на шарды задается только num_conversations и shard_rows, а
+    зерно шарда — базовым зерном и номером шарда, поэтому содержимое
+    шардов (и их контрольные суммы) не зависит от количества процессов.
+    Метки времени отсчитываются от reference_date, которая записывается
+    в манифест.
+
+    Args:
+        num_conversations: Общее количество разговоров
+        output_dir: Директория для файлов шардов и манифеста
+        base_seed: Базовое зерно
+        shard_rows: Строк в шарде (последний шард может быть меньше)
+        workers: Количество процессов (по умолчанию — число CPU)
+        storage_format: Формат шардов: csv или parquet
+        reference_date: Конец окна меток времени (по умолчанию — начало текущих суток)
+
+    Returns:
+        Dict: Манифест: параметры генерации, шарды с контрольными суммами и общая статистика
+    """
+    reference_date = reference_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    for index, first_row in enumerate(range(0, num_conversations, shard_rows)):
+        tasks.append({
+            'index': index,
+            'rows': min(shard_rows, num_conversations - first_row),
+            'first_id': first_row + 1,
+            'base_seed': base_seed,
+            'reference_date': reference_date.isoformat(),
+            'storage_format': storage_format,
+            'path': str(directory / f'part-{index:05d}.{storage_format}'),
+        })
+
+    logger.info(f"🚀 Генерация {num_conversations} разговоров: {len(tasks)} шардов, процессов: {workers or os.cpu_count()}")
+    if workers == 1:
+        shards = [_generate_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_generate_shard, tasks))
+
+    stats = None
+    for shard in shards:
+        shard_stats = shard.pop('stats')
+        stats = shard_stats if stats is None else merge_stats(stats, shard_stats)
+
+    manifest = {
+        'rows': num_conversations,
+        'base_seed': base_seed,
+        'shard_rows': shard_rows,
+        'reference_date': reference_date.isoformat(),
+        'storage_format': storage_format,
+        'shards': shards,
+        'stats': stats,
+    }
+    tmp_path = directory / f'.{MANIFEST_NAME}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, directory / MANIFEST_NAME)
+
+    logger.info(f"✅ Шарды и манифест сохранены в {directory}")
+    return manifest
 
 
 def main():
     """Основная функция запуска генератора"""
-    generator = BankingDataGenerator()
-    
-    # Генерируем 1000 разговоров (можно изменить количество)
-    generator.generate_csv_files(num_conversations=1000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Генерация банковских разговоров")
+    parser.add_argument("--rows", type=int, default=1000, help="Количество разговоров")
+    parser.add_argument("--vectorized", action="store_true", help="Векторизованная генерация (NumPy)")
+    parser.add_argument("--seed", type=int, default=None, help="Зерно векторизованной генерации")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Формат файлов разговоров")
+    parser.add_argument("--output-dir", default="data", help="Директория данных")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Строк в одной записываемой части")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Шардированная генерация в N процессах (файлы шардов и manifest.json в --output-dir)")
+    parser.add_argument("--shard-rows", type=int, default=1_000_000, help="Строк в шарде")
+    parser.add_argument("--reference-date", default=None, help="Конец окна меток времени (ISO), по умолчанию — сегодня")
+    args = parser.parse_args()
+
+    if args.workers is not None:
+        generate_shards(
+            args.rows, args.output_dir,
+            base_seed=42 if args.seed is None else args.seed,
+            shard_rows=args.shard_rows,
+            workers=args.workers,
+            storage_format=args.format,
+            reference_date=datetime.fromisoformat(args.reference_date) if args.reference_date else None,
+        )
+        return
+
+    generator = BankingDataGenerator(storage_format=args.format, output_dir=args.output_dir)
+    generator.generate_csv_files(num_conversations=args.rows, vectorized=args.vectorized, seed=args.seed,
+                                 chunk_size=args.chunk_size)
     
     logger.info("\n🎯 Генерация завершена успешно!")
     logger.info("📁 Проверьте директорию data/ для просмотра созданных файлов")
@@ -1,13 +1,38 @@
 # -*- coding: utf-8 -*-
 """
 Модуль автоматической инициализации данных для Banking NLP System
+
+Таблица разговоров читается с диска один раз и хранится в памяти процесса.
+Версия данных — время изменения и размер файла: при перезаписи файла
+следующий запрос перечитывает его, остальные запросы обходятся одним stat().
+
+Сведения о данных и аналитика отдаются из материализованных агрегатов
+(conversation_aggregates.json), которые записываются вместе с данными и
+дополняются при дозаписи строк; полный пересчет выполняется, только если
+агрегаты не соответствуют текущей версии файла.
 """
 import asyncio
 import json
+import os
+import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
+from ..core.config import get_settings
+from ..utils.aggregates import MaterializedAggregates, file_version
+from ..utils.conversation_store import (
+    STATS_COLUMNS,
+    analytics_from_stats,
+    compute_stats,
+    memory_usage_bytes,
+    parquet_available,
+    read_csv_typed,
+    read_parquet,
+    read_parquet_summary,
+    write_parquet,
+)
 from ..utils.data_generator import BankingDataGenerator
 
 import logging
@@ -20,74 +45,171 @@ class DataInitializer:
         self.data_dir = Path("data")
         self.processed_dir = self.data_dir / "processed"
         self.raw_dir = self.data_dir / "raw"
-        self.conversations_file = self.processed_dir / "conversations_processed.csv"
+        self.jobs_dir = self.data_dir / "jobs"
+
+        self.config = get_settings().data
+        self.storage_format = self.config.storage_format
+        if self.storage_format == "parquet" and not parquet_available():
+            logger.warning("⚠️ pyarrow не установлен, данные разговоров хранятся в CSV")
+            self.storage_format = "csv"
+        self.conversations_file = self.processed_dir / f"conversations_processed.{self.storage_format}"
         self.metadata_file = self.processed_dir / "data_metadata.json"
+        self.aggregates = MaterializedAggregates(self.processed_dir / "conversation_aggregates.json")
+
+        # Кэш таблицы разговоров, действительный для версии файла
+        self._frame: Optional[pd.DataFrame] = None
+        self._frame_version: Optional[str] = None
+        self._analytics: Optional[Dict[str, Any]] = None
+        self._analytics_version: Optional[str] = None
+        self._frame_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        # Фоновое обновление данных
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._last_refresh_at: Optional[str] = None
+        self._last_refresh_error: Optional[str] = None
         
-    async def ensure_data_available(self) -> bool:
-        """Обеспечивает наличие данных, генерируя их при необходимости"""
-        
-        # Проверяем существование основного файла данных
-        if self.conversations_file.exists():
-            logger.info("📊 Найдены существующие данные: {self.conversations_file}")
-            
-            # Проверяем актуальность данных
-            if await self._is_data_fresh():
-                logger.info("✅ Данные актуальны, генерация не требуется")
-                return True
-            else:
-                logger.info("🔄 Данные устарели, обновляем...")
+    async def start(self) -> None:
+        """
+        Запуск без ожидания данных
+
+        Имеющиеся данные обслуживаются сразу, даже устаревшие; генерация
+        новых выполняется фоновой задачей и подменяет файлы атомарно.
+        """
+        if await self._is_data_fresh():
+            logger.info(f"✅ Данные актуальны: {self.conversations_file}")
+            return
+
+        if await asyncio.to_thread(self.conversations_file.exists):
+            logger.info("🔄 Данные устарели, обновление в фоне; до его завершения отдаются текущие данные")
         else:
-            logger.info("📂 CSV данные не найдены, запускаем автоматическую генерацию...")
-        
-        # Генерируем новые данные
-        await self._generate_fresh_data()
+            logger.info("📂 Данные не найдены, запускаем генерацию в фоне...")
+        self.schedule_refresh()
+
+    async def stop(self) -> None:
+        """Отмена фонового обновления данных"""
+        task = self._refresh_task
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def schedule_refresh(self) -> asyncio.Task:
+        """Запуск фонового обновления данных, если оно еще не выполняется"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(), name="data-refresh")
+        return self._refresh_task
+
+    @property
+    def refreshing(self) -> bool:
+        """Выполняется ли фоновое обновление данных"""
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    async def ensure_data_available(self) -> bool:
+        """Обеспечивает наличие данных; ждет генерации, только если данных нет совсем"""
+        if await asyncio.to_thread(self.conversations_file.exists):
+            if not self.refreshing and not await self._is_data_fresh():
+                self.schedule_refresh()
+            return True
+
+        # asyncio.shield: отмена запроса не должна прерывать общую генерацию
+        await asyncio.shield(self.schedule_refresh())
         return True
-    
+
+    async def _refresh(self) -> None:
+        """Фоновая генерация данных с сохранением ошибки для /data/ready"""
+        try:
+            await self._generate_fresh_data()
+            self._last_refresh_error = None
+        except Exception as e:
+            logger.error(f"❌ Ошибка обновления данных: {e}")
+            self._last_refresh_error = str(e)
+            raise
+        finally:
+            self._last_refresh_at = datetime.now().isoformat()
+
     async def _is_data_fresh(self) -> bool:
         """Проверяет актуальность существующих данных"""
-        if not self.metadata_file.exists():
+        return await asyncio.to_thread(self._is_data_fresh_sync)
+
+    def _is_data_fresh_sync(self) -> bool:
+        if not self.conversations_file.exists():
             return False
-            
+        metadata = self._read_metadata()
+        if metadata is None:
+            return False
+
         try:
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-            
-            # Проверяем, что данные созданы не более 7 дней назад
+            # Проверяем, что данные созданы не более refresh_after_days дней назад
+            # и содержат не меньше разговоров, чем задано в настройках
             creation_date = datetime.fromisoformat(metadata.get('creation_date', ''))
             days_old = (datetime.now() - creation_date).days
-            
-            return days_old < 7 and metadata.get('conversations_count', 0) >= 500
-            
-        except (json.JSONDecodeError, ValueError, KeyError):
+            count = metadata.get('conversations_count', 0)
+
+            return days_old < self.config.refresh_after_days and count >= self.config.generate_conversations
+
+        except (ValueError, KeyError, TypeError):
             return False
-    
+
+    def _read_metadata(self) -> Optional[Dict[str, Any]]:
+        """Метаданные сгенерированных данных или None"""
+        try:
+            with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
     async def _generate_fresh_data(self) -> None:
-        """Генерирует свежие данные асинхронно"""
-        logger.info("🔧 Создание директорий...")
-        self._create_directories()
-        
+        """Генерирует свежие данные в потоке и атомарно подменяет ими текущие"""
         logger.info("🤖 Запуск генератора банковских разговоров...")
-        generator = BankingDataGenerator()
-        
-        # Генерируем данные в отдельном потоке для не блокирования
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None, 
-            generator.generate_csv_files, 
-            1000  # Количество разговоров
-        )
-        
-        # Сохраняем метаданные
-        await self._save_metadata(1000)
-        
+        await asyncio.to_thread(self._generate_and_swap, self.config.generate_conversations)
         logger.info("✅ Автоматическая генерация данных завершена!")
-    
+
+    def _generate_and_swap(self, conversations_count: int) -> None:
+        """
+        Генерация во временную директорию и перенос файлов через os.replace
+
+        Читатели видят либо старый, либо новый файл разговоров целиком.
+        Метаданные переносятся последними: пока они старые, следующий запуск
+        повторит незавершенное обновление.
+        """
+        staging_dir = self.data_dir / ".staging"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        self._create_directories()
+
+        try:
+            generator = BankingDataGenerator(storage_format=self.storage_format, output_dir=str(staging_dir))
+            generator.generate_csv_files(
+                conversations_count,
+                vectorized=self.config.vectorized_generator,
+                chunk_size=self.config.generation_chunk_size,
+            )
+
+            staged_processed = staging_dir / "processed"
+            staged_metadata = staged_processed / self.metadata_file.name
+            self._write_metadata(staged_metadata, conversations_count)
+            staged_aggregates = MaterializedAggregates(staged_processed / self.aggregates.path.name).load()
+
+            for path in (staging_dir / "raw").iterdir():
+                os.replace(path, self.raw_dir / path.name)
+            for path in staged_processed.iterdir():
+                if path.name not in (self.conversations_file.name, staged_metadata.name,
+                                     self.aggregates.path.name):
+                    os.replace(path, self.processed_dir / path.name)
+
+            # Переименование сохраняет время изменения и размер, а значит и версию данных
+            os.replace(staged_processed / self.conversations_file.name, self.conversations_file)
+            if staged_aggregates is not None:
+                self.aggregates.save(staged_aggregates["stats"], self.conversations_file)
+            os.replace(staged_metadata, self.metadata_file)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
     def _create_directories(self) -> None:
         """Создает необходимые директории"""
         for directory in [self.data_dir, self.processed_dir, self.raw_dir]:
             directory.mkdir(parents=True, exist_ok=True)
-    
-    async def _save_metadata(self, conversations_count: int) -> None:
+
+    def _write_metadata(self, path: Path, conversations_count: int) -> None:
         """Сохраняет метаданные о сгенерированных данных"""
         metadata = {
             "creation_date": datetime.now().isoformat(),
@@ -96,29 +218,195 @@ class DataInitializer:
             "generator_version": "auto",
             "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-        
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
+
+        with open(path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
-    
+
+    async def get_readiness(self) -> Dict[str, Any]:
+        """
+        Готовность и свежесть данных
+
+        Returns:
+            Dict: ready — данные доступны для запросов; stale — данные старше
+            DATA__REFRESH_AFTER_DAYS; refreshing — идет фоновое обновление
+        """
+        def collect() -> Dict[str, Any]:
+            available = self.conversations_file.exists()
+            metadata = self._read_metadata() or {}
+            created_at = metadata.get("creation_date")
+            age_seconds = None
+            if created_at:
+                try:
+                    age_seconds = round((datetime.now() - datetime.fromisoformat(created_at)).total_seconds(), 1)
+                except ValueError:
+                    pass
+            return {
+                "ready": available,
+                "stale": not self._is_data_fresh_sync(),
+                "refreshing": self.refreshing,
+                "created_at": created_at,
+                "age_seconds": age_seconds,
+                "conversations_count": metadata.get("conversations_count"),
+                "data_version": self.data_version(),
+                "last_refresh_at": self._last_refresh_at,
+                "last_refresh_error": self._last_refresh_error,
+            }
+
+        return await asyncio.to_thread(collect)
+
+    def data_version(self) -> Optional[str]:
+        """Версия файла разговоров (время изменения и размер) или None, если файла нет"""
+        return file_version(self.conversations_file)
+
+    def load_conversations(self) -> Tuple[pd.DataFrame, str]:
+        """
+        Таблица разговоров из кэша с перечитыванием при изменении файла
+
+        Returns:
+            Tuple: Таблица и версия данных, из которой она прочитана
+
+        Raises:
+            FileNotFoundError: Файл разговоров отсутствует
+        """
+        version = self.data_version()
+        if version is None:
+            raise FileNotFoundError(f"Файл данных не найден: {self.conversations_file}")
+
+        frame = self._frame
+        if frame is not None and self._frame_version == version:
+            return frame, version
+
+        with self._frame_lock:
+            # Файл мог прочитать параллельный запрос, пока мы ждали блокировку
+            version = self.data_version()
+            if self._frame is None or self._frame_version != version:
+                logger.info(f"📥 Загрузка данных разговоров: {self.conversations_file}")
+                self._frame = self._read_conversations()
+                self._frame_version = version
+                logger.info(
+                    f"📦 Загружено {len(self._frame)} разговоров, "
+                    f"{memory_usage_bytes(self._frame) / 1024 ** 2:.1f} МБ в памяти"
+                )
+            return self._frame, self._frame_version
+
+    def _read_conversations(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Чтение таблицы разговоров с диска; columns ограничивает читаемые колонки"""
+        if self.storage_format == "parquet":
+            return read_parquet(self.conversations_file, columns)
+        return read_csv_typed(self.conversations_file, columns)
+
+    def _full_stats(self) -> Dict[str, Any]:
+        """Полный пересчет статистики файла разговоров"""
+        if self.storage_format == "parquet":
+            # Статистика из футера, если файл записан write_parquet
+            _, stats, _ = read_parquet_summary(self.conversations_file)
+            if stats is not None:
+                return stats
+            return compute_stats(self._read_conversations(STATS_COLUMNS))
+        df, _ = self.load_conversations()
+        return compute_stats(df)
+
+    def _current_stats(self) -> Dict[str, Any]:
+        """Статистика из агрегатов, с пересчетом и перезаписью, если они устарели"""
+        stats = self.aggregates.current(self.conversations_file)
+        if stats is None:
+            logger.info("🔄 Агрегаты разговоров устарели, выполняется пересчет")
+            stats = self._full_stats()
+            self.aggregates.save(stats, self.conversations_file)
+        return stats
+
+    def append_conversations(self, rows: pd.DataFrame) -> int:
+        """
+        Дозапись разговоров в файл данных с обновлением агрегатов
+
+        Агрегаты дополняются статистикой новых строк; полный пересчет нужен,
+        только если они не соответствовали файлу до дозаписи. Parquet не
+        поддерживает дозапись, поэтому файл в этом формате перезаписывается.
+
+        Args:
+            rows: Новые строки с колонками файла данных
+
+        Returns:
+            int: Количество дописанных строк
+        """
+        with self._write_lock:
+            previous_version = self.data_version()
+            delta = compute_stats(rows)
+
+            if self.storage_format == "parquet":
+                if previous_version is not None:
+                    rows = pd.concat([read_parquet(self.conversations_file), rows], ignore_index=True)
+                write_parquet(rows, self.conversations_file)
+            elif previous_version is None:
+                rows.to_csv(self.conversations_file, index=False, encoding="utf-8-sig")
+            else:
+                rows.to_csv(self.conversations_file, mode="a", header=False, index=False, encoding="utf-8")
+
+            if not self.aggregates.apply(delta, self.conversations_file, previous_version):
+                self.aggregates.save(self._full_stats(), self.conversations_file)
+            return delta["rows"]
+
+    def _frame_memory_mb(self) -> Optional[float]:
+        """Объем таблицы разговоров в памяти или None, если она не загружена"""
+        frame = self._frame
+        if frame is None:
+            return None
+        return round(memory_usage_bytes(frame) / 1024 ** 2, 2)
+
+    async def get_conversations_frame(self) -> Tuple[pd.DataFrame, str]:
+        """Таблица разговоров и версия данных; чтение файла выполняется в потоке"""
+        if not await asyncio.to_thread(self.conversations_file.exists):
+            await self.ensure_data_available()
+
+        frame = self._frame
+        version = self.data_version()
+        if frame is not None and self._frame_version == version:
+            return frame, version
+        return await asyncio.to_thread(self.load_conversations)
+
+    async def get_conversations_page(self, offset: int, limit: int) -> Tuple[pd.DataFrame, int, str]:
+        """
+        Страница разговоров
+
+        Args:
+            offset: Номер первой строки
+            limit: Размер страницы
+
+        Returns:
+            Tuple: Строки страницы, общее количество строк и версия данных
+        """
+        df, version = await self.get_conversations_frame()
+        return df.iloc[offset:offset + limit], len(df), version
+
+    async def get_data_analytics(self) -> Dict[str, Any]:
+        """Аналитика по разговорам, пересчитываемая только при изменении данных"""
+        if not await asyncio.to_thread(self.conversations_file.exists):
+            await self.ensure_data_available()
+
+        version = self.data_version()
+        if self._analytics is None or self._analytics_version != version:
+            stats = await asyncio.to_thread(self._current_stats)
+            self._analytics = analytics_from_stats(stats)
+            self._analytics_version = version
+        return self._analytics
+
     async def get_data_info(self) -> Dict[str, Any]:
         """Возвращает информацию о доступных данных"""
-        if not self.conversations_file.exists():
+        if not await asyncio.to_thread(self.conversations_file.exists):
             return {"status": "no_data", "total_conversations": 0}
         
         try:
-            # Быстрая загрузка только для подсчета строк
-            df = pd.read_csv(self.conversations_file)
+            analytics = await self.get_data_analytics()
             
-            metadata = {}
-            if self.metadata_file.exists():
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+            metadata = await asyncio.to_thread(self._read_metadata) or {}
             
             return {
                 "status": "available",
-                "total_conversations": len(df),
-                "themes_available": df['theme'].nunique() if 'theme' in df.columns else 0,
-                "products_available": df['product'].nunique() if 'product' in df.columns else 0,
+                "total_conversations": analytics["total_conversations"],
+                "themes_available": len(analytics["themes_distribution"]),
+                "products_available": len(analytics["products_distribution"]),
+                "storage_format": self.storage_format,
+                "memory_mb": self._frame_memory_mb(),
                 "last_updated": metadata.get("last_updated", "неизвестно"),
                 "file_path": str(self.conversations_file)
             }
@@ -128,11 +416,8 @@ class DataInitializer:
     
     async def get_conversations_data(self, limit: Optional[int] = None) -> pd.DataFrame:
         """Возвращает данные разговоров"""
-        if not self.conversations_file.exists():
-            await self.ensure_data_available()
-        
-        df = pd.read_csv(self.conversations_file)
-        
+        df, _ = await self.get_conversations_frame()
+
         if limit:
             return df.head(limit)
         
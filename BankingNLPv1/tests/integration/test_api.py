@@ -6,9 +6,17 @@
 и корректности обработки HTTP запросов.
 """
 
+import gzip
+import json
+import time
+import tracemalloc
+
 import pytest
 from fastapi.testclient import TestClient
+from src.banking_nlp.api import data_routes
+from src.banking_nlp.core.config import get_settings
 from src.banking_nlp.main import app
+from src.banking_nlp.utils.data_initializer import DataInitializer
 
 
 class TestAPI:
@@ -97,6 +105,103 @@ class TestAPI:
         assert isinstance(data, list)
         assert len(data) == 2
 
+    def test_stream_analysis(self, client):
+        """Тест потокового NDJSON анализа со сжатием gzip"""
+        lines = [
+            {"text": "Хочу кредит", "language": "ru"},
+            {"text": ""},
+            {"text": "Проблемы с картой", "language": "ru"},
+        ]
+        body = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines).encode("utf-8")
+
+        response = client.post(
+            "/api/analyze/stream",
+            content=gzip.compress(body),
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 200
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [result["index"] for result in results] == [0, 1, 2]
+        assert "кредиты" in results[0]["themes"]
+        assert results[1]["error"] is not None
+
+    def test_stream_rejects_oversized_line(self, client):
+        """Тест ограничения размера строки, завершенной переводом строки"""
+        max_line_bytes = get_settings().streaming.max_line_bytes
+        oversized = json.dumps({"text": "а" * max_line_bytes}, ensure_ascii=False)
+        body = f'{{"text": "Хочу кредит"}}\n{oversized}\n{{"text": "Спасибо"}}\n'.encode("utf-8")
+
+        response = client.post("/api/analyze/stream", content=body)
+
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [result["index"] for result in results] == [0, 1]
+        assert "кредиты" in results[0]["themes"]
+        assert "превышает" in results[1]["error"]
+
+    def test_stream_bounds_decompressed_memory(self, client):
+        """Тест распаковки сжатой «бомбы» порциями без роста памяти"""
+        payload = gzip.compress(b"a" * (128 * 1024 * 1024))
+
+        tracemalloc.start()
+        try:
+            response = client.post(
+                "/api/analyze/stream",
+                content=payload,
+                headers={"Content-Encoding": "gzip"},
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert len(results) == 1
+        assert "превышает" in results[0]["error"]
+        assert peak < 32 * 1024 * 1024
+
+    def test_job_lifecycle(self):
+        """Тест фонового задания: создание, прогресс и постраничные результаты"""
+        items = [{"text": "Хочу кредит"}, {"text": "Проблемы с картой"}, {"text": "Спасибо"}]
+
+        with TestClient(app) as client:
+            response = client.post("/api/jobs", json={"items": items})
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            for _ in range(100):
+                info = client.get(f"/api/jobs/{job_id}").json()
+                if info["status"] == "completed":
+                    break
+                time.sleep(0.05)
+
+            assert info["status"] == "completed"
+            assert info["processed"] == 3
+
+            page = client.get(f"/api/jobs/{job_id}/results", params={"offset": 1, "limit": 1}).json()
+            assert page["total"] == 3
+            assert page["next_offset"] == 2
+            assert page["results"][0]["index"] == 1
+            assert {"themes", "products", "emotions", "confidence"} <= set(page["results"][0])
+
+            assert client.delete(f"/api/jobs/{job_id}").status_code == 409
+            assert client.post("/api/jobs", json={"source_path": "../etc/passwd"}).status_code == 400
+            # Флаги анализа задаются для задания целиком, а не для отдельных разговоров
+            per_item_flags = {"items": [{"text": "Хочу кредит", "include_themes": False}]}
+            assert client.post("/api/jobs", json=per_item_flags).status_code == 422
+
+    def test_metrics_endpoint(self, client):
+        """Тест метрик запросов и этапов анализа"""
+        client.post("/api/analyze", json={"text": "Хочу оформить кредитную карту"})
+        client.get("/api/jobs/unknown")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'route="/api/analyze"' in response.text
+        assert 'route="/api/jobs/{job_id}",status="404"' in response.text
+        assert 'banking_nlp_analysis_stage_duration_seconds_bucket{le="0.001",stage="keywords"}' in response.text
+
     def test_statistics_endpoint(self, client):
         """Тест получения статистики"""
         response = client.get("/api/statistics")
@@ -104,3 +209,56 @@ class TestAPI:
         assert response.status_code == 200
         data = response.json()
         assert "timestamp" in data
+        assert "sample_age_seconds" in data["system"]
+        assert response.elapsed.total_seconds() < 0.5
+
+    def test_conversations_pagination(self):
+        """Тест постраничной выдачи разговоров в JSON и NDJSON"""
+        with TestClient(app) as client:
+            first = client.get("/api/data/conversations", params={"limit": 5})
+            assert first.status_code == 200
+            page = first.json()
+            assert page["total_returned"] == 5
+            assert page["next_offset"] == 5
+            assert "conversation_id" in page["conversations"][0]
+
+            second = client.get("/api/data/conversations", params={"limit": 5, "cursor": page["next_cursor"]})
+            assert second.json()["offset"] == 5
+            assert second.json()["conversations"] != page["conversations"]
+
+            ndjson = client.get(
+                "/api/data/conversations",
+                params={"limit": 5, "offset": 5},
+                headers={"Accept": "application/x-ndjson"}
+            )
+            rows = [json.loads(line) for line in ndjson.text.splitlines()]
+            assert rows == second.json()["conversations"]
+            assert int(ndjson.headers["X-Total-Count"]) == page["total"]
+
+            assert client.get("/api/data/conversations", params={"cursor": "не курсор"}).status_code == 400
+
+    def test_data_readiness(self, client, tmp_path, monkeypatch):
+        """Тест готовности и свежести данных"""
+        monkeypatch.chdir(tmp_path)
+        initializer = DataInitializer()
+        initializer.config = initializer.config.model_copy(update={"generate_conversations": 100})
+        monkeypatch.setattr(data_routes, "data_initializer", initializer)
+
+        response = client.get("/api/data/ready")
+        assert response.status_code == 503
+        data = response.json()
+        assert data["ready"] is False
+        assert data["stale"] is True
+        assert data["refreshing"] is False
+
+        initializer.processed_dir.mkdir(parents=True)
+        initializer.conversations_file.touch()
+        initializer._write_metadata(initializer.metadata_file, 100)
+
+        response = client.get("/api/data/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ready"] is True
+        assert data["stale"] is False
+        assert data["conversations_count"] == 100
+        assert data["data_version"] is not None
@@ -0,0 +1,56 @@
+"""
+Тесты контроля допуска Banking NLP System
+========================================
+
+Юнит-тесты ограничения одновременных запросов, очередей маршрутов
+и быстрого отказа при перегрузке.
+"""
+
+import pytest
+import asyncio
+from src.banking_nlp.core.admission import AdmissionController, AdmissionRejected
+from src.banking_nlp.core.config import AdmissionConfig
+
+
+class TestAdmissionController:
+    """Тесты для AdmissionController"""
+
+    @pytest.mark.asyncio
+    async def test_queue_and_handoff(self):
+        """Тест очереди ожидания и передачи слота"""
+        controller = AdmissionController(AdmissionConfig(
+            max_in_flight=1, queue_size=1, queue_timeout_seconds=1.0
+        ))
+        await controller.acquire("analyze")
+
+        waiter = asyncio.create_task(controller.acquire("analyze"))
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == {"analyze": 1}
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("analyze")
+        assert rejected.value.reason == "queue_full"
+
+        controller.release()
+        await waiter
+        assert controller.in_flight == 1
+        assert controller.stats()["queued"] == {"analyze": 0}
+
+        controller.release()
+        assert controller.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Тест отказа по истечении времени ожидания"""
+        controller = AdmissionController(AdmissionConfig(
+            max_in_flight=1, queue_size=4, queue_timeout_seconds=0.01, retry_after_seconds=2
+        ))
+
+        async with controller.admit("batch"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                await controller.acquire("batch")
+
+        assert rejected.value.reason == "timeout"
+        assert rejected.value.retry_after == 2
+        assert controller.in_flight == 0
+        assert controller.stats()["rejected"] == {"batch": 1}
@@ -6,9 +6,19 @@
 продуктов и эмоциональной окраски текста.
 """
 
+import json
+import shutil
+import subprocess
+import sys
 import pytest
 import asyncio
+import pandas as pd
+from pathlib import Path
+from src.banking_nlp.core.config import (
+    AnalysisConfig, CacheConfig, DegradationConfig, ExecutionMode, LexiconConfig
+)
 from src.banking_nlp.services.analysis import AnalysisService, AnalysisRequest, AnalysisResult
+from src.banking_nlp.services import lexicon
 
 
 class TestAnalysisService:
@@ -93,3 +103,137 @@ class TestAnalysisService:
 
         assert isinstance(products, list)
         assert len(products) > 0
+
+    @pytest.mark.asyncio
+    async def test_analyze_frame_matches_analyze(self, analysis_service):
+        """Тест совпадения пакетного анализа колонки с построчным анализом"""
+        texts = pd.Series([
+            "У меня проблемы с кредитной картой",
+            "Хочу потребительский кредит и депозит, спасибо",
+            "Отличное обслуживание! Очень доволен банком!",
+            "У меня проблемы с кредитной картой",
+        ])
+
+        frame = analysis_service.analyze_frame(texts)
+
+        assert len(frame) == len(texts)
+        for text, (_, row) in zip(texts, frame.iterrows()):
+            result = await analysis_service.analyze(AnalysisRequest(text=text))
+            assert list(row["themes"]) == result.themes
+            assert list(row["products"]) == result.products
+            for emotion, score in result.emotions.items():
+                assert row[f"emotion_{emotion}"] == pytest.approx(score)
+            assert row["confidence"] == pytest.approx(result.confidence, abs=1e-3)
+
+    def test_analyze_frame_respects_flags(self, analysis_service):
+        """Тест отключения этапов в пакетном анализе"""
+        frame = analysis_service.analyze_frame(
+            pd.Series(["Хочу кредит"]), include_products=False, include_emotions=False
+        )
+
+        assert frame.loc[0, "products"] == ()
+        assert "emotion_positive" not in frame.columns
+        assert frame.loc[0, "themes"] == ("кредиты",)
+
+    @pytest.mark.asyncio
+    async def test_thread_execution_mode(self, analysis_service, sample_request):
+        """Тест анализа в пуле потоков"""
+        service = AnalysisService(AnalysisConfig(
+            execution_mode=ExecutionMode.THREAD, max_workers=2, inline_threshold_chars=0
+        ))
+        try:
+            result = await service.analyze(sample_request)
+        finally:
+            service.shutdown()
+
+        expected = await analysis_service.analyze(sample_request)
+        assert result.error is None
+        assert result.themes == expected.themes
+        assert result.confidence == expected.confidence
+
+    @pytest.mark.asyncio
+    async def test_result_cache(self):
+        """Тест кэширования результатов по нормализованному тексту и флагам"""
+        service = AnalysisService(cache_config=CacheConfig(max_entries=2))
+
+        first = await service.analyze(AnalysisRequest(text="Хочу кредит на машину"))
+        second = await service.analyze(AnalysisRequest(text="  хочу КРЕДИТ на машину "))
+        without_products = await service.analyze(
+            AnalysisRequest(text="Хочу кредит на машину", include_products=False)
+        )
+
+        assert second.themes == first.themes
+        assert second.products == first.products
+        assert without_products.products == []
+        assert service.cache.hits == 1
+        assert service.cache.misses == 2
+
+        second.themes.append("изменено")
+        third = await service.analyze(AnalysisRequest(text="Хочу кредит на машину"))
+        assert third.themes == first.themes
+
+    @pytest.mark.asyncio
+    async def test_lexicon_hot_swap(self, tmp_path):
+        """Тест атомарного переключения версии словарей"""
+        source = json.loads(Path("config/lexicons/v1.json").read_text(encoding="utf-8"))
+        (tmp_path / "v1.json").write_text(json.dumps(source, ensure_ascii=False), encoding="utf-8")
+        source["version"] = "v2"
+        source["themes"]["кредиты"].append("рассрочк")
+        (tmp_path / "v2.json").write_text(json.dumps(source, ensure_ascii=False), encoding="utf-8")
+        (tmp_path / "ACTIVE").write_text("v1", encoding="utf-8")
+
+        service = AnalysisService(lexicon_config=LexiconConfig(directory=str(tmp_path)))
+        request = AnalysisRequest(text="Оформлю рассрочку")
+
+        assert service.lexicon_version == "v1"
+        assert (await service.analyze(request)).themes == []
+
+        service.activate_lexicon("v2")
+
+        assert (await service.analyze(request)).themes == ["кредиты"]
+        assert (tmp_path / "ACTIVE").read_text(encoding="utf-8").strip() == "v2"
+        assert (tmp_path / "compiled" / "v2.pkl").exists()
+        with pytest.raises(FileNotFoundError):
+            service.activate_lexicon("v3")
+
+    def test_lexicon_artifact_from_cli(self, tmp_path, monkeypatch):
+        """Тест загрузки артефакта, собранного через python -m, без перекомпиляции"""
+        shutil.copy("config/lexicons/v1.json", tmp_path / "v1.json")
+        subprocess.run(
+            [sys.executable, "-m", "src.banking_nlp.services.lexicon", "--directory", str(tmp_path)],
+            check=True, capture_output=True,
+        )
+
+        def fail_compile(source_path):
+            raise AssertionError(f"Артефакт {source_path.stem} не использован")
+
+        monkeypatch.setattr(lexicon, "compile_lexicon", fail_compile)
+        compiled = lexicon.load_lexicon(tmp_path, "v1")
+
+        assert type(compiled) is lexicon.CompiledLexicon
+        assert compiled.version == "v1"
+
+    @pytest.mark.asyncio
+    async def test_degradation_under_load(self):
+        """Тест пропуска необязательных этапов при перегрузке и восстановления"""
+        service = AnalysisService(degradation_config=DegradationConfig(
+            queue_depth_threshold=4, min_hold_seconds=0
+        ))
+        depth = 4
+        service.degradation.bind_queue_depth(lambda: depth)
+        request = AnalysisRequest(text="Хочу кредит на машину, очень доволен")
+
+        degraded = await service.analyze(request)
+        assert degraded.degraded
+        assert degraded.skipped_stages == ["emotions", "products"]
+        assert degraded.products == []
+        assert degraded.emotions == {}
+        assert degraded.themes == ["кредиты"]
+        assert service.cache.stats()["size"] == 0
+
+        depth = 0
+        recovered = await service.analyze(request)
+        assert not recovered.degraded
+        assert recovered.skipped_stages == []
+        assert recovered.products
+        assert service.degradation.stats()["degraded"] is False
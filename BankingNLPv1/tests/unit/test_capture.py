@@ -0,0 +1,84 @@
+"""
+Тесты записи трафика Banking NLP System
+======================================
+
+Юнит-тесты анонимизации и дозаписи тел запросов для воспроизведения.
+"""
+
+import gzip
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from src.banking_nlp.core.capture import CaptureWriter, TrafficCaptureMiddleware
+from src.banking_nlp.core.config import CaptureConfig
+from benchmarks.replay_capture import build_replay, read_capture
+
+
+def make_app(writer: CaptureWriter, config: CaptureConfig) -> FastAPI:
+    """Приложение, возвращающее тело запроса, с записью трафика"""
+    app = FastAPI()
+    app.add_middleware(TrafficCaptureMiddleware, writer=writer, config=config)
+
+    @app.post("/api/analyze")
+    async def analyze(request: Request):
+        return await request.json()
+
+    @app.post("/api/other")
+    async def other(request: Request):
+        return await request.json()
+
+    return app
+
+
+class TestTrafficCapture:
+    """Тесты для TrafficCaptureMiddleware и CaptureWriter"""
+
+    @pytest.mark.asyncio
+    async def test_capture_and_replay_schedule(self, tmp_path):
+        """Тест анонимизации, дозаписи и расписания воспроизведения"""
+        path = tmp_path / "capture.ndjson.gz"
+        config = CaptureConfig(enabled=True, path=str(path), sample_rate=1.0)
+
+        # Два запуска дописывают в один файл
+        for session in range(2):
+            writer = CaptureWriter(str(path), flush_interval_seconds=0.05)
+            writer.start()
+            transport = httpx.ASGITransport(app=make_app(writer, config))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/api/analyze", json={"text": f"Звонил с +79161234567 ({session})"})
+                assert response.json()["text"].startswith("Звонил с +7916")
+                await client.post("/api/other", json={"text": "не записывается"})
+            writer.close()
+
+        records = read_capture([str(path)])
+        assert [record["body"]["text"] for record in records] == ["Звонил с [PHONE] (0)", "Звонил с [PHONE] (1)"]
+        assert {record["path"] for record in records} == {"/api/analyze"}
+        assert all(record["status"] == 200 for record in records)
+
+        schedule = build_replay(records, "v1", speed=2.0)
+        assert schedule[0][0] == 0.0
+        assert schedule[1][0] == pytest.approx((records[1]["ts"] - records[0]["ts"]) / 2)
+
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            assert len([json.loads(line) for line in fh]) == 2
+
+    @pytest.mark.asyncio
+    async def test_body_parsed_in_writer_thread(self, tmp_path):
+        """Тест: middleware передает тело как есть, разбор и анонимизация — в потоке записи"""
+        path = tmp_path / "capture.ndjson.gz"
+        writer = CaptureWriter(str(path), flush_interval_seconds=0.05)
+        submitted = []
+        writer.submit = submitted.append
+        config = CaptureConfig(enabled=True, path=str(path), sample_rate=1.0)
+
+        transport = httpx.ASGITransport(app=make_app(writer, config))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/api/analyze", json={"text": "Почта ivan@example.com"})
+
+        assert json.loads(submitted[0]["body"]) == {"text": "Почта ivan@example.com"}
+
+        writer._append(submitted + [dict(submitted[0], body=b"not json")])
+        records = read_capture([str(path)])
+        assert [record["body"]["text"] for record in records] == ["Почта [EMAIL]"]
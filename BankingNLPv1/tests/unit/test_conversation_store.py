@@ -0,0 +1,134 @@
+"""
+Тесты колоночного хранилища разговоров Banking NLP System
+========================================================
+
+Юнит-тесты записи Parquet с категориальными колонками, чтения
+статистики из метаданных, выборочного чтения колонок и материализованных
+агрегатов.
+"""
+
+import pandas as pd
+import pytest
+from src.banking_nlp.utils.data_initializer import DataInitializer
+from src.banking_nlp.utils.conversation_store import (
+    analytics_from_stats,
+    compute_stats,
+    memory_usage_bytes,
+    optimize_dtypes,
+    read_csv_typed,
+    read_parquet,
+    read_parquet_summary,
+    write_parquet,
+)
+
+
+@pytest.fixture
+def conversations():
+    """Фикстура с небольшой таблицей разговоров"""
+    return pd.DataFrame({
+        "conversation_id": [1, 2, 3, 4],
+        "conversation_text": ["Хочу кредит", "Не работает карта", "Спасибо", "Вклад"],
+        "theme": ["продажи", "техподдержка", "продажи", "информация"],
+        "product": ["кредит", "карта", "кредит", "вклад"],
+        "emotion": ["позитивная", "негативная", "позитивная", "позитивная"],
+        "region": ["Москва", "Казань", "Москва", "Самара"],
+        "channel": ["чат", "телефон", "чат", "офис"],
+        "client_satisfaction": [4.5, 1.5, 5.0, 4.0],
+        "duration_minutes": [10, 20, 5, 15],
+    })
+
+
+def test_typed_csv_loader(conversations, tmp_path):
+    """Тест компактных типов без изменения значений"""
+    path = tmp_path / "conversations.csv"
+    pd.concat([conversations] * 50, ignore_index=True).to_csv(path, index=False, encoding="utf-8-sig")
+
+    plain = pd.read_csv(path, encoding="utf-8-sig")
+    typed = read_csv_typed(path)
+
+    assert isinstance(typed["region"].dtype, pd.CategoricalDtype)
+    assert isinstance(typed["conversation_text"].dtype, pd.CategoricalDtype)
+    assert typed["duration_minutes"].dtype == "uint8"
+    assert typed.to_json(orient="records") == plain.to_json(orient="records")
+    assert memory_usage_bytes(typed) * 2 < memory_usage_bytes(plain)
+    assert optimize_dtypes(typed).dtypes.equals(typed.dtypes)
+
+
+class TestConversationStore:
+    """Тесты для хранилища разговоров"""
+
+    @pytest.fixture(autouse=True)
+    def require_pyarrow(self):
+        pytest.importorskip("pyarrow")
+
+    def test_summary_from_metadata(self, conversations, tmp_path):
+        """Тест чтения количества строк и статистики из футера"""
+        path = tmp_path / "conversations.parquet"
+        written = write_parquet(conversations, path)
+
+        rows, stats, columns = read_parquet_summary(path)
+        assert rows == 4
+        assert stats == written == compute_stats(conversations)
+        assert "conversation_text" in columns
+
+        analytics = analytics_from_stats(stats)
+        assert analytics["themes_distribution"] == {"продажи": 2, "техподдержка": 1, "информация": 1}
+        assert analytics["average_duration"] == 12.5
+
+    def test_categorical_projection(self, conversations, tmp_path):
+        """Тест категориальных колонок и выборочного чтения"""
+        path = tmp_path / "conversations.parquet"
+        write_parquet(conversations, path)
+
+        projected = read_parquet(path, columns=["theme", "duration_minutes"])
+        assert list(projected.columns) == ["theme", "duration_minutes"]
+        assert isinstance(projected["theme"].dtype, pd.CategoricalDtype)
+        assert projected["theme"].tolist() == conversations["theme"].tolist()
+
+
+class TestMaterializedAggregates:
+    """Тесты для агрегатов разговоров"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_append(self, conversations, tmp_path, monkeypatch):
+        """Тест дополнения агрегатов при дозаписи и пересчета устаревших"""
+        monkeypatch.chdir(tmp_path)
+        initializer = DataInitializer()
+        initializer.processed_dir.mkdir(parents=True)
+
+        initializer.append_conversations(conversations.iloc[:2])
+
+        recomputed = []
+        full_stats = initializer._full_stats
+        monkeypatch.setattr(initializer, "_full_stats", lambda: recomputed.append(True) or full_stats())
+
+        initializer.append_conversations(conversations.iloc[2:])
+        analytics = await initializer.get_data_analytics()
+        assert analytics["total_conversations"] == 4
+        assert analytics["themes_distribution"]["продажи"] == 2
+        assert analytics["average_satisfaction"] == 3.75
+        assert recomputed == []
+
+        # Файл изменен в обход append_conversations: агрегаты пересчитываются
+        conversations.iloc[:1].to_csv(initializer.conversations_file, index=False, encoding="utf-8-sig")
+        info = await initializer.get_data_info()
+        assert info["total_conversations"] == 1
+        assert recomputed == [True]
+
+
+class TestDataInitializer:
+    """Тесты для DataInitializer"""
+
+    def test_freshness_uses_configured_count(self, tmp_path, monkeypatch):
+        """Тест актуальности данных относительно DATA__GENERATE_CONVERSATIONS"""
+        monkeypatch.chdir(tmp_path)
+        initializer = DataInitializer()
+        initializer.processed_dir.mkdir(parents=True)
+        initializer.conversations_file.touch()
+        initializer._write_metadata(initializer.metadata_file, 100)
+
+        initializer.config = initializer.config.model_copy(update={"generate_conversations": 100})
+        assert initializer._is_data_fresh_sync()
+
+        initializer.config = initializer.config.model_copy(update={"generate_conversations": 200})
+        assert not initializer._is_data_fresh_sync()
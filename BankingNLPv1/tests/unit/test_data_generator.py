@@ -0,0 +1,85 @@
+"""
+Тесты генератора данных Banking NLP System
+=========================================
+
+Юнит-тесты векторизованной генерации разговоров.
+"""
+
+import random
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from src.banking_nlp.utils.data_generator import BankingDataGenerator, generate_shards
+
+
+class TestBankingDataGenerator:
+    """Тесты для BankingDataGenerator"""
+
+    @pytest.fixture
+    def generator(self):
+        """Фикстура для создания генератора"""
+        return BankingDataGenerator()
+
+    def test_vectorized_matches_row_mode(self, generator):
+        """Тест совпадения колонок и значений с построчной генерацией"""
+        random.seed(7)
+        rows = pd.DataFrame([generator.generate_conversation(i + 1) for i in range(2000)])
+        frame = generator.generate_dataframe(20000, seed=7)
+
+        assert list(frame.columns) == list(rows.columns)
+        assert frame["conversation_id"].tolist() == list(range(1, 20001))
+        for column in ("theme", "product", "emotion", "region", "channel", "call_result"):
+            assert set(frame[column].astype(str)) == set(rows[column])
+        assert set(frame["conversation_text"].astype(str)) == set(rows["conversation_text"])
+        assert frame["client_satisfaction"].between(1.0, 5.0).all()
+        assert frame["duration_minutes"].between(2, 45).all()
+
+        negative = frame["emotion"] == "негативная"
+        assert frame.loc[negative, "client_satisfaction"].max() <= 2.5
+        assert frame.loc[~negative, "client_satisfaction"].min() >= 3.5
+
+    def test_vectorized_seed(self, generator):
+        """Тест воспроизводимости по зерну"""
+        reference_date = datetime(2025, 6, 1)
+        first = generator.generate_dataframe(1000, seed=42, reference_date=reference_date)
+        second = generator.generate_dataframe(1000, seed=42, reference_date=reference_date)
+
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_shards_independent_of_workers(self, tmp_path):
+        """Тест одинаковых шардов при разном количестве процессов"""
+        options = dict(base_seed=7, shard_rows=400, reference_date=datetime(2025, 6, 1))
+        single = generate_shards(1000, str(tmp_path / "single"), workers=1, **options)
+        parallel = generate_shards(1000, str(tmp_path / "parallel"), workers=2, **options)
+
+        assert [shard["rows"] for shard in single["shards"]] == [400, 400, 200]
+        assert single == parallel
+        assert single["stats"]["rows"] == 1000
+
+        combined = pd.concat(
+            [pd.read_csv(tmp_path / "single" / shard["file"], encoding="utf-8-sig") for shard in single["shards"]]
+        )
+        assert combined["conversation_id"].tolist() == list(range(1, 1001))
+
+    def test_chunked_files_match_full_table(self, tmp_path):
+        """Тест сводок, накопленных по частям, на всей записанной таблице"""
+        generator = BankingDataGenerator(output_dir=str(tmp_path))
+        generator.generate_csv_files(2500, vectorized=True, seed=3, chunk_size=1000)
+
+        processed = tmp_path / "processed"
+        df = pd.read_csv(processed / "conversations_processed.csv", encoding="utf-8-sig")
+        assert df["conversation_id"].tolist() == list(range(1, 2501))
+
+        summary = pd.read_csv(processed / "themes_summary.csv", encoding="utf-8-sig")
+        expected = df.groupby(["theme", "product"]).agg(
+            count=("conversation_id", "count"),
+            avg_satisfaction=("client_satisfaction", "mean"),
+            avg_duration=("duration_minutes", "mean"),
+        ).round(2).reset_index()
+        pd.testing.assert_frame_equal(summary, expected, check_dtype=False)
+
+        analytics = pd.read_csv(processed / "conversation_analytics.csv", encoding="utf-8-sig")
+        values = dict(zip(analytics["metric"], analytics["value"]))
+        assert values["total_conversations"] == 2500
+        assert values["unique_clients"] == df["client_id"].nunique()
@@ -0,0 +1,101 @@
+"""
+Тесты хранилища фоновых заданий Banking NLP System
+=================================================
+
+Юнит-тесты возврата в очередь заданий, оставшихся от завершившихся
+процессов-обработчиков.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from src.banking_nlp.services.jobs import JobStatus, JobStore, _process_token
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Фикстура с пустым хранилищем заданий"""
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def other_process():
+    """Фикстура с живым сторонним процессом"""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield process
+    process.kill()
+    process.wait()
+
+
+def seed_running(store, job_id, owner_pid, owner_token):
+    """Задание в статусе RUNNING с указанным владельцем"""
+    store.create_job(job_id, "inline", {}, total=1, texts=["Хочу кредит"])
+    with store._connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, owner_pid = ?, owner_token = ? WHERE job_id = ?",
+            (JobStatus.RUNNING.value, owner_pid, owner_token, job_id),
+        )
+
+
+def test_release_jobs_of_previous_process_with_same_pid(store):
+    """Тест: задания с PID текущего процесса при запуске принадлежат предыдущему"""
+    seed_running(store, "same-pid", os.getpid(), _process_token(os.getpid()))
+
+    assert store.release_orphaned_jobs() == 1
+    row = store.get_job("same-pid")
+    assert row["status"] == JobStatus.PENDING.value
+    assert row["owner_pid"] is None
+    assert row["owner_token"] is None
+
+
+def test_keep_jobs_of_live_process(store, other_process):
+    """Тест: задания живого обработчика остаются за ним"""
+    seed_running(store, "alive", other_process.pid, _process_token(other_process.pid))
+
+    assert store.release_orphaned_jobs() == 0
+    assert store.get_job("alive")["status"] == JobStatus.RUNNING.value
+
+
+def test_release_jobs_of_reused_pid(store, other_process):
+    """Тест: PID, занятый другим процессом, не считается живым владельцем"""
+    seed_running(store, "reused", other_process.pid, f"{other_process.pid}:0")
+    seed_running(store, "legacy", other_process.pid, None)
+
+    assert store.release_orphaned_jobs() == 2
+    assert store.pending_job_ids() == ["reused", "legacy"]
+
+
+def test_claim_records_owner_token(store):
+    """Тест: захват задания записывает PID и идентификатор процесса"""
+    store.create_job("job", "inline", {}, total=1, texts=["Хочу кредит"])
+
+    assert store.claim_job("job")
+    row = store.get_job("job")
+    assert row["owner_pid"] == os.getpid()
+    assert row["owner_token"] == _process_token(os.getpid())
+
+
+def test_migrates_database_without_owner_token(tmp_path):
+    """Тест: база без колонки owner_token дополняется при открытии"""
+    db_path = tmp_path / "jobs.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, source TEXT NOT NULL, "
+        "params TEXT NOT NULL, total INTEGER, processed INTEGER NOT NULL DEFAULT 0, owner_pid INTEGER, "
+        "error TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO jobs (job_id, status, source, params, owner_pid, created_at, updated_at) "
+        "VALUES ('old', ?, 'inline', '{}', ?, '2024-01-01', '2024-01-01')",
+        (JobStatus.RUNNING.value, os.getpid()),
+    )
+    conn.commit()
+    conn.close()
+
+    store = JobStore(db_path)
+
+    assert store.release_orphaned_jobs() == 1
+    assert store.get_job("old")["status"] == JobStatus.PENDING.value